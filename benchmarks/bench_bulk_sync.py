@@ -0,0 +1,75 @@
+"""Compare the execute_values and COPY load paths of DestinationPostgreSQL.bulk_sync.
+
+Run from the repository root against a disposable database:
+
+    PYTHONPATH=dags python benchmarks/bench_bulk_sync.py --sizes 1000 100000 10000000
+"""
+import argparse
+import logging
+import time
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from model.destination import DestinationPostgreSQL
+
+# The psr types of the API: 10M rows then span 52 years, few enough monthly partitions for one load to lock
+PSR_TYPES = ('Biomass', 'Fossil Gas', 'Fossil Hard coal', 'Fossil Oil', 'Hydro Pumped Storage', 'Hydro Run-of-river and poundage', 'Nuclear', 'Other',
+             'Solar', 'Wind Offshore', 'Wind Onshore')
+
+
+def rows(size: int) -> Iterator[tuple[str, str, float]]:
+    """Generate synthetic psr rows spread over consecutive settlement periods, lazily so large sizes fit in memory.
+
+    :param size: number of rows
+    :return: generator of tuples containing curve name, start time and quantity
+    """
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    return (
+        ('bmreports, ' + PSR_TYPES[i % len(PSR_TYPES)] + ', min30',
+         (start + timedelta(minutes=30 * (i // len(PSR_TYPES)))).isoformat(),
+         float(i % 1000))
+        for i in range(size)
+    )
+
+
+def bench(destination: DestinationPostgreSQL, mode: str, size: int) -> float:
+    """Time one bulk_sync call on an empty table, the rows are generated while they are loaded.
+
+    :param destination: destination pointing to the benchmark table
+    :param mode: load mode of bulk_sync
+    :param size: number of rows to load
+    :return: elapsed seconds
+    """
+    destination.query(f"TRUNCATE {destination.data_table};")
+    started = time.perf_counter()
+    destination.bulk_sync(rows(size), mode=mode)
+
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    """Run the benchmark for every requested size and load mode."""
+    parser = argparse.ArgumentParser(description="Benchmark the bulk_sync load paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 10_000_000], help="Row counts to load.")
+    parser.add_argument("--table", default="bench_psr", help="Scratch table, dropped after the run.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    destination = DestinationPostgreSQL()
+    destination.TABLE_NAME = args.table
+    destination.drop_tables()
+    destination.table_maintenance()
+
+    try:
+        logging.info(f"{'rows':>12} {'mode':>8} {'seconds':>10} {'rows/s':>12}")
+        for size in args.sizes:
+            for mode in destination.LOAD_MODES:
+                elapsed = bench(destination, mode, size)
+                logging.info(f"{size:>12} {mode:>8} {elapsed:>10.3f} {size / elapsed:>12.0f}")
+    finally:
+        destination.drop_tables()
+        destination.disconnect()
+
+
+if __name__ == "__main__":
+    main()
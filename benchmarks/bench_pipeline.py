@@ -0,0 +1,173 @@
+"""Time every stage of the psr pipeline on synthetic payloads, from one window up to years of settlement periods.
+
+Run from the repository root against a disposable database and an initialized Great Expectations project
+in $AIRFLOW_HOME/quality:
+
+    PYTHONPATH=dags python benchmarks/bench_pipeline.py --days 1 30 365 --output bench_pipeline.json
+
+Compare with an earlier result and fail if a stage lost more than 20% of its throughput:
+
+    PYTHONPATH=dags python benchmarks/bench_pipeline.py --baseline bench_pipeline.json --tolerance 0.2
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+from helper.api_helper import APIHelper
+from model.destination import DestinationPostgreSQL
+from payload import PERIODS_PER_DAY, PSR_TYPES, synthetic_payload
+from validation.data_validation import DataValidator
+from validation.fast_validation import FastDataValidator
+
+STAGES = ('parse', 'validate_fast', 'validate', 'transform', 'sync')
+
+
+def timed(repeat: int, func: Callable[[], Any], setup: Callable[[], Any] | None = None) -> tuple[float, Any]:
+    """Get the fastest of several runs.
+
+    :param repeat: number of runs
+    :param func: function to time
+    :param setup: untimed function called before every run
+    :return: elapsed seconds of the fastest run and the result of the last run
+    """
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+
+    return best, result
+
+
+def run(days: int, args: argparse.Namespace, destination: DestinationPostgreSQL) -> list[dict[str, Any]]:
+    """Time the requested stages on one payload, every stage gets the output of the previous ones.
+
+    :param days: settlement days of the payload
+    :param args: command line arguments with the psr types, stages, repeat count and load mode
+    :param destination: destination pointing to the benchmark table
+    :return: one result per stage
+    """
+    stages, repeat, mode = args.stages, args.repeat, args.mode
+    body = json.dumps(synthetic_payload(days * PERIODS_PER_DAY, tuple(args.psr_types))).encode()
+    data = json.loads(body)
+    rows = len(data['data'])
+    results = []
+
+    def record(stage: str, seconds: float, **extra: Any) -> None:
+        results.append({'days': days, 'rows': rows, 'stage': stage, 'seconds': seconds, 'rows_per_second': rows / seconds if seconds else None, **extra})
+        logging.info(f"{days:>6} {rows:>10} {stage:>14} {seconds:>10.4f} {rows / seconds if seconds else 0:>12.0f}")
+
+    if 'parse' in stages:
+        seconds, _ = timed(repeat, lambda: json.loads(body))
+        record('parse', seconds, bytes=len(body))
+
+    if 'validate_fast' in stages:
+        seconds, passed = timed(repeat, lambda: FastDataValidator(data['data']).validate())
+        record('validate_fast', seconds, passed=passed)
+
+    if 'validate' in stages:
+        seconds, passed = timed(repeat, lambda: DataValidator(data['data']).validate())
+        record('validate', seconds, passed=passed)
+
+    if 'transform' in stages:
+        seconds, transformed = timed(repeat, lambda: APIHelper.transform(data))
+        record('transform', seconds)
+    else:
+        transformed = APIHelper.transform(data)
+
+    if 'sync' in stages:
+        seconds, _ = timed(repeat, lambda: destination.bulk_sync(transformed, mode=mode),
+                           setup=lambda: destination.query(f"TRUNCATE {destination.data_table};"))
+        record('sync', seconds, mode=mode)
+
+    return results
+
+
+def environment() -> dict[str, Any]:
+    """Describe the machine and revision the results were measured on."""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'revision': revision,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def regressions(results: list[dict[str, Any]], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Compare the throughput of every stage and size with a baseline.
+
+    :param results: results of this run
+    :param baseline: content of an earlier result file
+    :param tolerance: accepted loss of throughput, e.g. 0.2 for 20%
+    :return: descriptions of the stages which got slower than the tolerance
+    """
+    reference = {(result['stage'], result['days']): result['rows_per_second'] for result in baseline['results']}
+    slower = []
+
+    for result in results:
+        before = reference.get((result['stage'], result['days']))
+        if before and result['rows_per_second'] and result['rows_per_second'] < before * (1 - tolerance):
+            slower.append(f"{result['stage']} at {result['days']} days: {result['rows_per_second']:.0f} rows/s, baseline {before:.0f} rows/s")
+
+    return slower
+
+
+def main() -> None:
+    """Run the benchmark for every requested payload size, write the results and check them against a baseline."""
+    parser = argparse.ArgumentParser(description="Benchmark the stages of the psr pipeline.")
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 30, 365], help="Settlement days per payload.")
+    parser.add_argument("--psr-types", nargs="+", default=list(PSR_TYPES), help="psrTypes reported for every period.")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES), help="Stages to time.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage, the fastest one is reported.")
+    parser.add_argument("--mode", choices=DestinationPostgreSQL.LOAD_MODES, default=DestinationPostgreSQL.LOAD_VALUES, help="Load mode of bulk_sync.")
+    parser.add_argument("--table", default="bench_pipeline", help="Scratch table, dropped after the run.")
+    parser.add_argument("--output", type=Path, default=Path("bench_pipeline.json"), help="Result file in JSON format.")
+    parser.add_argument("--baseline", type=Path, help="Earlier result file to compare the throughput with.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Accepted loss of throughput against the baseline.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("great_expectations").setLevel(logging.WARNING)
+    logging.info(f"{'days':>6} {'rows':>10} {'stage':>14} {'seconds':>10} {'rows/s':>12}")
+
+    destination = DestinationPostgreSQL()
+    destination.TABLE_NAME = args.table
+    destination.drop_tables()
+    destination.table_maintenance()
+
+    try:
+        results = [result for days in args.days for result in run(days, args, destination)]
+    finally:
+        destination.drop_tables()
+        destination.disconnect()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    args.output.write_text(json.dumps({'environment': environment(), 'repeat': args.repeat, 'results': results}, indent=2))
+    logging.info(f"Results written to {args.output}")
+
+    if baseline is not None:
+        slower = regressions(results, baseline, args.tolerance)
+        for line in slower:
+            logging.error(f"Throughput regression: {line}")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
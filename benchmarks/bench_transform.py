@@ -0,0 +1,66 @@
+"""Compare APIHelper.transform with the columnar transform at backfill scale.
+
+Run from the repository root:
+
+    PYTHONPATH=dags python benchmarks/bench_transform.py --days 1 30 365 3650
+"""
+import argparse
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+from helper.api_helper import APIHelper
+from model.postgres import CopyStream
+from payload import PERIODS_PER_DAY, synthetic_payload
+
+
+def tuples_to_copy(data: dict[str, Any]) -> str:
+    """Transform into tuples and serialize them for COPY."""
+    return CopyStream(APIHelper.transform(data)).read()
+
+
+def columnar_to_copy(data: dict[str, Any]) -> str:
+    """Transform into columns and serialize them for COPY."""
+    return APIHelper.copy_buffer(APIHelper.transform_columnar(data)).getvalue()
+
+
+def best_of(repeat: int, func: Callable[[dict[str, Any]], Any], data: dict[str, Any]) -> float:
+    """Get the fastest of several runs.
+
+    :param repeat: number of runs
+    :param func: function to time
+    :param data: payload passed to the function
+    :return: elapsed seconds of the fastest run
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - started)
+
+    return min(timings)
+
+
+def main() -> None:
+    """Time the tuple and columnar transforms, each up to a COPY-ready payload."""
+    parser = argparse.ArgumentParser(description="Benchmark the APIHelper transforms.")
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 30, 365, 3650], help="Settlement days per payload.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, the fastest one is reported.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.info(f"{'days':>6} {'rows':>10} {'tuples':>10} {'+copy':>10} {'columnar':>10} {'+copy':>10}")
+
+    for days in args.days:
+        data = synthetic_payload(days * PERIODS_PER_DAY)
+
+        tuples = best_of(args.repeat, APIHelper.transform, data)
+        tuples_copy = best_of(args.repeat, tuples_to_copy, data)
+        columnar = best_of(args.repeat, APIHelper.transform_columnar, data)
+        columnar_copy = best_of(args.repeat, columnar_to_copy, data)
+
+        logging.info(f"{days:>6} {len(data['data']):>10} {tuples:>10.3f} {tuples_copy:>10.3f} {columnar:>10.3f} {columnar_copy:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
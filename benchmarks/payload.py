@@ -0,0 +1,39 @@
+"""Synthetic Elexon wind-and-solar payloads for the benchmarks."""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+PSR_TYPES = ('Solar', 'Wind Offshore', 'Wind Onshore')
+BUSINESS_TYPES = {'Solar': 'Solar generation', 'Wind Offshore': 'Wind generation', 'Wind Onshore': 'Wind generation'}
+PERIOD = timedelta(minutes=30)
+PERIODS_PER_DAY = 48
+
+
+def synthetic_payload(periods: int, psr_types: tuple[str, ...] = PSR_TYPES,
+                      start: datetime = datetime(2020, 1, 1, tzinfo=timezone.utc), seed: int = 0) -> dict[str, list[dict[str, Any]]]:
+    """Generate an API payload shaped like the wind-and-solar endpoint response.
+
+    :param periods: number of consecutive settlement periods, 48 per day
+    :param psr_types: psrTypes reported for every period
+    :param start: start time of the first period
+    :param seed: seed of the generated quantities
+    :return: payload with one record per period and psrType
+    """
+    rng = random.Random(seed)
+    data = []
+
+    for period in range(periods):
+        start_time = start + PERIOD * period
+        publish_time = start_time + timedelta(hours=1, minutes=28)
+        for psr_type in psr_types:
+            data.append({
+                'publishTime': publish_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'businessType': BUSINESS_TYPES.get(psr_type, 'Production'),
+                'psrType': psr_type,
+                'quantity': round(rng.uniform(0, 15000), 3),
+                'startTime': start_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'settlementDate': start_time.strftime('%Y-%m-%d'),
+                'settlementPeriod': start_time.hour * 2 + start_time.minute // 30 + 1,
+            })
+
+    return {'data': data}
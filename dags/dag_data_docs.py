@@ -0,0 +1,61 @@
+import logging
+import os
+import pendulum
+
+from airflow.decorators import dag, task
+from airflow.utils.weight_rule import WeightRule
+
+# The validation package pulls in Great Expectations, the task imports it when it runs
+
+# Use the Airflow task logger
+logger = logging.getLogger("airflow.task")
+
+# Render every hour by default, the ingestion runs only store the validation results
+SCHEDULE = os.environ.get('PSR_GX_DOCS_SCHEDULE', '@hourly')
+
+
+@dag(
+    schedule=SCHEDULE,
+    start_date=pendulum.datetime(2024, 10, 13, tz="UTC"),
+    catchup=False,
+    max_active_runs=1,  # Two builds at once would render the same pending results
+    tags=['data quality'],
+    default_args={
+        'retries': 1,
+        'retry_delay': pendulum.duration(minutes=15),
+        # Lowest priority whatever the DAG, the ingestion tasks take the free slots first
+        'priority_weight': 1,
+        'weight_rule': WeightRule.ABSOLUTE,
+    },
+    description='A DAG rendering the stored Great Expectations validation results into the Data Docs and compacting the old ones',
+)
+def data_docs() -> None:
+    """DAG rendering the Data Docs."""
+
+    @task(task_display_name="Render the new validation results")
+    def render() -> dict[str, int]:
+        """Render the validation results which have no page yet and rebuild the index of the sites."""
+        from validation.data_docs import DataDocs
+
+        counts = DataDocs().render()
+        logger.info(f"Data Docs rendered: {counts}")
+
+        return counts
+
+    @task(task_display_name="Compact the old validation results")
+    def compact() -> int:
+        """Replace the validation results older than the retention by their statistics.
+
+        Runs after the rendering, the next index of the sites drops the pages of the compacted results.
+        """
+        from model.results import ValidationResults
+
+        results = ValidationResults()
+        results.table_maintenance()  # Create the summary table and the run_time indexes if they don't exist.
+
+        return results.compact()
+
+    render() >> compact()
+
+# Instantiate the DAG
+data_docs()
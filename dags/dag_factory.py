@@ -0,0 +1,259 @@
+import logging
+import pendulum
+from typing import Any, cast
+
+from airflow.models.dag import DAG
+from airflow.exceptions import AirflowException, AirflowSkipException
+from airflow.utils.edgemodifier import Label
+from airflow.utils.trigger_rule import TriggerRule
+from airflow.decorators import dag, task, task_group
+from airflow.models.param import Param
+from airflow.models import DagRun, TaskInstance
+from airflow.models.xcom import resolve_xcom_backend
+from airflow.operators.python import get_current_context
+from airflow.utils.dag_parsing_context import get_parsing_context
+
+# Only what the scheduler needs to build the DAG is imported here. The models, helpers and validators pull in
+# Great Expectations, pandas, NumPy and psycopg2, so the tasks import them when they run; see tests/test_dags/test_parse_time.py.
+from model.availability import DataAvailabilitySensor
+from model.dataset import Dataset
+from helper.xcom_backend import ReferenceXComBackend
+
+# Use the Airflow task logger
+logger = logging.getLogger("airflow.task")
+
+
+def ingestion_dag(dataset: Dataset) -> DAG:
+    """Build the ETL DAG of a dataset of the registry.
+
+    :param dataset: dataset declaration, see model/dataset.py
+    :return: DAG syncing the dataset from the API to its destination table
+    """
+
+    @dag(
+        dag_id=dataset.dag_id,
+        schedule=dataset.schedule,
+        start_date=dataset.start_date,
+        catchup=False,
+        tags=dataset.tags,
+        default_args={
+            'retries': 1,
+            'retry_delay': pendulum.duration(minutes=5),
+        },
+        params={
+            "date_from": Param(default=None, type=["null", "string"], format='date-time', description='Date From, the logical date of the run if empty'),
+            "date_to": Param(default=None, type=["null", "string"], format='date-time', description='Date To, the logical date of the run if empty'),
+            "stream": Param(default=False, type="boolean", description='Stream the range to the destination in bounded batches (large backfills)'),
+        },
+        description=dataset.description,
+        # Remove the offloaded XCom payloads of the run, only the reference-passing backend writes them
+        on_success_callback=ReferenceXComBackend.cleanup if issubclass(resolve_xcom_backend(), ReferenceXComBackend) else None,
+    )
+    def ingestion() -> None:
+        """ETL DAG of the dataset."""
+
+        @task(task_display_name="Parameterize the dates", retries=0)
+        def parameterize(params: dict[str, Any], dag_run: DagRun) -> dict[str, Any]:
+            """Validate the dates and return valid dates or raise an exception."""
+            from helper.api_helper import APIHelper as Helper
+            from validation.parameter_validation import ParameterValidator as Validator
+
+            # System generated DAG run
+            if not dag_run.external_trigger:
+                date_param = Helper.date_param(dag_run.logical_date)
+                return {"date_from": date_param, "date_to": date_param}
+
+            # Get the user inputs, a manual run without dates loads the period of its logical date
+            logical_date = cast(pendulum.DateTime, dag_run.logical_date).to_iso8601_string()
+            date_from = params["date_from"] or logical_date
+            date_to = params["date_to"] or logical_date
+
+            # Validate the user inputs
+            valid = Validator(date_from, date_to)
+            if valid.validate():
+                return {"date_from": Helper.floored_to_30_min(valid.date_from),
+                        "date_to": Helper.floored_to_30_min(valid.date_to)}
+            else:
+                raise AirflowException(valid.errors[-1])
+
+        @task_group(group_id="Processor", tooltip="Data processing unit")
+        def source(parameters: dict[str, str]) -> Any:
+            """Tasks group for processing source data."""
+            @task(task_display_name="Fetcher")
+            def fetch(p: dict[str, str], params: dict[str, Any] | None = None) -> dict[str, Any]:
+                """Fetch the JSON data from the API and push it to XCom for downstream tasks."""
+                if params and params.get("stream"):
+                    raise AirflowSkipException("The range is streamed to the destination")
+
+                from helper.metrics import Metrics
+                from model.cache import ResponseCache as Cache
+                from model.landing import LandingZone
+                from model.source import SourceAPI as Source
+
+                try:
+                    with Metrics.from_context(get_current_context()).stage("fetch") as span:
+                        cache = Cache()
+                        source = Source(cache=cache, span=span, landing=LandingZone(dataset=dataset.name), endpoint=dataset.endpoint)
+                        data = source.fetch_json(cast(pendulum.DateTime, p["date_from"]), cast(pendulum.DateTime, p["date_to"]),
+                                                 chunk=pendulum.duration(days=1))  # One settlement day per concurrent request
+                        span.add("rows", len(data["data"]))
+
+                    if not data["data"]:
+                        raise AirflowException("Data is empty")
+                    logger.info(f"Data fetch successful, response cache {cache.stats()}")
+                    return data
+                except Exception as e:
+                    raise AirflowException(f"Data fetch failed: {e}") from e
+
+            @task(task_display_name="Validator")
+            def validate(data: dict[str, Any], dag_run: DagRun | None = None) -> dict[str, Any]:
+                """Validate the data before transformation.
+
+                The NumPy fast path validates every run. The Great Expectations checkpoints run as well for manual runs,
+                on the scheduled or sampled runs and whenever the fast path fails; their outcome is then authoritative.
+                """
+                from helper.metrics import Metrics
+                from validation.data_validation import DataValidator
+                from validation.fast_validation import FastDataValidator
+
+                with Metrics.from_context(get_current_context()).stage("validate") as span:
+                    span.add("rows", len(data["data"]))
+                    fast = FastDataValidator(data["data"], suites=dataset.suites)
+                    result = fast.validate()
+
+                    if not result or dag_run is None or dag_run.external_trigger or DataValidator.due(cast(pendulum.DateTime, dag_run.logical_date)):
+                        span.attributes["great_expectations"] = True
+                        q = DataValidator(data["data"], dataset.checkpoints)
+                        full = q.validate()
+                        if full != result:
+                            logger.warning(f"Fast path validation disagrees with Great Expectations: {[r for r in fast.results if not r['success']]}")
+                        result = full
+
+                if result:
+                    logger.info("Data validation successful")
+                    return data
+                else:
+                    raise AirflowException("Data validation failed")
+
+            @task(task_display_name="Transformer")
+            def transform(data: dict[str, Any], dag_run: DagRun | None = None, ti: TaskInstance | None = None) -> list[tuple[str, str, float]]:
+                """Transform the JSON data into a format suitable for bulk insert into the destination table.
+
+                Of several revisions of a curve and curve date, only the one published last is kept.
+                Scheduled runs then keep only the records which are not loaded yet or whose value differs from the loaded row,
+                read up to the watermarks of the curves; manual runs reload everything. The watermarks of the records and the
+                number of records dropped as loaded are pushed under the 'watermarks' and 'skipped' keys for the sync task.
+                """
+                from helper.api_helper import APIHelper as Helper
+                from helper.metrics import Metrics
+                from model.destination import DestinationPostgreSQL as Destination
+
+                with Metrics.from_context(get_current_context()).stage("transform") as span:
+                    span.add("rows", len(data["data"]))
+                    data, duplicates = Helper.deduplicate(data, dataset.fields)
+                    span.add("duplicates", duplicates)
+                    if duplicates:
+                        logger.info(f"Dropped {duplicates} records superseded by a later revision")
+
+                    skipped = 0
+                    if dag_run is not None and not dag_run.external_trigger and data["data"]:
+                        fetched = len(data["data"])
+                        dates = [item[dataset.fields["curve_date"]] for item in data["data"]]
+                        data = Helper.incremental(data, Destination(dataset.table).loaded_to_watermarks(min(dates), max(dates)), dataset.fields)
+                        skipped = fetched - len(data["data"])
+                        logger.info(f"{len(data['data'])} of {fetched} records are not loaded yet or revised")
+
+                    if ti is not None:
+                        ti.xcom_push(key="watermarks", value=Helper.watermarks(data, dataset.fields))
+                        ti.xcom_push(key="skipped", value=skipped)
+
+                    rows = Helper.transform(data, dataset.fields)
+                    span.add("rows_out", len(rows))
+
+                return rows
+
+            fetched_data = fetch(parameters)
+            validated_data = validate(cast(dict[str, Any], fetched_data))
+            transformed_data = transform(cast(dict[str, Any], validated_data))
+
+            fetched_data >> Label("Fetched data from API") >> validated_data >> Label("Validated data") >> transformed_data >> Label("Transformed data")
+
+            return transformed_data
+
+        @task(task_display_name="Sync data to destination table")
+        def sync(data: list[tuple[str, str, float]], ti: TaskInstance | None = None) -> bool:
+            """Perform the bulk insert of the JSON data into the destination table and advance the watermarks.
+
+            The records the transform task dropped as already loaded are counted as skipped in the sync stats.
+            """
+            from helper.metrics import Metrics
+            from model.destination import DestinationPostgreSQL as Destination
+
+            try:
+                destination = Destination(dataset.table)
+                destination.table_maintenance()  # Create the destination table if it doesn't exist.
+                watermarks = ti.xcom_pull(task_ids="Processor.transform", key="watermarks") if ti is not None else None
+                skipped = ti.xcom_pull(task_ids="Processor.transform", key="skipped") if ti is not None else None
+                with Metrics.from_context(get_current_context()).stage("sync") as span:
+                    span.add("rows", len(data))
+                    destination.bulk_sync(data, watermarks=watermarks, skipped=skipped or 0)
+                    for counter, value in destination.sync_stats.items():
+                        span.add(f"db_{counter}", value)
+                logger.info(f"Data sync successful: {destination.sync_stats}")
+                return True
+            except Exception as e:
+                raise AirflowException(f"Data sync failed: {e}") from e
+
+        @task(task_display_name="Stream data to destination table")
+        def stream(p: dict[str, str], params: dict[str, Any] | None = None) -> int:
+            """Stream the range from the API through validation and transformation into the destination table.
+
+            Memory stays flat whatever the length of the range, nothing but the row count goes through XCom.
+            """
+            if not params or not params.get("stream"):
+                raise AirflowSkipException("Streaming was not requested")
+
+            from helper.metrics import Metrics
+            from helper.stream_helper import StreamHelper
+            from model.cache import ResponseCache as Cache
+            from model.destination import DestinationPostgreSQL as Destination
+            from model.landing import LandingZone
+            from model.source import SourceAPI as Source
+
+            try:
+                destination = Destination(dataset.table)
+                destination.table_maintenance()  # Create the destination table if it doesn't exist.
+                source = Source(cache=Cache(), landing=LandingZone(dataset=dataset.name), endpoint=dataset.endpoint)
+                count = StreamHelper.sync(source, destination, cast(pendulum.DateTime, p["date_from"]), cast(pendulum.DateTime, p["date_to"]),
+                                          chunk=pendulum.duration(days=1), metrics=Metrics.from_context(get_current_context()), dataset=dataset)
+                logger.info(f"Data stream successful, {count} rows: {destination.sync_stats}")
+                return count
+            except Exception as e:
+                raise AirflowException(f"Data stream failed: {e}") from e
+
+        @task(trigger_rule=TriggerRule.ONE_FAILED, retries=0)
+        def watcher() -> None:
+            """Raise an exception if one or more upstream tasks failed."""
+            raise AirflowException("Failing task because one or more upstream tasks failed.")
+
+        # Set up dependencies for TaskGroups and tasks
+        parameterized = parameterize()  # type: ignore
+        # Defer until the last period is published instead of failing the fetch and waiting for a retry
+        available = DataAvailabilitySensor(task_id="available", task_display_name="Wait for the data", window=parameterized,
+                                           endpoint=dataset.endpoint, skip_param="stream")
+        fetched = source(cast(dict[str, str], available.output))
+        synced = sync(cast(list[tuple[str, str, float]], fetched))
+        streamed = stream(cast(dict[str, str], parameterized))
+
+        fetched >> Label("Transformed data") >> synced
+
+        [parameterized, available, fetched, synced, streamed] >> Label("Fail") >> watcher()
+
+    return ingestion()
+
+
+# Build only the DAG of the task being run, the scheduler builds every DAG of the registry
+current_dag_id = get_parsing_context().dag_id
+for registered in Dataset.registry().values():
+    if current_dag_id is None or current_dag_id == registered.dag_id:
+        globals()[registered.dag_id] = ingestion_dag(registered)
@@ -0,0 +1,141 @@
+import logging
+import os
+import pendulum
+from typing import Any, cast
+
+from airflow.exceptions import AirflowException
+from airflow.utils.trigger_rule import TriggerRule
+from airflow.decorators import dag, task
+from airflow.operators.python import get_current_context
+from airflow.models.param import Param
+from airflow.models.pool import Pool
+
+# The models and helpers pull in pandas, NumPy, psycopg2 and Great Expectations, the tasks import them when they run
+
+# Use the Airflow task logger
+logger = logging.getLogger("airflow.task")
+
+# Pool bounding the windows loaded at the same time, created on the first run if it doesn't exist
+POOL = os.environ.get('PSR_BACKFILL_POOL', 'psr_backfill')
+POOL_SLOTS = int(os.environ.get('PSR_BACKFILL_POOL_SLOTS', 4))
+
+
+def split(params: dict[str, Any]) -> list[dict[str, str]]:
+    """Split the range of the run into windows.
+
+    :param params: DAG run params with date_from, date_to and window_days
+    :return: windows with date_from and date_to as UTC ISO 8601 strings, in chronological order
+    """
+    from helper.api_helper import APIHelper as Helper
+    from model.source import SourceAPI as Source
+    from validation.parameter_validation import ParameterValidator as Validator
+
+    valid = Validator(params["date_from"], params["date_to"])
+    if valid.errors or not valid.validate_date_order():
+        raise AirflowException(valid.errors[-1])
+
+    date_from, date_to = Helper.floored_to_30_min(valid.date_from), Helper.floored_to_30_min(valid.date_to)
+
+    return [{"date_from": start.to_iso8601_string(), "date_to": end.to_iso8601_string()}
+            for start, end in Source.windows(date_from, date_to, pendulum.duration(days=params["window_days"]))]
+
+
+@dag(
+    schedule=None,  # Triggered manually
+    start_date=pendulum.datetime(2024, 10, 13, tz="UTC"),
+    catchup=False,
+    tags=['backfill'],
+    default_args={
+        'retries': 2,
+        'retry_delay': pendulum.duration(minutes=5),
+    },
+    params={
+        "date_from": Param(type="string", format='date-time', description='Date From'),
+        "date_to": Param(type="string", format='date-time', description='Date To'),
+        "window_days": Param(default=7, type="integer", minimum=1, description='Days per window, every window is loaded by one mapped task'),
+    },
+    description='A backfill DAG for loading any range of psr data in parallel windows, resumable per window',
+)
+def psr_backfill() -> None:
+    """Backfill DAG for psr data."""
+
+    @task(task_display_name="Plan the windows", retries=0)
+    def plan(params: dict[str, Any]) -> list[dict[str, str]]:
+        """Split the range into windows and return the ones which are not loaded yet.
+
+        The range is not capped, unlike the manual runs of psr_sync. The partitions of the whole range are created up front,
+        so the windows loaded in parallel never race on creating the same partition.
+        """
+        from model.backfill import BackfillStatus
+        from model.destination import DestinationPostgreSQL as Destination
+
+        windows = split(params)
+
+        destination = Destination()
+        destination.table_maintenance()  # Create the destination table if it doesn't exist.
+        with destination.transaction() as cur:
+            destination.ensure_partitions(cur, windows[0]["date_from"], windows[-1]["date_to"])
+
+        if Pool.get_pool(POOL) is None:
+            Pool.create_or_update_pool(POOL, POOL_SLOTS, "Windows of psr_backfill loaded at the same time", include_deferred=False)
+
+        status = BackfillStatus()
+        status.table_maintenance()
+        pending = status.plan(windows)
+        logger.info(f"{len(pending)} of {len(windows)} windows to load, the others are done")
+
+        return pending
+
+    @task(task_display_name="Load a window", pool=POOL, map_index_template="{{ window_from }}")
+    def load(window: dict[str, str]) -> int:
+        """Stream one window from the API into the destination table and record its status.
+
+        A failed window is retried on its own, the windows which are done are not loaded again.
+        """
+        from helper.metrics import Metrics
+        from helper.stream_helper import StreamHelper
+        from model.backfill import BackfillStatus
+        from model.cache import ResponseCache as Cache
+        from model.destination import DestinationPostgreSQL as Destination
+        from model.landing import LandingZone
+        from model.source import SourceAPI as Source
+
+        context = get_current_context()
+        context["window_from"] = window["date_from"]  # type: ignore[typeddict-unknown-key]  # Label of the mapped task
+        status = BackfillStatus()
+        status.update(window, status.RUNNING)
+
+        try:
+            destination = Destination()
+            count = StreamHelper.sync(Source(cache=Cache(), landing=LandingZone()), destination, cast(pendulum.DateTime, pendulum.parse(window["date_from"])),
+                                      cast(pendulum.DateTime, pendulum.parse(window["date_to"])), chunk=pendulum.duration(days=1),
+                                      metrics=Metrics.from_context(context))
+        except Exception as e:
+            status.update(window, status.FAILED, error=str(e))
+            raise AirflowException(f"Window {window['date_from']} to {window['date_to']} failed: {e}") from e
+
+        status.update(window, status.DONE, rows=count)
+        logger.info(f"Window {window['date_from']} to {window['date_to']} loaded, {count} rows: {destination.sync_stats}")
+
+        return count
+
+    @task(task_display_name="Report the progress", trigger_rule=TriggerRule.ALL_DONE, retries=0)
+    def report(params: dict[str, Any]) -> dict[str, Any]:
+        """Log the windows of the range by status and fail the run if some are not done."""
+        from model.backfill import BackfillStatus
+
+        windows = split(params)
+        summary = BackfillStatus().summary(windows)
+        logger.info(f"Backfill from {windows[0]['date_from']} to {windows[-1]['date_to']}: {summary}")
+
+        if set(summary["windows"]) - {BackfillStatus.DONE}:
+            raise AirflowException(f"Backfill incomplete, trigger it again with the same range to load the remaining windows: {summary['windows']}")
+
+        return summary
+
+    # Set up dependencies, one mapped load task per pending window
+    windows = plan()  # type: ignore
+    load.expand(window=windows) >> report()  # type: ignore
+
+# Instantiate the DAG
+psr_backfill()
@@ -1,19 +1,224 @@
+import io
+import sys
+from collections.abc import Callable, Mapping
+from itertools import compress
+from operator import itemgetter
+from string import Formatter
 from typing import Any
+import numpy as np
+import pandas as pd
 import pendulum
 from datetime import datetime
 
 
+class CurveNames(dict[Any, str]):
+    """Curve names of a template, e.g. 'bmreports, {psrType}, min30', by value of the record fields of the template.
+
+    Every name is built and interned once, the records of a curve then share the same string.
+    """
+
+    def __init__(self, template: str) -> None:
+        """Initialize the names.
+
+        :param template: curve name template with the record fields in braces
+        """
+        super().__init__()
+        self.template = template
+        self.fields = tuple(dict.fromkeys(name for _, name, _, _ in Formatter().parse(template) if name))
+        # Key of a record: the value of the field, a tuple of the values of several fields
+        self.key: Callable[[dict[str, Any]], Any] = itemgetter(*self.fields) if self.fields else lambda item: ()
+
+    def __missing__(self, key: Any) -> str:
+        """Build the name of a key seen for the first time."""
+        values = (key,) if len(self.fields) == 1 else key
+        name = self[key] = sys.intern(self.template.format_map(dict(zip(self.fields, values, strict=True))))
+
+        return name
+
+    def __call__(self, item: dict[str, Any]) -> str:
+        """Get the curve name of a record."""
+        return self[self.key(item)]
+
+
 class APIHelper:
     """Helper class to prepare acquisition of data from the API and handle the API data."""
 
+    CURVE_NAME = 'bmreports, {}, min30'  # Curve name template filled with the psrType
+    # Record fields of the destination rows of the wind and solar dataset, see model.dataset.Dataset.fields
+    FIELDS = {
+        'curve_name': CURVE_NAME.format('{psrType}'),
+        'curve_date': 'startTime',
+        'value': 'quantity',
+        'publish_time': 'publishTime',
+    }
+
     @staticmethod
-    def transform(data: dict[str, Any]) -> list[tuple[str, str, float]]:
+    def transform(data: dict[str, Any], fields: dict[str, str] | None = None) -> list[tuple[str, str, float]]:
         """Filter and transform data to extract required fields.
 
         :param data: data acquired from the API
-        :return: list of tuples containing psrType, startTime and quantity
+        :param fields: record fields of the curve name template, curve date and value, FIELDS by default
+        :return: list of tuples containing curve name, curve date and value
+        """
+        fields = fields or APIHelper.FIELDS
+        names = CurveNames(fields['curve_name'])
+        key, curve_date, value = names.key, fields['curve_date'], fields['value']
+
+        return [(names[key(item)], item[curve_date], item[value]) for item in data['data']]
+
+    @staticmethod
+    def revisions(data: dict[str, Any], fields: dict[str, str] | None = None) -> list[tuple[str, str, float, str]]:
+        """Transform data like `transform`, every row carrying the publish time of its record as a fourth column.
+
+        bulk_sync keeps the row published last of a key written more than once, even across batches.
+
+        :param data: data acquired from the API
+        :param fields: record fields of the curve name template, curve date, value and publish time, FIELDS by default
+        :return: list of tuples containing curve name, curve date, value and publish time
         """
-        return [('bmreports, ' + item['psrType'] + ', min30', item['startTime'], item['quantity']) for item in data['data']]
+        fields = fields or APIHelper.FIELDS
+        names = CurveNames(fields['curve_name'])
+        key, curve_date, value, publish_time = names.key, fields['curve_date'], fields['value'], fields['publish_time']
+
+        return [(names[key(item)], item[curve_date], item[value], item[publish_time]) for item in data['data']]
+
+    @staticmethod
+    def watermarks(data: dict[str, Any], fields: dict[str, str] | None = None) -> dict[str, tuple[str, str]]:
+        """Get the latest publish time and curve date per curve.
+
+        The API formats both as UTC ISO 8601 strings, which order chronologically as strings.
+
+        :param data: data acquired from the API
+        :param fields: record fields of the curve name template, curve date and publish time, FIELDS by default
+        :return: latest publish time and curve date by curve name
+        """
+        fields = fields or APIHelper.FIELDS
+        names = CurveNames(fields['curve_name'])
+        curve_date, publish_time = fields['curve_date'], fields['publish_time']
+
+        watermarks: dict[str, tuple[str, str]] = {}
+        for item in data['data']:
+            name = names(item)
+            latest = watermarks.get(name, (item[publish_time], item[curve_date]))
+            watermarks[name] = (max(latest[0], item[publish_time]), max(latest[1], item[curve_date]))
+
+        return watermarks
+
+    @staticmethod
+    def incremental(data: dict[str, Any], loaded: Mapping[tuple[str, str], float | None], fields: dict[str, str] | None = None) -> dict[str, Any]:
+        """Keep only the records which are not loaded yet or whose value differs from the loaded one.
+
+        The records are compared with the rows of their own window in the destination, not with a watermark: the periods of
+        a cleared or re-run earlier window which were never loaded are kept whatever was loaded after them.
+        Deduplicate first, an earlier revision must not be kept while its latest revision is dropped as already loaded.
+
+        :param data: data acquired from the API
+        :param loaded: loaded value by curve name and curve date of the window (e.g. DestinationPostgreSQL.loaded)
+        :param fields: record fields of the curve name template, curve date and value, FIELDS by default
+        :return: data with the remaining records
+        """
+        fields = fields or APIHelper.FIELDS
+        names = CurveNames(fields['curve_name'])
+        key, curve_date, value = names.key, fields['curve_date'], fields['value']
+        missing = object()
+
+        def pending(item: dict[str, Any]) -> bool:
+            stored = loaded.get((names[key(item)], item[curve_date]), missing)
+            if stored is missing:
+                return True
+            if stored is None or item[value] is None:
+                return stored is not item[value]  # NULL only equals NULL
+            return float(item[value]) != stored
+
+        return {**data, 'data': [item for item in data['data'] if pending(item)]}
+
+    @staticmethod
+    def deduplicate(data: dict[str, Any], fields: dict[str, str] | None = None) -> tuple[dict[str, Any], int]:
+        """Keep one record per curve and curve date, the one published last.
+
+        A payload may hold several revisions of a settlement period, and merged windows may overlap. The upsert of the
+        destination cannot write a key twice in one statement, so the superseded records are dropped in one pass over a
+        hash of the keys; on equal publish times the later record wins. The remaining records keep their order.
+
+        :param data: data acquired from the API
+        :param fields: record fields of the curve name template, curve date and publish time, FIELDS by default
+        :return: data with the remaining records and the number of records dropped
+        """
+        fields = fields or APIHelper.FIELDS
+        names = CurveNames(fields['curve_name'])
+        key, curve_date, publish_time = names.key, fields['curve_date'], fields['publish_time']
+        records = data['data']
+
+        latest: dict[tuple[str, Any], int] = {}
+        for index, item in enumerate(records):
+            curve = (names[key(item)], item[curve_date])
+            kept = latest.setdefault(curve, index)
+            if kept != index and item[publish_time] >= records[kept][publish_time]:
+                latest[curve] = index
+
+        dropped = len(records) - len(latest)
+        if not dropped:
+            return data, 0
+
+        selected = [False] * len(records)
+        for index in latest.values():
+            selected[index] = True
+
+        return {**data, 'data': list(compress(records, selected))}, dropped
+
+    @staticmethod
+    def transform_columnar(data: dict[str, Any], fields: dict[str, str] | None = None) -> pd.DataFrame:
+        """Transform data into columns instead of a list of tuples.
+
+        The curve name is built once per distinct value of the fields of its template and stored as a categorical column,
+        i.e. the interned names plus one small integer code per row.
+
+        :param data: data acquired from the API
+        :param fields: record fields of the curve name template, curve date and value, FIELDS by default
+        :return: data frame with curve_name, curve_date and value columns
+        """
+        fields = fields or APIHelper.FIELDS
+        names = CurveNames(fields['curve_name'])
+        records = data['data']
+        count = len(records)
+
+        if len(names.fields) == 1:
+            codes, keys = pd.factorize(np.fromiter(map(names.key, records), dtype=object, count=count))
+        else:
+            index: dict[Any, int] = {}
+            codes = np.fromiter((index.setdefault(key, len(index)) for key in map(names.key, records)), dtype=np.int64, count=count)
+            keys = list(index)
+        # Distinct keys may share a name, e.g. through a format spec of the template
+        categories: dict[str, int] = {}
+        codes = np.array([categories.setdefault(names[key], len(categories)) for key in keys], dtype=np.int64)[codes]
+
+        return pd.DataFrame({
+            'curve_name': pd.Categorical.from_codes(codes, categories=list(categories)),
+            'curve_date': np.fromiter(map(itemgetter(fields['curve_date']), records), dtype=object, count=count),
+            'value': np.array(list(map(itemgetter(fields['value']), records)), dtype=np.float64),
+        })
+
+    @staticmethod
+    def copy_buffer(frame: pd.DataFrame) -> io.StringIO:
+        """Serialize the columns of `transform_columnar` into a buffer for COPY ... FROM STDIN WITH (FORMAT csv).
+
+        :param frame: data frame with curve_name, curve_date and value columns
+        :return: CSV buffer positioned at the start, missing values are written as NULL
+        """
+        curve_name = frame['curve_name'].cat
+        # Quote every distinct curve name once, then expand through the codes
+        quoted = np.array(['"' + name.replace('"', '""') + '"' for name in curve_name.categories], dtype=object)[curve_name.codes.to_numpy()]
+
+        values = frame['value'].to_numpy()
+        value = list(map(repr, values.tolist()))
+        for i in np.flatnonzero(np.isnan(values)):
+            value[i] = ''
+
+        buffer = io.StringIO()
+        buffer.writelines(map('{},{},{}\n'.format, quoted, frame['curve_date'].to_numpy(), value))
+        buffer.seek(0)
+
+        return buffer
 
     @staticmethod
     def date_param(dt: datetime) -> pendulum.DateTime:
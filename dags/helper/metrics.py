@@ -0,0 +1,338 @@
+import hashlib
+import json
+import logging
+import os
+import secrets
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class Span:
+    """Measurements of one stage of the pipeline: wall time, counters and the HTTP requests made.
+
+    The counters and requests may be recorded from several threads, e.g. by the concurrent windows of a chunked fetch.
+    """
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: Mapping[str, Any]) -> None:
+        """Start the span.
+
+        :param name: stage name, e.g. 'fetch'
+        :param trace_id: 32 hex digits shared by every span of the DAG run
+        :param parent_id: 16 hex digits of the DAG run
+        :param attributes: labels of the span, e.g. dag_id, run_id and task_id
+        """
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.counters: dict[str, float] = {}
+        self.requests: list[dict[str, Any]] = []
+        self.start = time.time()
+        self.started = time.perf_counter()
+        self.elapsed = 0.0  # Seconds accumulated by metered iterators
+        self.duration: float | None = None
+        self.error: str | None = None
+        self.lock = threading.Lock()
+
+    def add(self, counter: str, value: float = 1) -> None:
+        """Increment a counter, e.g. rows or bytes.
+
+        :param counter: counter name
+        :param value: increment
+        """
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def request(self, status: int, seconds: float, size: int) -> None:
+        """Record an HTTP request.
+
+        :param status: HTTP status code
+        :param seconds: latency until the response headers were received
+        :param size: bytes of the response body
+        """
+        with self.lock:
+            self.requests.append({'status': status, 'seconds': seconds, 'bytes': size})
+            self.counters['bytes'] = self.counters.get('bytes', 0) + size
+
+    def finish(self, duration: float | None = None, error: BaseException | None = None) -> None:
+        """End the span.
+
+        :param duration: wall time in seconds, the time since the start if None
+        :param error: exception which ended the stage
+        """
+        self.duration = time.perf_counter() - self.started if duration is None else duration
+        self.error = None if error is None else repr(error)
+
+    def record(self) -> dict[str, Any]:
+        """Get the span as a JSON serializable dictionary."""
+        latencies = [request['seconds'] for request in self.requests]
+        statuses: dict[str, int] = {}
+        for request in self.requests:
+            statuses[str(request['status'])] = statuses.get(str(request['status']), 0) + 1
+
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': self.start,
+            'duration': self.duration,
+            'status': 'ok' if self.error is None else 'error',
+            'error': self.error,
+            'attributes': self.attributes,
+            'counters': self.counters,
+            'http': {
+                'requests': len(latencies),
+                'statuses': statuses,
+                'latency_total': sum(latencies),
+                'latency_max': max(latencies, default=0.0),
+            } if latencies else None,
+        }
+
+
+class MetricsSink(ABC):
+    """Destination of the finished spans."""
+
+    @abstractmethod
+    def emit(self, span: Span) -> None:
+        """Export a finished span.
+
+        :param span: finished span
+        """
+        pass
+
+
+class FileSink(MetricsSink):
+    """Append the spans to a JSON lines file, e.g. for tests or to inspect a local run."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Initialize the sink.
+
+        :param path: file the spans are appended to, its directory is created if missing
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+
+    def emit(self, span: Span) -> None:
+        """Append the span as one line of JSON."""
+        line = json.dumps(span.record(), default=str)
+        with self.lock, self.path.open('a') as file:
+            file.write(line + '\n')
+
+
+class StatsDSink(MetricsSink):
+    """Send the spans to a StatsD server over UDP, in the plain StatsD format.
+
+    Per stage: {prefix}.{stage}.duration as a timer, every counter and the errors as counters.
+    Per HTTP request: {prefix}.{stage}.http.latency as a timer and {prefix}.{stage}.http.status.{code} as a counter.
+    """
+
+    PREFIX = 'psr'
+    PORT = 8125
+
+    def __init__(self, host: str = 'localhost', port: int = PORT, prefix: str = PREFIX) -> None:
+        """Initialize the sink.
+
+        :param host: StatsD host
+        :param port: StatsD UDP port
+        :param prefix: prefix of the metric names
+        """
+        self.address = (host, port)
+        self.prefix = prefix
+
+    def lines(self, span: Span) -> list[str]:
+        """Format the metrics of a span.
+
+        :param span: finished span
+        :return: one StatsD line per metric
+        """
+        name = f"{self.prefix}.{span.name}"
+        lines = [f"{name}.duration:{(span.duration or 0) * 1000:.3f}|ms"]
+        lines += [f"{name}.{counter}:{value:g}|c" for counter, value in span.counters.items()]
+        lines += [line for request in span.requests for line in (f"{name}.http.latency:{request['seconds'] * 1000:.3f}|ms",
+                                                                 f"{name}.http.status.{request['status']}:1|c")]
+        if span.error is not None:
+            lines.append(f"{name}.errors:1|c")
+
+        return lines
+
+    def emit(self, span: Span) -> None:
+        """Send one datagram per metric, a lost datagram only loses that metric.
+
+        The socket only lives for the span, a task emits a handful of spans and nothing is left open once it ends.
+        """
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            for line in self.lines(span):
+                sock.sendto(line.encode(), self.address)
+
+
+class OpenTelemetrySink(MetricsSink):
+    """Export the spans through the OpenTelemetry tracing API.
+
+    The spans are children of a remote parent derived from the DAG run, so every task of a run lands in the same trace.
+    The exporter is whatever tracer provider is configured, e.g. through the OTEL_* environment variables.
+    """
+
+    def __init__(self, tracer_provider: Any = None) -> None:
+        """Initialize the sink.
+
+        :param tracer_provider: tracer provider, the global one if None
+        """
+        from opentelemetry import trace
+
+        self.tracer = trace.get_tracer(__name__, tracer_provider=tracer_provider)
+
+    def emit(self, span: Span) -> None:
+        """Start and end an OpenTelemetry span with the times and attributes of the span."""
+        from opentelemetry import trace
+        from opentelemetry.trace import NonRecordingSpan, SpanContext, Status, StatusCode, TraceFlags
+
+        parent = SpanContext(trace_id=int(span.trace_id, 16), span_id=int(span.parent_id or span.span_id, 16), is_remote=True,
+                             trace_flags=TraceFlags(TraceFlags.SAMPLED))
+        record = span.record()
+        attributes = {**{key: str(value) for key, value in span.attributes.items()}, 'psr.span_id': span.span_id,
+                      **{f'psr.{counter}': value for counter, value in span.counters.items()},
+                      **{f'http.{key}': value for key, value in (record['http'] or {}).items() if key != 'statuses'}}
+        start = int(span.start * 1e9)
+
+        otel_span = self.tracer.start_span(span.name, context=trace.set_span_in_context(NonRecordingSpan(parent)),
+                                           start_time=start, attributes=attributes)
+        if span.error is not None:
+            otel_span.set_status(Status(StatusCode.ERROR, span.error))
+        otel_span.end(end_time=start + int((span.duration or 0) * 1e9))
+
+
+class Metrics:
+    """Per-stage instrumentation of the pipeline, exported to pluggable sinks.
+
+    Every stage is measured in a Span, which is logged and handed to the sinks once it ends. A failing sink is logged
+    and never fails the task. The trace id is derived from the DAG id and run id, so the spans of all the tasks of a run correlate.
+
+    The sinks are configured with PSR_METRICS_SINKS, a comma separated list of:
+    - statsd: PSR_STATSD_HOST (localhost), PSR_STATSD_PORT (8125) and PSR_STATSD_PREFIX (psr)
+    - otel: the globally configured OpenTelemetry tracer provider
+    - file: PSR_METRICS_FILE (metrics.jsonl)
+    """
+
+    SINKS_VARIABLE = 'PSR_METRICS_SINKS'
+
+    def __init__(self, sinks: list[MetricsSink] | None = None, dag_id: str = '', run_id: str = '', **attributes: Any) -> None:
+        """Initialize the instrumentation of a task.
+
+        :param sinks: sinks of the finished spans, the spans are only logged if None
+        :param dag_id: DAG id
+        :param run_id: DAG run id
+        :param attributes: further labels of every span, e.g. task_id and try_number
+        """
+        digest = hashlib.sha256(f"{dag_id}|{run_id}".encode()).hexdigest()
+        self.sinks = sinks or []
+        self.trace_id = digest[:32]
+        self.parent_id = digest[32:48]
+        self.attributes = {'dag_id': dag_id, 'run_id': run_id, **attributes}
+
+    @staticmethod
+    def configured_sinks() -> list[MetricsSink]:
+        """Create the sinks listed in the environment.
+
+        An unknown sink is skipped with a warning, a typo in the environment must not fail the tasks.
+
+        :return: sinks, empty if none is configured
+        """
+        factories: dict[str, Callable[[], MetricsSink]] = {
+            'statsd': lambda: StatsDSink(os.environ.get('PSR_STATSD_HOST', 'localhost'), int(os.environ.get('PSR_STATSD_PORT', StatsDSink.PORT)),
+                                         os.environ.get('PSR_STATSD_PREFIX', StatsDSink.PREFIX)),
+            'otel': OpenTelemetrySink,
+            'file': lambda: FileSink(os.environ.get('PSR_METRICS_FILE', 'metrics.jsonl')),
+        }
+        names = [name.strip() for name in os.environ.get(Metrics.SINKS_VARIABLE, '').split(',') if name.strip()]
+        if unknown := set(names) - set(factories):
+            logger.warning(f"Skipping unknown metrics sinks in {Metrics.SINKS_VARIABLE}: {sorted(unknown)}, expected some of {sorted(factories)}")
+
+        return [factories[name]() for name in names if name in factories]
+
+    @classmethod
+    def from_context(cls, context: Mapping[str, Any]) -> 'Metrics':
+        """Instrument a task with the sinks of the environment.
+
+        :param context: task context with the task instance under 'ti'
+        :return: instrumentation labelled with the DAG run and task
+        """
+        ti = context['ti']
+
+        return cls(cls.configured_sinks(), ti.dag_id, ti.run_id, task_id=ti.task_id, try_number=ti.try_number, map_index=ti.map_index)
+
+    def span(self, name: str, **attributes: Any) -> Span:
+        """Start a span.
+
+        :param name: stage name
+        :param attributes: labels of the stage
+        :return: started span, ended with emit
+        """
+        return Span(name, self.trace_id, self.parent_id, {**self.attributes, **attributes})
+
+    def emit(self, span: Span) -> None:
+        """Log a finished span and hand it to every sink.
+
+        :param span: finished span
+        """
+        logger.info(f"Stage {span.name} {'failed' if span.error else 'done'} in {span.duration or 0:.3f}s: {span.counters}")
+
+        for sink in self.sinks:
+            try:
+                sink.emit(span)
+            except Exception as e:
+                logger.warning(f"Metrics sink {type(sink).__name__} failed: {e!r}")
+
+    @contextmanager
+    def stage(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Measure a stage and emit its span once it ends, whether it succeeds or fails.
+
+        :param name: stage name, e.g. 'fetch', 'validate', 'transform' or 'sync'
+        :param attributes: labels of the stage
+        :return: the span to record counters and requests on
+        """
+        span = self.span(name, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(error=e)
+            raise
+        else:
+            span.finish()
+        finally:
+            self.emit(span)
+
+    @staticmethod
+    def metered(items: Iterable[T], span: Span, size: Callable[[T], int] = lambda _: 1) -> Iterator[T]:
+        """Accumulate the time spent producing the items of an iterator on a span and count them as rows.
+
+        The time of a stage of a generator pipeline includes the stages upstream of it, see StreamHelper.sync.
+
+        :param items: items of the stage
+        :param span: span of the stage
+        :param size: rows of an item
+        :return: the items unchanged
+        """
+        iterator = iter(items)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                span.elapsed += time.perf_counter() - started
+            span.add('rows', size(item))
+            yield item
@@ -0,0 +1,241 @@
+import argparse
+import logging
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import Any
+import time
+import pendulum
+from helper.api_helper import APIHelper
+from helper.metrics import Metrics
+from model.dataset import Dataset
+from model.destination import DestinationPostgreSQL
+from model.landing import LandingZone
+from model.source import SourceAPI
+from validation.data_validation import DataValidator
+from validation.fast_validation import FastDataValidator
+
+
+class StreamHelper:
+    """Generator stages which move API records to the destination in bounded batches.
+
+    Each stage pulls one batch at a time from the previous one, so memory stays flat whatever the length of the range:
+    SourceAPI.stream_records -> batched -> validated -> deduplicated -> watermarked -> transformed -> DestinationPostgreSQL.bulk_sync
+
+    replay runs the same stages over the payloads archived in the landing zone instead of the API.
+    The stages map and validate the records of the dataset given, the wind and solar dataset by default.
+    """
+
+    BATCH_SIZE = 1000  # Records per batch, within the row bound of the volume suite
+
+    @staticmethod
+    def batched(records: Iterable[dict[str, Any]], size: int = BATCH_SIZE) -> Iterator[list[dict[str, Any]]]:
+        """Group records into batches.
+
+        :param records: API records
+        :param size: records per batch
+        :return: lists of at most size records
+        """
+        records = iter(records)
+        while batch := list(islice(records, size)):
+            yield batch
+
+    @staticmethod
+    def validated(batches: Iterable[list[dict[str, Any]]], dataset: Dataset | None = None) -> Iterator[list[dict[str, Any]]]:
+        """Validate every batch with the fast path and confirm a failure with the Great Expectations checkpoints.
+
+        :param batches: batches of API records
+        :param dataset: dataset of the records, whose suites and checkpoints are evaluated
+        :return: the batches which passed
+        :raise ValueError: on the first batch failing validation
+        """
+        suites, checkpoints = (dataset.suites, dataset.checkpoints) if dataset else (None, None)
+        for number, batch in enumerate(batches):
+            if not FastDataValidator(batch, suites=suites).validate() and not DataValidator(batch, checkpoints).validate():
+                raise ValueError(f"Batch {number} of {len(batch)} records failed validation")
+            yield batch
+
+    @staticmethod
+    def deduplicated(batches: Iterable[list[dict[str, Any]]], stats: dict[str, int],
+                     dataset: Dataset | None = None) -> Iterator[list[dict[str, Any]]]:
+        """Drop the records of every batch superseded by a later revision of the same curve and curve date in the batch.
+
+        Duplicates split across batches are left to bulk_sync, which keeps the row published last.
+
+        :param batches: batches of API records
+        :param stats: dictionary whose 'duplicates' count is updated in place
+        :param dataset: dataset of the records, whose fields name the curves
+        :return: the batches without their superseded records
+        """
+        fields = dataset.fields if dataset else None
+        for batch in batches:
+            data, dropped = APIHelper.deduplicate({'data': batch}, fields)
+            stats['duplicates'] = stats.get('duplicates', 0) + dropped
+            yield data['data']
+
+    @staticmethod
+    def pipeline(batches: Iterable[list[dict[str, Any]]], watermarks: dict[str, tuple[str, str]], stats: dict[str, int],
+                 dataset: Dataset | None = None) -> Iterator[tuple[str, str, float, str]]:
+        """Chain the stages after validation: deduplicated, watermarked and transformed.
+
+        :param batches: validated batches of API records
+        :param watermarks: dictionary updated in place
+        :param stats: dictionary whose 'duplicates' count is updated in place
+        :param dataset: dataset of the records
+        :return: destination rows
+        """
+        batches = StreamHelper.deduplicated(batches, stats, dataset)
+
+        return StreamHelper.transformed(StreamHelper.watermarked(batches, watermarks, dataset), dataset)
+
+    @staticmethod
+    def watermarked(batches: Iterable[list[dict[str, Any]]], watermarks: dict[str, tuple[str, str]],
+                    dataset: Dataset | None = None) -> Iterator[list[dict[str, Any]]]:
+        """Collect the latest publish time and curve date per curve of the batches passing through.
+
+        :param batches: batches of API records
+        :param watermarks: dictionary updated in place
+        :param dataset: dataset of the records, whose fields name the curves
+        :return: the batches unchanged
+        """
+        fields = dataset.fields if dataset else None
+        for batch in batches:
+            for curve_name, (publish_time, curve_date) in APIHelper.watermarks({'data': batch}, fields).items():
+                latest = watermarks.get(curve_name, (publish_time, curve_date))
+                watermarks[curve_name] = (max(latest[0], publish_time), max(latest[1], curve_date))
+            yield batch
+
+    @staticmethod
+    def transformed(batches: Iterable[list[dict[str, Any]]], dataset: Dataset | None = None) -> Iterator[tuple[str, str, float, str]]:
+        """Transform the batches into destination rows carrying their publish time.
+
+        :param batches: batches of API records
+        :param dataset: dataset of the records, whose fields are mapped to the rows
+        :return: rows of curve name, curve date, value and publish time
+        """
+        fields = dataset.fields if dataset else None
+        for batch in batches:
+            yield from APIHelper.revisions({'data': batch}, fields)
+
+    @staticmethod
+    def sync(source: SourceAPI, destination: DestinationPostgreSQL, from_date: pendulum.DateTime, to_date: pendulum.DateTime,  # noqa: PLR0913
+             chunk: pendulum.Duration | None = None, metrics: Metrics | None = None, dataset: Dataset | None = None) -> int:
+        """Stream a range from the API into the destination with COPY and advance the watermarks in the same transaction.
+
+        With metrics, one span is emitted per stage: fetch, validate, transform and sync. The stages run interleaved,
+        so the wall time of a stage is the time spent producing its output minus the time of the stages upstream of it.
+
+        :param source: API source
+        :param destination: destination table
+        :param from_date: from start date in datetime format
+        :param to_date: to start date in datetime format
+        :param chunk: length of a request window, one request for the whole range if None
+        :param metrics: instrumentation of the task, the stages are not measured if None
+        :param dataset: dataset of the source, the wind and solar dataset if None
+        :return: number of rows loaded
+        """
+        watermarks: dict[str, tuple[str, str]] = {}
+        stats: dict[str, int] = {'duplicates': 0}
+
+        if metrics is None:
+            batches = StreamHelper.batched(source.stream_records(from_date, to_date, chunk), StreamHelper.BATCH_SIZE)
+            rows = StreamHelper.pipeline(StreamHelper.validated(batches, dataset), watermarks, stats, dataset)
+
+            return destination.bulk_sync(rows, mode=destination.LOAD_COPY, watermarks=watermarks)
+
+        spans = {stage: metrics.span(stage, streamed=True) for stage in ('fetch', 'validate', 'transform', 'sync')}
+        source.span = spans['fetch']
+        records = Metrics.metered(source.stream_records(from_date, to_date, chunk), spans['fetch'])
+        batches = Metrics.metered(StreamHelper.validated(StreamHelper.batched(records, StreamHelper.BATCH_SIZE), dataset), spans['validate'], len)
+        rows = Metrics.metered(StreamHelper.pipeline(batches, watermarks, stats, dataset), spans['transform'])
+
+        started, error = time.perf_counter(), None
+        try:
+            count = destination.bulk_sync(rows, mode=destination.LOAD_COPY, watermarks=watermarks)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            spans['transform'].add('duplicates', stats['duplicates'])
+            spans['sync'].add('rows', spans['transform'].counters.get('rows', 0))
+            if error is None:
+                for counter, value in destination.sync_stats.items():
+                    spans['sync'].add(f'db_{counter}', value)
+
+            upstream = 0.0
+            for stage in ('fetch', 'validate', 'transform'):
+                spans[stage].finish(spans[stage].elapsed - upstream, error)
+                upstream = spans[stage].elapsed
+            spans['sync'].finish(time.perf_counter() - started - upstream, error)
+
+            for span in spans.values():
+                metrics.emit(span)
+
+        return count
+
+    @staticmethod
+    def replay(landing: LandingZone, destination: DestinationPostgreSQL, date_from: str, date_to: str,
+               dataset: Dataset | None = None) -> dict[str, int]:
+        """Reload the archived payloads of a range of settlement dates without requesting the API.
+
+        The files are streamed one after the other, in order of settlement date and fetch time, each one validated,
+        transformed and synced in its own transaction. Only the latest revision of every window is replayed, and of
+        overlapping windows the one fetched last is loaded last.
+
+        :param landing: landing zone of the API payloads
+        :param destination: destination table
+        :param date_from: first settlement date as YYYY-MM-DD
+        :param date_to: last settlement date as YYYY-MM-DD
+        :param dataset: dataset of the archived payloads, the wind and solar dataset if None
+        :return: number of files, rows loaded, inserted, updated and records dropped as duplicates
+        :raise ValueError: on the first file failing validation, the files before it stay loaded
+        """
+        totals = {'files': 0, 'rows': 0, 'inserted': 0, 'updated': 0, 'duplicates': 0}
+
+        for path in landing.files(date_from, date_to):
+            watermarks: dict[str, tuple[str, str]] = {}
+            stats: dict[str, int] = {'duplicates': 0}
+            batches = StreamHelper.batched(landing.records(path), StreamHelper.BATCH_SIZE)
+            rows = StreamHelper.pipeline(StreamHelper.validated(batches, dataset), watermarks, stats, dataset)
+
+            try:
+                totals['rows'] += destination.bulk_sync(rows, mode=destination.LOAD_COPY, watermarks=watermarks)
+            except ValueError as e:
+                raise ValueError(f"Replay of {path} failed: {e}") from e
+
+            totals['files'] += 1
+            totals['inserted'] += destination.sync_stats['inserted']
+            totals['updated'] += destination.sync_stats['updated']
+            totals['duplicates'] += stats['duplicates'] + destination.sync_stats['duplicates']
+
+        logging.info(f"Replayed settlement dates {date_from} to {date_to}: {totals}")
+
+        return totals
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Replay the landing zone from the command line.
+
+    PYTHONPATH=dags python -m helper.stream_helper --dataset psr --date-from 2024-01-01 --date-to 2024-03-31
+    """
+    parser = argparse.ArgumentParser(description="Reload the archived API payloads of a range of settlement dates into the destination table.")
+    parser.add_argument("--dataset", default="psr", help="Name of the dataset in the registry.")
+    parser.add_argument("--date-from", required=True, help="First settlement date, YYYY-MM-DD.")
+    parser.add_argument("--date-to", required=True, help="Last settlement date, YYYY-MM-DD.")
+    parser.add_argument("--landing-dir", help="Root of the landing zone, $PSR_LANDING_DIR or $AIRFLOW_HOME/landing by default.")
+    parser.add_argument("--table", help="Name of the destination table, the table of the dataset by default.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("great_expectations").setLevel(logging.WARNING)
+
+    dataset = Dataset.get(args.dataset)
+    destination = DestinationPostgreSQL(args.table or dataset.table)
+    try:
+        destination.table_maintenance()
+        StreamHelper.replay(LandingZone(args.landing_dir, dataset=dataset.name), destination, args.date_from, args.date_to, dataset)
+    finally:
+        destination.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+from airflow.models.xcom import BaseXCom
+from airflow.utils.context import Context
+
+
+class ReferenceXComBackend(BaseXCom):
+    """XCom backend which keeps tabular payloads in local Parquet files and passes only a reference through the metadata DB.
+
+    Two shapes are offloaded once they reach MIN_ROWS rows, everything else is stored as usual:
+    - API payloads, a dictionary with a 'data' list of records (Fetcher and Validator output).
+    - Lists of equally sized tuples (Transformer output).
+
+    Enable it with `AIRFLOW__CORE__XCOM_BACKEND=helper.xcom_backend.ReferenceXComBackend`. The files live under
+    `$PSR_XCOM_DIR` (default `$AIRFLOW_HOME/xcom`), one directory per DAG run, which `cleanup` removes once the run succeeded.
+    """
+
+    REFERENCE_KEY = '__xcom_reference__'
+    MIN_ROWS = int(os.environ.get('PSR_XCOM_MIN_ROWS', 100))  # Smaller payloads are not worth a file
+    RETENTION = 7 * 24 * 3600  # Seconds after which run directories left behind by failed runs are pruned
+
+    @staticmethod
+    def store_dir() -> Path:
+        """Get the root directory of the offloaded payloads."""
+        return Path(os.environ.get('PSR_XCOM_DIR') or Path(os.environ['AIRFLOW_HOME']) / 'xcom')
+
+    @staticmethod
+    def run_dir(dag_id: str, run_id: str) -> Path:
+        """Get the directory of a DAG run.
+
+        :param dag_id: DAG id
+        :param run_id: DAG run id
+        :return: directory path
+        """
+        return ReferenceXComBackend.store_dir() / quote(dag_id, safe='') / quote(run_id, safe='')
+
+    @staticmethod
+    def tabular(value: Any) -> str | None:
+        """Identify the payload shapes which are offloaded.
+
+        :param value: XCom value
+        :return: 'records', 'rows' or None if the value is kept in the metadata DB
+        """
+        if (isinstance(value, dict) and isinstance(value.get('data'), list) and len(value['data']) >= ReferenceXComBackend.MIN_ROWS
+                and all(isinstance(item, dict) for item in value['data'])):
+            return 'records'
+        if (isinstance(value, list) and len(value) >= ReferenceXComBackend.MIN_ROWS and all(isinstance(item, tuple) for item in value)
+                and len({len(item) for item in value}) == 1):
+            return 'rows'
+
+        return None
+
+    @staticmethod
+    def write(value: Any, kind: str, path: Path) -> None:
+        """Write a tabular payload to a Parquet file.
+
+        :param value: XCom value
+        :param kind: 'records' or 'rows'
+        :param path: target file
+        """
+        import json
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if kind == 'records':
+            table = pa.Table.from_pylist(value['data'])
+            # Keep the rest of the API payload next to the records
+            table = table.replace_schema_metadata({'payload': json.dumps({k: v for k, v in value.items() if k != 'data'})})
+        else:
+            table = pa.table({f'c{i}': list(column) for i, column in enumerate(zip(*value, strict=True))})
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        pq.write_table(table, tmp)
+        tmp.replace(path)
+
+    @staticmethod
+    def read(reference: dict[str, Any]) -> Any:
+        """Load a payload written by `write`.
+
+        :param reference: reference stored in XCom
+        :return: original value
+        """
+        import json
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(reference['path'])
+
+        if reference['kind'] == 'records':
+            payload = json.loads(table.schema.metadata[b'payload'])
+            payload['data'] = table.to_pylist()
+            return payload
+
+        return list(zip(*(column.to_pylist() for column in table.columns), strict=True))
+
+    @staticmethod
+    def serialize_value(value: Any, *, key: str | None = None, task_id: str | None = None, dag_id: str | None = None,  # noqa: PLR0913
+                        run_id: str | None = None, map_index: int | None = None) -> Any:
+        """Offload tabular payloads to a file and serialize the reference instead."""
+        kind = ReferenceXComBackend.tabular(value)
+
+        if kind is not None and dag_id and run_id and task_id:
+            path = ReferenceXComBackend.run_dir(dag_id, run_id) / quote(f'{task_id}.{map_index}.{key}.parquet', safe='')
+            ReferenceXComBackend.write(value, kind, path)
+            value = {ReferenceXComBackend.REFERENCE_KEY: True, 'kind': kind, 'path': str(path),
+                     'rows': len(value['data'] if kind == 'records' else value)}
+
+        return BaseXCom.serialize_value(value, key=key, task_id=task_id, dag_id=dag_id, run_id=run_id, map_index=map_index)
+
+    @staticmethod
+    def is_reference(value: Any) -> bool:
+        """Check if a deserialized value is a reference to an offloaded payload."""
+        return isinstance(value, dict) and value.get(ReferenceXComBackend.REFERENCE_KEY) is True
+
+    @staticmethod
+    def deserialize_value(result: Any) -> Any:
+        """Deserialize the value and load the payload if it is a reference."""
+        value = BaseXCom.deserialize_value(result)
+
+        return ReferenceXComBackend.read(value) if ReferenceXComBackend.is_reference(value) else value
+
+    def orm_deserialize_value(self) -> Any:
+        """Show only the reference in the web UI instead of loading the file."""
+        return BaseXCom._deserialize_value(self, True)
+
+    @staticmethod
+    def purge(xcom: Any, session: Any) -> None:
+        """Delete the file of an XCom entry which is cleared, e.g. when its task is re-run."""
+        try:
+            value = BaseXCom.deserialize_value(xcom)
+        except Exception:
+            return
+
+        if ReferenceXComBackend.is_reference(value):
+            Path(value['path']).unlink(missing_ok=True)
+
+    @staticmethod
+    def cleanup(context: Context) -> None:
+        """Remove the payloads of a finished DAG run and prune directories of runs older than the retention.
+
+        Intended as DAG `on_success_callback`; runs which failed keep their files so that cleared tasks can be re-run.
+
+        :param context: Airflow callback context
+        """
+        dag_run = context['dag_run']
+        shutil.rmtree(ReferenceXComBackend.run_dir(dag_run.dag_id, dag_run.run_id), ignore_errors=True)
+
+        expired = time.time() - ReferenceXComBackend.RETENTION
+        for run in ReferenceXComBackend.store_dir().glob('*/*'):
+            if run.is_dir() and run.stat().st_mtime < expired:
+                shutil.rmtree(run, ignore_errors=True)
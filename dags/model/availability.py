@@ -0,0 +1,162 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Mapping
+from typing import TYPE_CHECKING, Any, cast
+import pendulum
+from airflow.exceptions import AirflowSensorTimeout, AirflowSkipException
+from airflow.sensors.base import BaseSensorOperator
+from airflow.triggers.base import BaseTrigger, TriggerEvent
+from airflow.utils.context import Context
+
+# The sensor is instantiated whenever the DAG file is parsed, the HTTP clients are only imported to poll
+if TYPE_CHECKING:
+    import aiohttp
+
+
+class DataAvailabilityTrigger(BaseTrigger):
+    """Poll the API asynchronously in the triggerer until a settlement period is published.
+
+    Only the period itself is requested and the response is parsed up to its first record, so a poll is cheap.
+    Failed requests are logged and polled again, the trigger fires once with the status 'available' or 'timeout'.
+    """
+
+    def __init__(self, period: str, poke_interval: float, deadline: float | None = None, endpoint: str | None = None) -> None:
+        """Initialize the trigger.
+
+        :param period: start of the settlement period as ISO 8601 string
+        :param poke_interval: seconds between two polls
+        :param deadline: epoch seconds after which the trigger gives up, it polls forever if None
+        :param endpoint: URL template of the dataset, SourceAPI.API_URL if None
+        """
+        super().__init__()  # type: ignore[no-untyped-call]
+        self.period = period
+        self.poke_interval = poke_interval
+        self.deadline = deadline
+        self.endpoint = endpoint
+
+    def serialize(self) -> tuple[str, dict[str, Any]]:
+        """Serialize the arguments to hand the trigger over to the triggerer."""
+        return (f"{self.__class__.__module__}.{self.__class__.__qualname__}",
+                {"period": self.period, "poke_interval": self.poke_interval, "deadline": self.deadline, "endpoint": self.endpoint})
+
+    async def available(self, session: 'aiohttp.ClientSession') -> bool:
+        """Check the API has at least one record for the period.
+
+        :param session: HTTP session of the trigger
+        :return: True once the period is published
+        """
+        import aiohttp
+        import ijson  # type: ignore
+        from .source import SourceAPI
+
+        period = cast(pendulum.DateTime, pendulum.parse(self.period))
+        timeout = aiohttp.ClientTimeout(sock_connect=SourceAPI.TIMEOUT[0], sock_read=SourceAPI.TIMEOUT[1])
+
+        async with session.get(SourceAPI(endpoint=self.endpoint).url(period, period), timeout=timeout) as response:
+            if response.status != SourceAPI.STATUS_OK:
+                self.log.warning(f"Availability check of {self.period} failed: {response.status}")
+                return False
+
+            async for _ in ijson.items(response.content, 'data.item'):
+                return True
+
+        return False
+
+    async def run(self) -> AsyncIterator[TriggerEvent]:
+        """Poll until the period is published or the deadline has passed."""
+        import aiohttp
+        import ijson
+
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    if await self.available(session):
+                        yield TriggerEvent({"status": "available", "period": self.period})
+                        return
+                except (aiohttp.ClientError, TimeoutError, ijson.JSONError) as e:
+                    self.log.warning(f"Availability check of {self.period} failed: {e!r}")
+
+                if self.deadline is not None and time.time() >= self.deadline:
+                    yield TriggerEvent({"status": "timeout", "period": self.period})
+                    return
+
+                await asyncio.sleep(self.poke_interval)
+
+
+class DataAvailabilitySensor(BaseSensorOperator):
+    """Wait until the last settlement period of a window is published, without holding a worker slot.
+
+    The period is checked once synchronously, which passes straight through when the data is already there.
+    Otherwise the task is deferred to DataAvailabilityTrigger and resumed by the triggerer as soon as the data is published.
+    The window is returned, so that downstream tasks can consume it from XCom.
+    """
+
+    template_fields = ("window",)
+
+    POKE_INTERVAL = 60  # Seconds between two polls of the trigger
+    TIMEOUT = 2 * 60 * 60  # Seconds to wait before the task fails, or is skipped with soft_fail
+
+    def __init__(self, window: Any, poke_interval: float = POKE_INTERVAL, timeout: float = TIMEOUT, endpoint: str | None = None,
+                 skip_param: str | None = None, **kwargs: Any) -> None:
+        """Initialize the sensor.
+
+        :param window: dictionary with date_from and date_to, e.g. the XCom of the parameterize task
+        :param poke_interval: seconds between two polls
+        :param timeout: seconds to wait for the data
+        :param endpoint: URL template of the dataset, SourceAPI.API_URL if None
+        :param skip_param: DAG param which skips the sensor when true, e.g. a flag routing the window to another task
+        """
+        super().__init__(poke_interval=poke_interval, timeout=timeout, **kwargs)
+        self.window = window
+        self.endpoint = endpoint
+        self.skip_param = skip_param
+
+    @property
+    def period(self) -> pendulum.DateTime:
+        """Last settlement period of the window."""
+        date_to = self.window["date_to"]
+
+        return date_to if isinstance(date_to, pendulum.DateTime) else cast(pendulum.DateTime, pendulum.parse(str(date_to)))
+
+    def poke(self, context: Context) -> bool:
+        """Check the API has at least one record for the last period of the window."""
+        from .source import SourceAPI
+
+        records = SourceAPI(endpoint=self.endpoint).stream_window(self.period, self.period)
+        try:
+            return next(records, None) is not None
+        finally:
+            records.close()
+
+    def execute(self, context: Context) -> Any:
+        """Return the window if it is published, defer to the trigger otherwise."""
+        params: Mapping[str, Any] = context.get("params") or {}  # With the run conf, unlike the params of the operator
+        if self.skip_param and params.get(self.skip_param):
+            raise AirflowSkipException(f"The window is not waited for, the '{self.skip_param}' param is set")
+
+        try:
+            if self.poke(context):
+                return self.window
+        except Exception as e:
+            self.log.warning(f"Availability check of {self.period} failed: {e!r}")
+
+        self.log.info(f"Period {self.period} is not published yet, deferring")
+        self.defer(trigger=DataAvailabilityTrigger(self.period.to_iso8601_string(), self.poke_interval, time.time() + self.timeout, self.endpoint),
+                   method_name="execute_complete")
+
+    def execute_complete(self, context: Context, event: dict[str, Any]) -> Any:
+        """Resume once the trigger fired.
+
+        :param context: task context
+        :param event: payload of the trigger event
+        :return: the window
+        :raise AirflowSensorTimeout: if the data was not published in time
+        """
+        if event["status"] == "available":
+            self.log.info(f"Period {event['period']} is published")
+            return self.window
+
+        message = f"Period {event['period']} was not published within {self.timeout} seconds"
+        if self.soft_fail:
+            raise AirflowSkipException(message)
+        raise AirflowSensorTimeout(message)
@@ -0,0 +1,113 @@
+from typing import Any
+from psycopg2 import extras
+from psycopg2._psycopg import cursor
+from .postgres import PostgresSQL
+
+
+class BackfillStatus(PostgresSQL):
+    """The class keeps the progress of the backfill windows in PostgreSQL.
+
+    A window is identified by its inclusive range of settlement periods. Once it is 'done' it is left out of later plans
+    for the same range, so a new run of a failed backfill only loads the windows which did not complete.
+    """
+
+    TABLE_NAME = 'psr_backfill'
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self) -> None:
+        """Initialize class."""
+        super().__init__()
+
+        self.connect()  # Instantiate a connection
+
+    def table_maintenance(self) -> None:
+        """Create the status table if it doesn't exist."""
+        self.query(f"""
+        CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
+            date_from TIMESTAMP NOT NULL,
+            date_to TIMESTAMP NOT NULL,
+            status VARCHAR(16) NOT NULL DEFAULT '{self.PENDING}',
+            rows INTEGER,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            updated_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'UTC'),
+            PRIMARY KEY (date_from, date_to)
+        );
+
+        COMMENT ON TABLE {self.TABLE_NAME} IS 'Progress of the backfill windows, one row per inclusive range of settlement periods.';
+        """)
+
+    def statuses(self, cur: cursor, windows: list[dict[str, str]]) -> list[tuple[str, str, str, int | None]]:
+        """Get the recorded status of windows.
+
+        @param cur: cursor of an open transaction
+        @param windows: windows with date_from and date_to as UTC ISO 8601 strings
+        @return: date_from, date_to, status and rows loaded of every recorded window
+        """
+        rows: list[tuple[str, str, str, int | None]] = extras.execute_values(cur, f"""
+            SELECT window_range.date_from, window_range.date_to, status.status, status.rows
+            FROM (VALUES %s) AS window_range (date_from, date_to)
+            JOIN {self.TABLE_NAME} AS status
+              ON status.date_from = window_range.date_from::TIMESTAMPTZ AT TIME ZONE 'UTC'
+             AND status.date_to = window_range.date_to::TIMESTAMPTZ AT TIME ZONE 'UTC'
+        """, [(window["date_from"], window["date_to"]) for window in windows], page_size=len(windows), fetch=True)
+
+        return rows
+
+    def plan(self, windows: list[dict[str, str]]) -> list[dict[str, str]]:
+        """Register the windows of a backfill and get the ones still to load.
+
+        @param windows: windows with date_from and date_to as UTC ISO 8601 strings
+        @return: the windows which are not done, in the given order
+        """
+        if not windows:
+            return []
+
+        with self.transaction() as cur:
+            extras.execute_values(cur, f"INSERT INTO {self.TABLE_NAME} (date_from, date_to) VALUES %s ON CONFLICT DO NOTHING",
+                                  [(window["date_from"], window["date_to"]) for window in windows],
+                                  template="(%s::TIMESTAMPTZ AT TIME ZONE 'UTC', %s::TIMESTAMPTZ AT TIME ZONE 'UTC')")
+            done = {(date_from, date_to) for date_from, date_to, status, _ in self.statuses(cur, windows) if status == self.DONE}
+
+        return [window for window in windows if (window["date_from"], window["date_to"]) not in done]
+
+    def update(self, window: dict[str, str], status: str, rows: int | None = None, error: str | None = None) -> None:
+        """Record the status of a window, a start counts as an attempt.
+
+        @param window: window with date_from and date_to as UTC ISO 8601 strings
+        @param status: one of 'pending', 'running', 'done' or 'failed'
+        @param rows: number of rows loaded
+        @param error: message of the failure
+        """
+        with self.transaction() as cur:
+            cur.execute(f"""
+                INSERT INTO {self.TABLE_NAME} AS target (date_from, date_to, status, rows, attempts, error)
+                VALUES (%(from)s::TIMESTAMPTZ AT TIME ZONE 'UTC', %(to)s::TIMESTAMPTZ AT TIME ZONE 'UTC', %(status)s, %(rows)s, %(attempt)s, %(error)s)
+                ON CONFLICT (date_from, date_to) DO UPDATE SET
+                    status = EXCLUDED.status,
+                    rows = EXCLUDED.rows,
+                    attempts = target.attempts + EXCLUDED.attempts,
+                    error = EXCLUDED.error,
+                    updated_at = now() AT TIME ZONE 'UTC'
+            """, {'from': window["date_from"], 'to': window["date_to"], 'status': status, 'rows': rows,
+                  'attempt': int(status == self.RUNNING), 'error': error})
+
+    def summary(self, windows: list[dict[str, str]]) -> dict[str, Any]:
+        """Count windows by status.
+
+        @param windows: windows with date_from and date_to as UTC ISO 8601 strings
+        @return: number of windows by status, unrecorded ones as 'pending', and the total number of rows loaded
+        """
+        with self.transaction() as cur:
+            recorded = self.statuses(cur, windows) if windows else []
+
+        counts: dict[str, int] = {}
+        for _, _, status, _ in recorded:
+            counts[status] = counts.get(status, 0) + 1
+        if len(windows) > len(recorded):
+            counts[self.PENDING] = counts.get(self.PENDING, 0) + len(windows) - len(recorded)
+
+        return {'windows': counts, 'rows': sum(rows or 0 for _, _, _, rows in recorded)}
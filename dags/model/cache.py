@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import pendulum
+from pathlib import Path
+from typing import Any, cast
+
+
+class ResponseCache:
+    """Size-bounded on-disk LRU cache of API responses keyed by endpoint and settlement window.
+
+    - A window which had already settled when it was stored never changes and is served forever.
+    - A window stored while it could still be revised is served for `ttl` only.
+    - Least recently used entries are evicted once the cache exceeds `max_bytes`.
+
+    The size of the directory is kept as a running total, so a put only scans the directory when it pushes the total over
+    `max_bytes`, or every `SCAN_EVERY` puts to pick up the entries written by other processes.
+    """
+
+    SETTLE_TIME = pendulum.duration(days=2)  # Age after which the published data of a window is final
+    TTL = pendulum.duration(minutes=10)  # Lifetime of an entry stored before its window settled
+    MAX_BYTES = 512 * 1024 * 1024  # Size bound of the cache directory
+    SCAN_EVERY = 100  # Puts between two scans of the directory while it stays below max_bytes
+    SUFFIX = '.json'
+
+    def __init__(self, directory: str | Path | None = None, settle_time: pendulum.Duration = SETTLE_TIME,
+                 ttl: pendulum.Duration = TTL, max_bytes: int = MAX_BYTES) -> None:
+        """Initialize the cache.
+
+        :param directory: cache directory, $AIRFLOW_HOME/cache/source by default
+        :param settle_time: age after which a window is treated as immutable
+        :param ttl: lifetime of an entry stored before its window settled
+        :param max_bytes: size bound of the cache directory
+        """
+        self.directory = Path(directory or Path(os.environ['AIRFLOW_HOME']) / 'cache' / 'source')
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.settle_time = settle_time
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.size: int | None = None  # Running total of the entry sizes, None until the directory is scanned
+        self.puts = 0
+        self.lock = threading.Lock()
+
+    def path(self, endpoint: str, from_date: pendulum.DateTime, to_date: pendulum.DateTime) -> Path:
+        """Get the file of a window.
+
+        :param endpoint: URL template of the endpoint
+        :param from_date: window start
+        :param to_date: window end
+        :return: path of the cache entry
+        """
+        window = f"{endpoint}|{from_date.in_timezone('UTC').isoformat()}|{to_date.in_timezone('UTC').isoformat()}"
+
+        return self.directory / (hashlib.sha256(window.encode()).hexdigest() + self.SUFFIX)
+
+    def get(self, endpoint: str, from_date: pendulum.DateTime, to_date: pendulum.DateTime) -> dict[str, Any] | None:
+        """Get a cached response.
+
+        :param endpoint: URL template of the endpoint
+        :param from_date: window start
+        :param to_date: window end
+        :return: cached JSON data or None if missing or expired
+        """
+        path = self.path(endpoint, from_date, to_date)
+
+        try:
+            entry = json.loads(path.read_text())
+            stored_at = cast(pendulum.DateTime, pendulum.parse(entry['stored_at']))
+            settled = stored_at - to_date >= self.settle_time
+            if settled or pendulum.now('UTC') - stored_at < self.ttl:
+                path.touch()  # Refresh the LRU position
+                self.count(hit=True)
+                return cast(dict[str, Any], entry['payload'])
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as e:
+            logging.warning(f"Discarding corrupt cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+
+        self.count(hit=False)
+        return None
+
+    def put(self, endpoint: str, from_date: pendulum.DateTime, to_date: pendulum.DateTime, payload: dict[str, Any]) -> None:
+        """Store a response and evict the least recently used entries beyond the size bound.
+
+        :param endpoint: URL template of the endpoint
+        :param from_date: window start
+        :param to_date: window end
+        :param payload: JSON data
+        """
+        path = self.path(endpoint, from_date, to_date)
+        entry = {
+            'endpoint': endpoint,
+            'from': from_date.isoformat(),
+            'to': to_date.isoformat(),
+            'stored_at': pendulum.now('UTC').isoformat(),
+            'payload': payload,
+        }
+
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+
+        # Write atomically, concurrent tasks may read the same window
+        tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        written = tmp.write_bytes(json.dumps(entry).encode())
+        tmp.replace(path)
+
+        with self.lock:
+            self.puts += 1
+            scan = self.size is None or self.size + written - replaced > self.max_bytes or self.puts % self.SCAN_EVERY == 0
+            if not scan:
+                self.size = cast(int, self.size) + written - replaced
+        if scan:
+            self.evict()
+
+    def evict(self) -> None:
+        """Scan the directory and remove the least recently used entries until the cache fits into max_bytes."""
+        entries = []
+        for path in self.directory.glob('*' + self.SUFFIX):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+
+        with self.lock:
+            self.size = size
+
+    def count(self, hit: bool) -> None:
+        """Update the hit and miss counters.
+
+        :param hit: True for a cache hit
+        """
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict[str, int]:
+        """Get the hit and miss counters."""
+        return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,215 @@
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from email.utils import parsedate_to_datetime
+import pendulum
+import requests  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised without a request while the circuit breaker is open."""
+
+
+class TokenBucket:
+    """Client-side rate limiter: requests spend a token, tokens refill at a constant rate up to the capacity.
+
+    The bucket is shared by every thread of the process, so concurrent fetches are limited together.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Initialize the bucket full.
+
+        :param rate: tokens added per second
+        :param capacity: maximum number of tokens, the size of a burst
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, waiting for one if the bucket is empty.
+
+        :return: seconds waited
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
+
+
+class CircuitBreaker:
+    """Fail fast while the API is down instead of holding a worker slot on requests which are bound to fail.
+
+    - closed: requests go through, consecutive failures are counted.
+    - open: after `threshold` consecutive failures, requests raise CircuitOpenError for `reset_timeout` seconds.
+    - half-open: then a single trial request goes through, its success closes the circuit and its failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, threshold: int, reset_timeout: float) -> None:
+        """Initialize the breaker closed.
+
+        :param threshold: consecutive failures opening the circuit
+        :param reset_timeout: seconds the circuit stays open before a trial request
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self) -> None:
+        """Let a request through or fail fast.
+
+        :raise CircuitOpenError: while the circuit is open or a trial request is in flight
+        """
+        with self.lock:
+            if self.state == self.CLOSED:
+                return
+
+            remaining = self.opened + self.reset_timeout - time.monotonic()
+            if self.state == self.OPEN and remaining <= 0:
+                self.state = self.HALF_OPEN  # This request is the trial
+                return
+
+            raise CircuitOpenError(f"Circuit breaker is {self.state} after {self.failures} consecutive failures, "
+                                   f"retry in {max(remaining, 0):.0f}s")
+
+    def success(self) -> None:
+        """Record a successful request, which closes the circuit."""
+        with self.lock:
+            self.state, self.failures = self.CLOSED, 0
+
+    def failure(self) -> None:
+        """Record a failed request, which opens the circuit once the threshold is reached or the trial failed."""
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit breaker opened after {self.failures} consecutive failures")
+                self.state, self.opened = self.OPEN, time.monotonic()
+
+
+class APIClient:
+    """HTTP GET with timeouts, retries, rate limiting and a circuit breaker.
+
+    - Every request has a connect and a read timeout.
+    - Connection errors, timeouts, 429 and 5xx responses are retried with full-jitter exponential backoff.
+      A Retry-After header sets the delay instead; the response is returned as is if it asks to wait longer than `max_backoff`.
+    - Every attempt takes a token from the bucket first.
+    - Connection errors, timeouts and 5xx responses count as failures of the circuit breaker, 429 means the API is up.
+    """
+
+    RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+    TOO_MANY_REQUESTS = 429
+
+    def __init__(self, session: Callable[[], requests.Session], timeout: tuple[float, float], retries: int, backoff: float, max_backoff: float,  # noqa: PLR0913
+                 bucket: TokenBucket, breaker: CircuitBreaker) -> None:
+        """Initialize the client.
+
+        :param session: function getting the HTTP session of the current process
+        :param timeout: connect and read timeout in seconds
+        :param retries: retries after the first attempt
+        :param backoff: base delay in seconds, doubled on every retry
+        :param max_backoff: longest delay in seconds
+        :param bucket: rate limiter shared by the concurrent requests
+        :param breaker: circuit breaker shared by the concurrent requests
+        """
+        self.session = session
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.bucket = bucket
+        self.breaker = breaker
+
+    def delay(self, attempt: int) -> float:
+        """Get the full-jitter backoff of a retry.
+
+        :param attempt: number of the failed attempt, starting at 0
+        :return: seconds to wait
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    @staticmethod
+    def retry_after(response: requests.Response) -> float | None:
+        """Parse the Retry-After header, in seconds or as an HTTP date.
+
+        :param response: HTTP response
+        :return: seconds to wait or None if the header is missing or invalid
+        """
+        value = response.headers.get('Retry-After')
+        if value is None:
+            return None
+
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - pendulum.now('UTC').timestamp(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, url: str, stream: bool = False) -> requests.Response:
+        """Send a GET request, retrying transient failures.
+
+        :param url: URL
+        :param stream: return once the headers are received, the body is read by the caller
+        :return: the response, whose status may still be a failure once the retries are exhausted
+        :raise CircuitOpenError: if the circuit breaker is open
+        :raise requests.RequestException: if the last attempt failed to connect or timed out
+        """
+        attempt = 0
+        while True:
+            self.breaker.allow()
+            self.bucket.acquire()
+
+            try:
+                response = self.session().get(url, timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.breaker.failure()
+                if attempt >= self.retries:
+                    raise
+                delay = self.delay(attempt)
+                logger.warning(f"Request failed, retry {attempt + 1} of {self.retries} in {delay:.1f}s: {e!r}")
+            else:
+                if response.status_code not in self.RETRY_STATUSES:
+                    self.breaker.success()
+                    return response
+
+                if response.status_code == self.TOO_MANY_REQUESTS:
+                    self.breaker.success()  # The API is up, only throttling
+                else:
+                    self.breaker.failure()
+
+                retry_after = self.retry_after(response)
+                if attempt >= self.retries or (retry_after is not None and retry_after > self.max_backoff):
+                    return response
+
+                delay = self.delay(attempt) if retry_after is None else retry_after
+                response.close()
+                logger.warning(f"Request answered {response.status_code}, retry {attempt + 1} of {self.retries} in {delay:.1f}s")
+
+            time.sleep(delay)
+            attempt += 1
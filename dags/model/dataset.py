@@ -0,0 +1,122 @@
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, cast
+import pendulum
+import yaml
+
+
+class Dataset:
+    """Declaration of an API dataset: where it is fetched from, how its records map to curves and where they are loaded.
+
+    The datasets are declared in the registry file, $PSR_DATASETS or datasets.yml in the DAGs folder, one entry per dataset:
+
+        psr:
+          dag_id: psr_sync                   # DAG generated by dag_factory.py, {name}_sync by default
+          endpoint: https://...?from={from_date}&to={to_date}&format=json
+          table: psr                         # Destination table, see DestinationPostgreSQL
+          fields:                            # Record fields of the destination rows
+            curve_name: "bmreports, {psrType}, min30"  # Template filled with the fields of a record
+            curve_date: startTime
+            value: quantity
+            publish_time: publishTime
+          checkpoints: [statistical_checkpoint, completeness_checkpoint]  # Great Expectations checkpoints
+          suites: [distribution, missingness, schema, volume]             # Their suites, evaluated by the fast path
+          schedule: "*/30 * * * *"
+          start_date: 2024-10-13T10:45:00Z
+          tags: [half hourly]
+          description: ...
+    """
+
+    FIELDS = ('curve_name', 'curve_date', 'value', 'publish_time')
+    REQUIRED = ('endpoint', 'table', 'fields', 'checkpoints', 'suites', 'start_date')
+    OPTIONAL = ('dag_id', 'schedule', 'tags', 'description')
+    IDENTIFIER = re.compile(r'^[a-z_][a-z0-9_]*$')  # Table names are interpolated into SQL
+    REGISTRY = Path(__file__).parents[1] / 'datasets.yml'
+
+    registries: dict[tuple[str, float], dict[str, 'Dataset']] = {}
+    registry_lock = threading.Lock()
+
+    def __init__(self, name: str, endpoint: str, table: str, fields: dict[str, str], checkpoints: list[str], suites: list[str],  # noqa: PLR0913
+                 start_date: pendulum.DateTime, dag_id: str | None = None, schedule: str | None = None, tags: list[str] | None = None,
+                 description: str | None = None) -> None:
+        """Initialize the dataset.
+
+        :param name: dataset name, the key in the registry
+        :param endpoint: URL template of the API with {from_date} and {to_date}
+        :param table: name of the destination table
+        :param fields: record fields of curve_name (a template), curve_date, value and publish_time
+        :param checkpoints: Great Expectations checkpoints validating the records
+        :param suites: expectation suites of the checkpoints, evaluated by the fast path
+        :param start_date: start date of the DAG
+        :param dag_id: id of the generated DAG, {name}_sync by default
+        :param schedule: cron expression of the DAG, triggered manually only if None
+        :param tags: tags of the DAG
+        :param description: description of the DAG
+        :raise ValueError: if the declaration is invalid
+        """
+        if missing := set(self.FIELDS) - set(fields):
+            raise ValueError(f"Dataset {name} misses the fields {sorted(missing)}")
+        if '{from_date}' not in endpoint or '{to_date}' not in endpoint:
+            raise ValueError(f"Dataset {name} endpoint must contain {{from_date}} and {{to_date}}")
+        if not self.IDENTIFIER.match(table):
+            raise ValueError(f"Dataset {name} table must be a lowercase SQL identifier, got {table!r}")
+        if not checkpoints or not suites:
+            raise ValueError(f"Dataset {name} must be validated by at least one checkpoint and suite")
+
+        self.name = name
+        self.endpoint = endpoint
+        self.table = table
+        self.fields = dict(fields)
+        self.checkpoints = tuple(checkpoints)
+        self.suites = tuple(suites)
+        self.start_date = start_date
+        self.dag_id = dag_id or f"{name}_sync"
+        self.schedule = schedule
+        self.tags = list(tags or [])
+        self.description = description or f"Sync the {name} dataset from the API to PostgreSQL"
+
+    @classmethod
+    def from_entry(cls, name: str, entry: dict[str, Any]) -> 'Dataset':
+        """Build a dataset from its registry entry.
+
+        :param name: dataset name
+        :param entry: registry entry
+        :return: dataset
+        :raise ValueError: on missing or unknown keys
+        """
+        if missing := set(cls.REQUIRED) - set(entry):
+            raise ValueError(f"Dataset {name} misses the keys {sorted(missing)}")
+        if unknown := set(entry) - set(cls.REQUIRED) - set(cls.OPTIONAL):
+            raise ValueError(f"Dataset {name} has unknown keys {sorted(unknown)}")
+
+        start_date = cast(pendulum.DateTime, pendulum.parse(str(entry['start_date'])))
+
+        return cls(name, **{**entry, 'start_date': start_date})
+
+    @classmethod
+    def registry(cls, path: str | Path | None = None) -> dict[str, 'Dataset']:
+        """Load the registry, once per process and version of the file.
+
+        :param path: registry file, $PSR_DATASETS or datasets.yml in the DAGs folder by default
+        :return: datasets by name, in the order of the file
+        """
+        path = Path(path or os.environ.get('PSR_DATASETS') or cls.REGISTRY)
+        key = (str(path.resolve()), path.stat().st_mtime)
+
+        with cls.registry_lock:
+            if key not in cls.registries:
+                entries = yaml.safe_load(path.read_text()) or {}
+                cls.registries[key] = {name: cls.from_entry(name, entry) for name, entry in entries.items()}
+            return cls.registries[key]
+
+    @classmethod
+    def get(cls, name: str) -> 'Dataset':
+        """Get a dataset of the registry.
+
+        :param name: dataset name
+        :return: dataset
+        :raise KeyError: if the dataset is not declared
+        """
+        return cls.registry()[name]
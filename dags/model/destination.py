@@ -1,46 +1,734 @@
+import argparse
+import io
+import logging
+import os
+import threading
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import pendulum
+from collections.abc import Iterable
+from itertools import chain, islice
+from typing import Any, cast
+from psycopg2 import errors, extras
+from psycopg2._psycopg import cursor
 from .postgres import PostgresSQL
 
+# Row of a load: curve name, curve date, value and optionally the publish time of the record
+Row = tuple[str, str, float] | tuple[str, str, float, str]
+
 
 class DestinationPostgreSQL(PostgresSQL):
-    """The class is intended to sync the API data to PostgreSQL."""
+    """The class is intended to sync the API data to PostgreSQL.
+
+    Rows whose value is unchanged are not rewritten, callers can also compare their records with the rows already loaded
+    in a window beforehand. The latest publishTime and curve_date loaded per curve are tracked in the watermark table, which bounds the rows read for that comparison.
+
+    Curve names are stored once in the curve dimension table and the data table is keyed on (curve_id, curve_date).
+    The view named after TABLE_NAME joins both back into (curve_name, curve_date, value) for the readers.
+    The curve ids are cached per process, so a load only queries the dimension for curves it has not seen yet.
+
+    The data table is range-partitioned by month on curve_date, so upserts and time-range scans only touch the partitions
+    of the months involved. Partitions are created ahead of time by table_maintenance and on demand before every load.
+
+    Hourly and daily rollups (UTC buckets) are maintained in the same transaction as every load: only the buckets of
+    the rows actually inserted or updated are recomputed. rebuild_rollups recomputes any range from scratch.
+    """
 
     TABLE_NAME = 'psr'
+    LOAD_VALUES = 'values'  # Multi-row INSERT through execute_values
+    LOAD_COPY = 'copy'  # COPY into a temporary staging table followed by one set-based upsert
+    LOAD_MODES = (LOAD_VALUES, LOAD_COPY)
+    BATCH_SIZE = 10000  # Rows per execute_values call when the rows come from an iterator
+    PARTITIONS_AHEAD = 3  # Monthly partitions created ahead of the current month
+    READ_FRAME = 'frame'  # pandas DataFrame with a categorical curve_name column
+    READ_ARRAYS = 'arrays'  # NumPy array by column name
+    READ_OUTPUTS = (READ_FRAME, READ_ARRAYS)
+    ROLLUPS = {'hourly': 'hour', 'daily': 'day'}  # Rollup name and its bucket, as a date_trunc field
+    LOCK_SLOTS = 256  # Advisory locks per table the curves and days of the rollups are hashed into, a power of two
+
+    # Curve ids by curve name, keyed by process and oid of the curve table so a recreated table starts over
+    curves: dict[tuple[int, int], dict[str, int]] = {}
+    curves_lock = threading.Lock()
 
-    def __init__(self) -> None:
-        """Initialize class."""
+    def __init__(self, table_name: str | None = None) -> None:
+        """Initialize class.
+
+        @param table_name: name of the destination view, the tables of the dataset are prefixed with it; TABLE_NAME by default
+        """
         super().__init__()
 
+        if table_name is not None:
+            self.TABLE_NAME = table_name
+
         self.connect()  # Instantiate a connection
 
+        # Row counts of the last bulk_sync
+        self.sync_stats = {'inserted': 0, 'updated': 0, 'skipped': 0, 'duplicates': 0}
+        # Curve ids used by the open transaction, written through to the cache once it is committed
+        self.pending_curves: dict[str, int] = {}
+        self.curve_key = (os.getpid(), 0)
+
+    @property
+    def data_table(self) -> str:
+        """Name of the partitioned data table behind the view."""
+        return f"{self.TABLE_NAME}_v2"
+
+    @property
+    def curve_table(self) -> str:
+        """Name of the curve dimension table."""
+        return f"{self.TABLE_NAME}_curve"
+
+    @property
+    def touched_table(self) -> str:
+        """Name of the temporary table collecting the hourly buckets written by a load."""
+        return f"{self.TABLE_NAME}_touched"
+
+    def rollup_table(self, rollup: str) -> str:
+        """Get the name of a rollup table.
+
+        @param rollup: rollup name, a key of ROLLUPS
+        @return: table name, e.g. psr_v2_hourly; the view by curve name is named psr_hourly
+        """
+        return f"{self.data_table}_{rollup}"
+
+    @property
+    def watermark_table(self) -> str:
+        """Name of the watermark table of the destination table."""
+        return f"{self.TABLE_NAME}_watermark"
+
+    def partition_name(self, month: Any) -> str:
+        """Get the name of a monthly partition.
+
+        @param month: first day of the month
+        @return: partition table name, e.g. psr_v2_p2024_01
+        """
+        return f"{self.data_table}_p{month:%Y_%m}"
+
     def table_maintenance(self) -> None:
-        """Create table if it doesn't exist."""
-        self.query(f"""
-        CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
-            curve_name VARCHAR(255),
+        """Create the tables and the view if they don't exist, migrate an earlier layout and create the upcoming partitions."""
+        now = pendulum.now('UTC')
+
+        with self.transaction() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (self.TABLE_NAME,))
+            relkind = cur.fetchone()
+
+            if relkind is not None and relkind[0] in ('r', 'p'):
+                self.migrate_table(cur)
+            else:
+                self.create_table(cur)
+
+            self.ensure_partitions(cur, now.to_datetime_string(), now.add(months=self.PARTITIONS_AHEAD).to_datetime_string())
+            self.create_rollups(cur)
+
+            cur.execute(f"""
+            CREATE INDEX IF NOT EXISTS {self.data_table}_curve_date_brin ON {self.data_table} USING brin (curve_date);
+
+            CREATE OR REPLACE VIEW {self.TABLE_NAME} AS
+            SELECT curve.curve_name, data.curve_date, data.value
+            FROM {self.data_table} AS data JOIN {self.curve_table} AS curve USING (curve_id);
+
+            COMMENT ON TABLE {self.curve_table} IS 'Curve names of {self.TABLE_NAME} and their ids.';
+            COMMENT ON TABLE {self.data_table} IS 'Power generation data for different curves over time, partitioned by month of curve_date.';
+            COMMENT ON COLUMN {self.data_table}.curve_id IS 'The id of the curve in {self.curve_table}.';
+            COMMENT ON VIEW {self.TABLE_NAME} IS 'Power generation data for different curves over time, by curve name.';
+            COMMENT ON COLUMN {self.TABLE_NAME}.curve_name IS 'The name of the curve, representing the type of power generation (e.g., solar, wind).';
+            COMMENT ON COLUMN {self.TABLE_NAME}.curve_date IS 'Timestamp indicating the start_date, stored in UTC.';
+            COMMENT ON COLUMN {self.TABLE_NAME}.value IS 'The measured value associated with the curve at the specified date and time.';
+
+            CREATE TABLE IF NOT EXISTS {self.watermark_table} (
+                curve_name VARCHAR(255) PRIMARY KEY,
+                publish_time TIMESTAMP NOT NULL,
+                curve_date TIMESTAMP NOT NULL,
+                updated_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'UTC')
+            );
+
+            COMMENT ON TABLE {self.watermark_table} IS 'Latest loaded publish time and curve date per curve of {self.TABLE_NAME}.';
+            """)
+
+    def create_table(self, cur: cursor) -> None:
+        """Create the curve dimension and the partitioned data table without any partition, if they don't exist.
+
+        @param cur: cursor of an open transaction
+        """
+        cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {self.curve_table} (
+            curve_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            curve_name VARCHAR(255) NOT NULL UNIQUE
+        );
+
+        CREATE TABLE IF NOT EXISTS {self.data_table} (
+            curve_id INTEGER NOT NULL REFERENCES {self.curve_table} (curve_id),
             curve_date TIMESTAMP NOT NULL,
             value NUMERIC,
-            PRIMARY KEY (curve_name, curve_date)
-        );
+            PRIMARY KEY (curve_id, curve_date)
+        ) PARTITION BY RANGE (curve_date);
+        """)
+
+    def create_rollups(self, cur: cursor) -> None:
+        """Create the rollup tables and their views by curve name if they don't exist, and fill new ones from the data table.
+
+        @param cur: cursor of an open transaction
+        """
+        cur.execute("SELECT to_regclass(%s)", (self.rollup_table('hourly'),))
+        exists = cur.fetchone()[0] is not None
+
+        for rollup in self.ROLLUPS:
+            cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.rollup_table(rollup)} (
+                curve_id INTEGER NOT NULL REFERENCES {self.curve_table} (curve_id),
+                bucket TIMESTAMP NOT NULL,
+                value_sum NUMERIC,
+                value_count INTEGER NOT NULL,
+                value_avg NUMERIC GENERATED ALWAYS AS (value_sum / NULLIF(value_count, 0)) STORED,
+                PRIMARY KEY (curve_id, bucket)
+            );
+
+            CREATE OR REPLACE VIEW {self.TABLE_NAME}_{rollup} AS
+            SELECT curve.curve_name, rollup.bucket, rollup.value_sum, rollup.value_count, rollup.value_avg
+            FROM {self.rollup_table(rollup)} AS rollup JOIN {self.curve_table} AS curve USING (curve_id);
+
+            COMMENT ON TABLE {self.rollup_table(rollup)} IS 'Values of {self.TABLE_NAME} aggregated per curve and {self.ROLLUPS[rollup]} (UTC).';
+            COMMENT ON COLUMN {self.rollup_table(rollup)}.value_count IS 'Number of non-NULL values in the bucket.';
+            """)
+
+        if not exists:
+            self.fill_rollups(cur)
 
-        COMMENT ON TABLE {self.TABLE_NAME} IS 'Power generation data for different curves over time.';
-        COMMENT ON COLUMN {self.TABLE_NAME}.curve_name IS 'The name of the curve, representing the type of power generation (e.g., solar, wind).';
-        COMMENT ON COLUMN {self.TABLE_NAME}.curve_date IS 'Timestamp indicating the start_date, stored in UTC.';
-        COMMENT ON COLUMN {self.TABLE_NAME}.value IS 'The measured value associated with the curve at the specified date and time.';
+    def fill_rollups(self, cur: cursor) -> None:
+        """Fill the rollup tables created by the open transaction from the whole data table, with one aggregate per rollup.
+
+        The new tables are not visible to the other loads before the commit, so the days need no lock.
+
+        @param cur: cursor of an open transaction
+        """
+        cur.execute(f"""
+            INSERT INTO {self.rollup_table('hourly')} (curve_id, bucket, value_sum, value_count)
+            SELECT curve_id, date_trunc('hour', curve_date), sum(value), count(value) FROM {self.data_table} GROUP BY 1, 2;
+
+            INSERT INTO {self.rollup_table('daily')} (curve_id, bucket, value_sum, value_count)
+            SELECT curve_id, date_trunc('day', bucket), sum(value_sum), sum(value_count) FROM {self.rollup_table('hourly')} GROUP BY 1, 2;
+        """)
+
+    def lock_days(self, cur: cursor, hours: str) -> None:
+        """Take the transaction lock of every curve and UTC day of the hours, waiting for the loads holding one.
+
+        The buckets are recomputed from the snapshot of a statement, two loads writing the same curve and day at once would
+        each overwrite the buckets with the rows they see. The curves and days are hashed into LOCK_SLOTS locks, so a load
+        of years stays within max_locks_per_transaction; two loads of different days sharing a slot only wait for each other.
+        The locks are taken in the order of their slot, so two loads cannot deadlock on them.
+
+        @param cur: cursor of an open transaction
+        @param hours: table or parenthesized query with the curve_id and bucket of the hours
+        """
+        cur.execute(f"""
+            SELECT pg_advisory_xact_lock(hashtext('{self.data_table}'), day.slot)
+            FROM (
+                SELECT DISTINCT hashtext(curve_id || ' ' || date_trunc('day', bucket)) & {self.LOCK_SLOTS - 1} AS slot FROM {hours} AS hour ORDER BY 1
+            ) AS day
+        """)
+
+    def refresh_rollups(self, cur: cursor, hours: str) -> None:
+        """Recompute hourly buckets from the data table and the daily buckets containing them from the hourly ones.
+
+        The data table is only upserted into, so a bucket never loses its rows and upserting the buckets is enough.
+        The days are locked first, the buckets are then computed from the rows committed by the loads locking them before.
+        Every bucket aggregates its own range of the primary key (LATERAL), so the cost grows with the rows of the buckets
+        and not with the rows of their curves.
+
+        @param cur: cursor of an open transaction
+        @param hours: table or parenthesized query with the curve_id and bucket of the hours to recompute
+        """
+        self.lock_days(cur, hours)
+        cur.execute(f"""
+            INSERT INTO {self.rollup_table('hourly')} AS target (curve_id, bucket, value_sum, value_count)
+            SELECT hour.curve_id, hour.bucket, data.value_sum, data.value_count
+            FROM {hours} AS hour
+            CROSS JOIN LATERAL (
+                SELECT sum(value) AS value_sum, count(value) AS value_count FROM {self.data_table}
+                WHERE curve_id = hour.curve_id AND curve_date >= hour.bucket AND curve_date < hour.bucket + interval '1 hour'
+            ) AS data
+            ON CONFLICT (curve_id, bucket) DO UPDATE SET value_sum = EXCLUDED.value_sum, value_count = EXCLUDED.value_count;
+
+            INSERT INTO {self.rollup_table('daily')} AS target (curve_id, bucket, value_sum, value_count)
+            SELECT day.curve_id, day.bucket, hourly.value_sum, hourly.value_count
+            FROM (SELECT DISTINCT curve_id, date_trunc('day', bucket) AS bucket FROM {hours} AS hour) AS day
+            CROSS JOIN LATERAL (
+                SELECT sum(value_sum) AS value_sum, coalesce(sum(value_count), 0) AS value_count FROM {self.rollup_table('hourly')}
+                WHERE curve_id = day.curve_id AND bucket >= day.bucket AND bucket < day.bucket + interval '1 day'
+            ) AS hourly
+            ON CONFLICT (curve_id, bucket) DO UPDATE SET value_sum = EXCLUDED.value_sum, value_count = EXCLUDED.value_count;
+        """)
+
+    def rebuild_rollups(self, date_from: Any, date_to: Any) -> dict[str, int]:
+        """Recompute the rollups of the whole UTC days of a range from scratch, e.g. after a manual change of the data table.
+
+        @param date_from: first curve date, a timestamp or a string PostgreSQL casts to one
+        @param date_to: last curve date
+        @return: number of buckets rebuilt by rollup name
+        """
+        bounds = {'from': date_from, 'to': date_to}
+        days = "curve_date >= date_trunc('day', %(from)s::timestamp) AND curve_date < date_trunc('day', %(to)s::timestamp) + interval '1 day'"
+
+        with self.transaction() as cur:
+            cur.execute(f"""
+                CREATE TEMPORARY TABLE {self.touched_table} ON COMMIT DROP AS
+                SELECT DISTINCT curve_id, date_trunc('hour', curve_date) AS bucket FROM {self.data_table} WHERE {days}
+            """, bounds)
+            cur.execute(f"ANALYZE {self.touched_table}")  # Autovacuum never sees temporary tables, the planner would guess their size
+            self.lock_days(cur, self.touched_table)  # Before deleting the buckets, a load holding a day may be writing them
+
+            for rollup in self.ROLLUPS:
+                cur.execute(f"DELETE FROM {self.rollup_table(rollup)} WHERE {days.replace('curve_date', 'bucket')}", bounds)
+
+            self.refresh_rollups(cur, self.touched_table)
+
+            counts = {}
+            for rollup in self.ROLLUPS:
+                cur.execute(f"SELECT count(*) FROM {self.rollup_table(rollup)} WHERE {days.replace('curve_date', 'bucket')}", bounds)
+                counts[rollup] = cur.fetchone()[0]
+
+        logging.info(f"Rebuilt the rollups of {self.TABLE_NAME} from {date_from} to {date_to}: {counts}")
+
+        return counts
+
+    def migrate_table(self, cur: cursor) -> None:
+        """Replace a flat or partitioned table keyed on curve names by the dimension layout, within the caller's transaction.
+
+        The curve names are registered in the dimension, the rows are copied into partitions covering their months
+        and the table is dropped afterwards, so that the view can take its name.
+
+        @param cur: cursor of an open transaction
+        """
+        logging.info(f"Migrating the table {self.TABLE_NAME} to {self.data_table} and {self.curve_table}")
+
+        self.create_table(cur)
+
+        cur.execute(f"""
+            INSERT INTO {self.curve_table} (curve_name)
+            SELECT DISTINCT curve_name FROM {self.TABLE_NAME} ORDER BY curve_name
+            ON CONFLICT (curve_name) DO NOTHING
         """)
 
+        cur.execute(f"SELECT min(curve_date), max(curve_date) FROM {self.TABLE_NAME}")
+        first, last = cur.fetchone()
+        if first is not None:
+            self.ensure_partitions(cur, first, last)
+
+        cur.execute(f"""
+            INSERT INTO {self.data_table} (curve_id, curve_date, value)
+            SELECT curve.curve_id, old.curve_date, old.value
+            FROM {self.TABLE_NAME} AS old JOIN {self.curve_table} AS curve USING (curve_name);
+
+            DROP TABLE {self.TABLE_NAME};
+        """)
+
+    def drop_tables(self) -> None:
+        """Drop the views, the tables and the partitions of the destination, whatever their layout."""
+        with self.transaction() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (self.TABLE_NAME,))
+            relkind = cur.fetchone()
+            if relkind is not None:
+                cur.execute(f"DROP {'VIEW' if relkind[0] == 'v' else 'TABLE'} {self.TABLE_NAME}")
+
+            views = ', '.join(f"{self.TABLE_NAME}_{rollup}" for rollup in self.ROLLUPS)
+            rollups = ', '.join(self.rollup_table(rollup) for rollup in self.ROLLUPS)
+            cur.execute(f"DROP VIEW IF EXISTS {views}")
+            cur.execute(f"DROP TABLE IF EXISTS {rollups}, {self.data_table}, {self.curve_table}, {self.watermark_table}")
+
+    def ensure_partitions(self, cur: cursor, first: Any, last: Any) -> list[str]:
+        """Create the missing monthly partitions of a range of curve dates.
+
+        @param cur: cursor of an open transaction
+        @param first: earliest curve date, a timestamp or a string PostgreSQL casts to one
+        @param last: latest curve date
+        @return: names of the created partitions
+        """
+        cur.execute("""
+            SELECT month::date, (month + interval '1 month')::date
+            FROM generate_series(date_trunc('month', %s::timestamp), date_trunc('month', %s::timestamp), interval '1 month') AS month
+        """, (first, last))
+        months = cur.fetchall()
+
+        cur.execute("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(%s)", (self.data_table,))
+        existing = {row[0] for row in cur.fetchall()}
+
+        created = []
+        for start, end in months:
+            name = self.partition_name(start)
+            if name not in existing:
+                cur.execute(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {self.data_table} FOR VALUES FROM (%s) TO (%s)", (start, end))
+                created.append(name)
+
+        return created
 
-    def bulk_sync(self, data: list[tuple[str, str, float]]) -> int:
+    def curve_ids(self, cur: cursor, names: Iterable[str]) -> dict[str, int]:
+        """Get the ids of curves, registering the unknown ones in the curve dimension.
+
+        Known ids come from the process cache. The ids read or created in the open transaction are kept in pending_curves,
+        bulk_sync writes them through to the cache once the transaction is committed.
+
+        @param cur: cursor of an open transaction
+        @param names: curve names
+        @return: curve id by curve name
+        """
+        cur.execute("SELECT to_regclass(%s)::oid", (self.curve_table,))
+        self.curve_key = (os.getpid(), cur.fetchone()[0])
+
+        with self.curves_lock:
+            known = {**self.curves.get(self.curve_key, {}), **self.pending_curves}
+        ids = {name: known[name] for name in names if name in known}
+
+        missing = sorted(set(names) - ids.keys())
+        if missing:
+            extras.execute_values(cur, f"INSERT INTO {self.curve_table} (curve_name) VALUES %s ON CONFLICT (curve_name) DO NOTHING",
+                                  [(name,) for name in missing])
+            # A new statement, so the curves registered meanwhile by concurrent loads are visible too
+            cur.execute(f"SELECT curve_name, curve_id FROM {self.curve_table} WHERE curve_name = ANY(%s)", (missing,))
+            found = dict(cur.fetchall())
+            self.pending_curves.update(found)
+            ids.update(found)
+
+        return ids
+
+    def watermarks(self) -> dict[str, tuple[str, str]]:
+        """Get the watermark of every curve.
+
+        @return: latest publish time and curve date by curve name, as UTC ISO 8601 strings like the API uses
+        """
+        if self.single(f"SELECT to_regclass('{self.watermark_table}')")[0] is None:
+            return {}
+
+        rows = self.fetch(f"""
+            SELECT curve_name,
+                   to_char(publish_time, 'YYYY-MM-DD"T"HH24:MI:SS"Z"'),
+                   to_char(curve_date, 'YYYY-MM-DD"T"HH24:MI:SS"Z"')
+            FROM {self.watermark_table}
+        """)
+
+        return {curve_name: (publish_time, curve_date) for curve_name, publish_time, curve_date in rows}
+
+
+    def read_range(self, date_from: Any, date_to: Any, curve_names: Iterable[str] | None = None, output: str = READ_FRAME,
+                   itersize: int = PostgresSQL.ITERSIZE) -> pd.DataFrame | dict[str, npt.NDArray[Any]]:
+        """Read the rows of a time window into columns, ordered by curve and curve_date.
+
+        The rows are fetched from a server-side cursor in batches of itersize and converted to arrays batch by batch,
+        so no more than one batch is ever held as Python tuples. Only the partitions of the window are scanned.
+
+        @param date_from: first curve date, inclusive, a timestamp or a string PostgreSQL casts to one
+        @param date_to: last curve date, inclusive
+        @param curve_names: curves to read, every curve if None
+        @param output: either 'frame' (pandas DataFrame) or 'arrays' (NumPy array by column name)
+        @param itersize: rows per round trip
+        @return: curve_name, curve_date (datetime64[us], UTC without time zone) and value (float64, NULL as NaN)
+        """
+        if output not in self.READ_OUTPUTS:
+            raise ValueError(f"Unknown output '{output}', expected one of {self.READ_OUTPUTS}")
+
+        names = dict(self.fetch(f"SELECT curve_id, curve_name FROM {self.curve_table}"))
+        wanted = set(names.values() if curve_names is None else curve_names)
+        ids = [curve_id for curve_id, name in names.items() if name in wanted]
+
+        dtypes = {'curve_id': np.int32, 'curve_date': np.int64, 'value': np.float64}
+        chunks: dict[str, list[npt.NDArray[Any]]] = {name: [] for name in dtypes}
+        batches = self.stream_batches(f"""
+            SELECT curve_id, (extract(epoch FROM curve_date) * 1000000)::bigint, value::float8
+            FROM {self.data_table}
+            WHERE curve_id = ANY(%s) AND curve_date BETWEEN %s AND %s
+            ORDER BY curve_id, curve_date
+        """, (ids, date_from, date_to), itersize)
+        for batch in batches:
+            curve_ids, micros, values = zip(*batch, strict=True)
+            chunks['curve_id'].append(np.array(curve_ids, dtype=np.int32))
+            chunks['curve_date'].append(np.array(micros, dtype=np.int64))
+            chunks['value'].append(np.array(values, dtype=np.float64))
+
+        columns = {name: np.concatenate(arrays) if arrays else np.empty(0, dtype=dtypes[name]) for name, arrays in chunks.items()}
+        dates = columns['curve_date'].view('datetime64[us]')
+
+        # Curve names are looked up by id, the repeated names share the same string objects
+        ordered = sorted(names)
+        codes = np.full(max(ordered, default=0) + 1, -1, dtype=np.int32)
+        codes[ordered] = np.arange(len(ordered), dtype=np.int32)
+        curve_codes = codes[columns['curve_id']]
+        categories = [names[curve_id] for curve_id in ordered]
+
+        if output == self.READ_ARRAYS:
+            return {'curve_name': np.array(categories, dtype=object)[curve_codes], 'curve_date': dates, 'value': columns['value']}
+
+        return pd.DataFrame({
+            'curve_name': pd.Categorical.from_codes(curve_codes, categories=categories),
+            'curve_date': dates,
+            'value': columns['value'],
+        })
+
+    def loaded(self, date_from: Any, date_to: Any, curve_names: Iterable[str] | None = None) -> dict[tuple[str, str], float | None]:
+        """Get the rows loaded in a time window, keyed like the API records.
+
+        @param date_from: first curve date, inclusive, a timestamp or a string PostgreSQL casts to one
+        @param date_to: last curve date, inclusive
+        @param curve_names: curves to read, every curve if None
+        @return: value (None for NULL) by curve name and curve date, the date as a UTC ISO 8601 string like the API uses
+        """
+        if self.single(f"SELECT to_regclass('{self.data_table}')")[0] is None:
+            return {}
+
+        columns = cast(dict[str, npt.NDArray[Any]], self.read_range(date_from, date_to, curve_names, output=self.READ_ARRAYS))
+        dates = np.char.add(np.datetime_as_string(columns['curve_date'], unit='s'), 'Z')
+
+        return {(name, str(date)): None if np.isnan(value) else float(value)
+                for name, date, value in zip(columns['curve_name'], dates, columns['value'], strict=True)}
+
+    def loaded_to_watermarks(self, date_from: str, date_to: str) -> dict[tuple[str, str], float | None]:
+        """Get the rows loaded in a time window, reading each curve only up to its watermark.
+
+        Every load of the pipeline advances the watermarks in its transaction, so no curve has rows after its watermark.
+        The curves whose watermark is before the window are not read, nor the dates after the latest watermark.
+        A row loaded without watermarks is then missing from the result and its record is upserted again, unchanged.
+
+        @param date_from: first curve date, inclusive, as UTC ISO 8601 string like the API uses
+        @param date_to: last curve date, inclusive, as UTC ISO 8601 string like the API uses
+        @return: value (None for NULL) by curve name and curve date, see loaded
+        """
+        reached = {curve_name: curve_date for curve_name, (_, curve_date) in self.watermarks().items() if curve_date >= date_from}
+        if not reached:
+            return {}
+
+        return self.loaded(date_from, min(date_to, max(reached.values())), reached)
+
+    def bulk_sync(self, data: Iterable[Row] | io.TextIOBase, mode: str = LOAD_VALUES,
+                  watermarks: dict[str, tuple[str, str]] | None = None, skipped: int = 0) -> int:
         """Insert data into the database.
 
-        @param data: data to be inserted
+        Existing rows are only updated if their value changed, the counts are kept in sync_stats.
+        A key written more than once by one load keeps its row published last, e.g. from APIHelper.revisions, or its last row
+        if the rows carry no publish time; the others are counted as duplicates. APIHelper.deduplicate drops the superseded
+        revisions of the records beforehand.
+        Rows may come from a generator, they are consumed in bounded batches ('values') or streamed into COPY ('copy').
+        The watermarks are read once the rows are exhausted, so a generator stage may still fill them.
+        The rollup buckets of the inserted and updated rows are recomputed before the commit.
+
+        @param data: data to be inserted, or a CSV buffer (e.g. APIHelper.copy_buffer) for the 'copy' mode
+        @param mode: load path, either 'values' (execute_values) or 'copy' (COPY into a staging table and merge)
+        @param watermarks: latest publish time and curve date by curve name (e.g. APIHelper.watermarks), advanced in the same transaction
+        @param skipped: records dropped beforehand as already loaded (e.g. by APIHelper.incremental), counted as skipped
+        @return: number of rows loaded
         """
-        if data:
-            # self.bulk_insert(f'INSERT INTO {self.TABLE_NAME} (curve_name, date, value) VALUES %s', data)
-            self.bulk_insert(f"""
-                INSERT INTO {self.TABLE_NAME} (curve_name, curve_date, value)
-                VALUES %s
-                ON CONFLICT (curve_name, curve_date)
+        if mode not in self.LOAD_MODES:
+            raise ValueError(f"Unknown load mode '{mode}', expected one of {self.LOAD_MODES}")
+
+        if isinstance(data, io.TextIOBase) and mode != self.LOAD_COPY:
+            raise ValueError(f"CSV buffers can only be loaded with the '{self.LOAD_COPY}' mode")
+
+        self.pending_curves = {}
+        with self.transaction() as cur:
+            cur.execute(f"CREATE TEMPORARY TABLE {self.touched_table} (curve_id INTEGER, bucket TIMESTAMP, PRIMARY KEY (curve_id, bucket)) ON COMMIT DROP")
+
+            if isinstance(data, io.TextIOBase) or mode == self.LOAD_COPY:
+                count, inserted, updated, duplicates = self.merge_copy(cur, data)
+            else:
+                count, inserted, updated, duplicates = self.merge_values(cur, data)
+
+            if inserted or updated:
+                cur.execute(f"ANALYZE {self.touched_table}")  # Autovacuum never sees temporary tables, the planner would guess their size
+                self.refresh_rollups(cur, self.touched_table)
+
+            if watermarks:
+                self.advance_watermarks(cur, watermarks)
+
+        with self.curves_lock:
+            self.curves.setdefault(self.curve_key, {}).update(self.pending_curves)
+
+        self.sync_stats = {'inserted': inserted, 'updated': updated, 'skipped': skipped + count - duplicates - inserted - updated, 'duplicates': duplicates}
+
+        return count
+
+    def upsert(self, cur: cursor, source: str, first: Any, last: Any) -> str:
+        """Build the upsert into the destination table which leaves rows with an unchanged value untouched.
+
+        The written keys are looked up in the table as it was before the statement, a data-modifying CTE is not visible
+        to the rest of the query, which tells inserts from updates without xmax (not available on a partitioned table).
+        The lookup is bounded by literal curve dates, so the planner prunes it to the partitions of the rows and costs it
+        on their sizes, instead of joining every partition. Their hours are collected in the touched table for the rollups.
+
+        @param cur: cursor of an open transaction, to quote the bounds
+        @param source: VALUES placeholder or SELECT providing curve_id, curve_date and value
+        @param first: earliest curve date of the source, a timestamp or a string PostgreSQL casts to one
+        @param last: latest curve date of the source
+        @return: sql query returning the number of inserted and updated rows
+        """
+        bounds = cur.mogrify("%s::timestamp AND %s::timestamp", (first, last)).decode()
+
+        return f"""
+            WITH merged AS (
+                INSERT INTO {self.data_table} AS target (curve_id, curve_date, value)
+                {source}
+                ON CONFLICT (curve_id, curve_date)
                 DO UPDATE SET value = EXCLUDED.value
-            """, data)
+                WHERE target.value IS DISTINCT FROM EXCLUDED.value
+                RETURNING curve_id, curve_date
+            ), touched AS (
+                INSERT INTO {self.touched_table} (curve_id, bucket)
+                SELECT DISTINCT curve_id, date_trunc('hour', curve_date) FROM merged
+                ON CONFLICT DO NOTHING
+            )
+            SELECT count(*) FILTER (WHERE previous.curve_id IS NULL), count(*) FILTER (WHERE previous.curve_id IS NOT NULL)
+            FROM merged LEFT JOIN {self.data_table} AS previous
+            ON previous.curve_id = merged.curve_id AND previous.curve_date = merged.curve_date AND previous.curve_date BETWEEN {bounds}
+        """
+
+    def merge_values(self, cur: cursor, data: Iterable[Row]) -> tuple[int, int, int, int]:
+        """Upsert data with multi-row INSERT statements.
+
+        @param cur: cursor of an open transaction
+        @param data: data to be inserted
+        @return: number of rows loaded, inserted, updated and dropped as duplicates of a row published later or after them
+        """
+        count = inserted = updated = duplicates = 0
+        rows = iter(data)
+        published: dict[tuple[str, str], str] = {}  # Publish time of the keys written by the previous batches
+
+        while batch := list(islice(rows, self.BATCH_SIZE)):
+            # An upsert cannot write a key twice, the row published last wins and the last row on equal publish times
+            latest: dict[tuple[str, str], tuple[Any, str]] = {}
+            for name, date, value, *revision in batch:
+                key, publish_time = (name, date), revision[0] if revision else ''
+                if publish_time >= max(latest.get(key, (None, ''))[1], published.get(key, '')):
+                    latest[key] = (value, publish_time)
+
+            count += len(batch)
+            duplicates += len(batch) - len(latest)
+            if not latest:
+                continue
+
+            first, last = min(date for _, date in latest), max(date for _, date in latest)
+            self.ensure_partitions(cur, first, last)
+            ids = self.curve_ids(cur, {name for name, _ in latest})
+            # One page per batch, so one row of counts
+            written = extras.execute_values(cur, self.upsert(cur, "VALUES %s", first, last), [(ids[name], date, value) for (name, date), (value, _) in latest.items()],
+                                            page_size=len(latest), fetch=True)
+            inserted += sum(row[0] for row in written)
+            updated += sum(row[1] for row in written)
+            published.update((key, publish_time) for key, (_, publish_time) in latest.items() if publish_time)
+
+        return count, inserted, updated, duplicates
+
+    def merge_copy(self, cur: cursor, data: Iterable[Row] | io.TextIOBase) -> tuple[int, int, int, int]:
+        """Stream data with COPY into a temporary staging table and merge it into the destination table.
+
+        The staging table is dropped on commit, so the load and the merge form one transaction.
+        Rows of a key copied more than once fail the upsert, which is then rolled back to a savepoint and retried once the
+        superseded rows are removed from the staging table; the row published last wins, the last row copied on equal or
+        missing publish times. Loads without duplicates pay nothing.
+
+        @param cur: cursor of an open transaction
+        @param data: data to be inserted or a CSV buffer of curve name, curve date and value
+        @return: number of rows copied, inserted, updated and dropped as duplicates of a row published later or copied after them
+        """
+        stage = f"{self.TABLE_NAME}_stage"
+        columns = ['curve_name', 'curve_date', 'value']
+
+        if not isinstance(data, io.TextIOBase):
+            # The width of the first row tells whether the rows carry their publish time
+            rows = iter(data)
+            first = next(rows, None)
+            if first is not None and len(first) > len(columns):
+                columns.append('publish_time')
+            data = rows if first is None else chain([first], rows)
+
+        cur.execute(f"""
+            CREATE TEMPORARY TABLE {stage} (curve_name VARCHAR(255), curve_date TIMESTAMP, value NUMERIC, publish_time TIMESTAMP) ON COMMIT DROP
+        """)
+        count = self.copy(cur, f"COPY {stage} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", data)
+
+        cur.execute(f"SELECT min(curve_date), max(curve_date) FROM {stage}")
+        first, last = cur.fetchone()
+        if first is not None:
+            self.ensure_partitions(cur, first, last)
+
+        # Register the new curves, a missing curve name stays NULL and fails the primary key
+        cur.execute(f"SELECT DISTINCT curve_name FROM {stage} WHERE curve_name IS NOT NULL")
+        self.curve_ids(cur, [row[0] for row in cur.fetchall()])
+        upsert = self.upsert(cur, f"""
+            SELECT curve.curve_id, stage.curve_date, stage.value
+            FROM {stage} AS stage LEFT JOIN {self.curve_table} AS curve USING (curve_name)
+        """, first, last)
+
+        duplicates = 0
+        cur.execute("SAVEPOINT merge_copy")
+        try:
+            cur.execute(upsert)
+        except errors.CardinalityViolation:
+            cur.execute("ROLLBACK TO SAVEPOINT merge_copy")
+            duplicates = self.drop_duplicates(cur, stage)
+            cur.execute(upsert)
+        inserted, updated = cur.fetchone()
+
+        return count, inserted, updated, duplicates
+
+    def drop_duplicates(self, cur: cursor, stage: str) -> int:
+        """Remove the rows of the staging table superseded by a row of the same key published later, or copied after them.
+
+        The rows published before the latest revision of their key are removed first, a missing publish time counting as
+        the oldest. The staging table is only appended to by COPY, so the physical position of the remaining rows (ctid)
+        is the order they were copied in and breaks the ties. The keys copied more than once are found with hash aggregates,
+        so the staging table is never sorted.
+
+        @param cur: cursor of an open transaction
+        @param stage: staging table filled by COPY
+        @return: number of rows removed
+        """
+        removed = 0
+        for latest, superseded in (('max(publish_time)', 'stage.publish_time IS DISTINCT FROM duplicate.latest'),
+                                   ('max(ctid)', 'stage.ctid < duplicate.latest')):
+            cur.execute(f"""
+                DELETE FROM {stage} AS stage USING (
+                    SELECT curve_name, curve_date, {latest} AS latest FROM {stage} GROUP BY curve_name, curve_date HAVING count(*) > 1
+                ) AS duplicate
+                WHERE stage.curve_name = duplicate.curve_name AND stage.curve_date = duplicate.curve_date AND {superseded}
+            """)
+            removed += int(cur.rowcount)
+        logging.warning(f"Removed {removed} rows of {self.TABLE_NAME} superseded by a later row of the same key")
+
+        return removed
+
+    def advance_watermarks(self, cur: cursor, watermarks: dict[str, tuple[str, str]]) -> None:
+        """Move the watermarks of the curves forward, they never go back.
+
+        @param cur: cursor of an open transaction
+        @param watermarks: latest publish time and curve date by curve name
+        """
+        extras.execute_values(cur, f"""
+            INSERT INTO {self.watermark_table} AS target (curve_name, publish_time, curve_date)
+            VALUES %s
+            ON CONFLICT (curve_name) DO UPDATE SET
+                publish_time = GREATEST(target.publish_time, EXCLUDED.publish_time),
+                curve_date = GREATEST(target.curve_date, EXCLUDED.curve_date),
+                updated_at = now() AT TIME ZONE 'UTC'
+        """, [(curve_name, publish_time, curve_date) for curve_name, (publish_time, curve_date) in watermarks.items()],
+            template="(%s, %s::TIMESTAMPTZ AT TIME ZONE 'UTC', %s::TIMESTAMPTZ AT TIME ZONE 'UTC')")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Rebuild the rollups of a range from the command line.
+
+    PYTHONPATH=dags python -m model.destination --date-from 2024-01-01 --date-to 2024-03-31
+    """
+    parser = argparse.ArgumentParser(description="Rebuild the hourly and daily rollups of a range of the destination table.")
+    parser.add_argument("--date-from", required=True, help="First curve date, e.g. 2024-01-01T00:00:00Z.")
+    parser.add_argument("--date-to", required=True, help="Last curve date, the rollups of its whole UTC day are rebuilt.")
+    parser.add_argument("--table", default=DestinationPostgreSQL.TABLE_NAME, help="Name of the destination table.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    destination = DestinationPostgreSQL(args.table)
+    try:
+        destination.rebuild_rollups(args.date_from, args.date_to)
+    finally:
+        destination.disconnect()
+
 
-        return len(data)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+import ijson  # type: ignore
+import pendulum
+
+
+class LandingZone:
+    """Local archive of the raw API payloads, zstd-compressed and partitioned by dataset and settlement date.
+
+    Every payload fetched from the API is split by the settlementDate of its records and written to
+    `{dataset}/settlement_date=YYYY-MM-DD/{from}_{to}_{fetched_at}.json.zst`, with the request metadata under 'request'
+    next to the 'data' records. Files are never overwritten, a window fetched again gets a new file, so the
+    archive keeps every revision; `files` keeps the latest one per window and lists them in the order they were fetched.
+    The files are plain zstd frames, `zstd -dc` prints the JSON.
+    """
+
+    SUFFIX = '.json.zst'
+    CODEC = 'zstd'
+    LEVEL = 9  # Compression level, the payloads are written once and read rarely
+    PARTITION = 'settlement_date={}'
+    TIMESTAMP = '%Y%m%dT%H%M%SZ'
+
+    def __init__(self, directory: str | Path | None = None, level: int = LEVEL, dataset: str | None = None) -> None:
+        """Initialize the landing zone.
+
+        :param directory: root directory, $PSR_LANDING_DIR or $AIRFLOW_HOME/landing by default
+        :param level: zstd compression level
+        :param dataset: name of the dataset, its payloads are archived in a subdirectory of the root; in the root itself if None
+        """
+        root = Path(directory or os.environ.get('PSR_LANDING_DIR') or Path(os.environ['AIRFLOW_HOME']) / 'landing')
+        self.directory = root / dataset if dataset else root
+        self.level = level
+
+    def partition(self, settlement_date: str) -> Path:
+        """Get the directory of a settlement date.
+
+        :param settlement_date: settlement date as YYYY-MM-DD
+        :return: partition directory
+        """
+        return self.directory / self.PARTITION.format(settlement_date)
+
+    def put(self, url: str, from_date: pendulum.DateTime, to_date: pendulum.DateTime, payload: dict[str, Any], **request: Any) -> list[Path]:
+        """Archive a payload, one file per settlement date of its records.
+
+        :param url: requested URL
+        :param from_date: window start
+        :param to_date: window end
+        :param payload: JSON data of the API
+        :param request: further request metadata, e.g. status, bytes and seconds
+        :return: the files written
+        """
+        import pyarrow as pa
+
+        fetched_at = pendulum.now('UTC')
+        dates: dict[str, list[dict[str, Any]]] = {}
+        for record in payload.get('data', []):
+            dates.setdefault(record.get('settlementDate') or from_date.in_timezone('UTC').to_date_string(), []).append(record)
+
+        codec = pa.Codec(self.CODEC, compression_level=self.level)
+        name = (f"{from_date.in_timezone('UTC').strftime(self.TIMESTAMP)}_{to_date.in_timezone('UTC').strftime(self.TIMESTAMP)}_"
+                f"{fetched_at.strftime('%Y%m%dT%H%M%S%fZ')}{self.SUFFIX}")
+        paths = []
+
+        for settlement_date, records in sorted(dates.items()):
+            metadata = {'url': url, 'from': from_date.isoformat(), 'to': to_date.isoformat(), 'fetched_at': fetched_at.isoformat(),
+                        'settlement_date': settlement_date, 'records': len(records), **request}
+            body = json.dumps({'request': metadata, **{k: v for k, v in payload.items() if k != 'data'}, 'data': records}).encode()
+
+            path = self.partition(settlement_date) / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write atomically, a replay may list the partition at the same time
+            tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            tmp.write_bytes(codec.compress(body, asbytes=True))
+            tmp.replace(path)
+            paths.append(path)
+
+        logging.info(f"Archived {len(payload.get('data', []))} records of {from_date} to {to_date} in {len(paths)} files")
+
+        return paths
+
+    def files(self, date_from: str, date_to: str, revisions: bool = False) -> list[Path]:
+        """List the archived files of an inclusive range of settlement dates.
+
+        :param date_from: first settlement date as YYYY-MM-DD
+        :param date_to: last settlement date as YYYY-MM-DD
+        :param revisions: keep every file, otherwise only the latest file of every window of a settlement date
+        :return: files by settlement date and fetch time, so that a replay loads the windows overlapping each other
+                 in the order they were fetched and the latest fetch wins
+        """
+        def fetched(path: Path) -> tuple[str, str]:
+            return path.name.removesuffix(self.SUFFIX).rsplit('_', 1)[1], path.name
+
+        paths = []
+        if self.directory.is_dir():
+            for partition in sorted(self.directory.iterdir()):
+                settlement_date = partition.name.removeprefix(self.PARTITION.format(''))
+                if partition.is_dir() and date_from <= settlement_date <= date_to:
+                    paths.extend(sorted(partition.glob('*' + self.SUFFIX), key=fetched))
+
+        if revisions:
+            return paths
+
+        latest = {(path.parent, path.name.rsplit('_', 1)[0]): path for path in paths}  # In fetch order, so the latest fetch wins
+
+        return sorted(latest.values(), key=lambda path: (path.parent.name, *fetched(path)))
+
+    def open(self, path: Path) -> Any:
+        """Open a file for streaming decompression.
+
+        :param path: archived file
+        :return: binary file-like object of the JSON document
+        """
+        import pyarrow as pa
+
+        return pa.CompressedInputStream(pa.OSFile(str(path)), self.CODEC)
+
+    def request(self, path: Path) -> dict[str, Any]:
+        """Read the request metadata of a file.
+
+        :param path: archived file
+        :return: metadata of the request
+        """
+        with self.open(path) as stream:
+            metadata: dict[str, Any] = next(ijson.items(stream, 'request'))
+
+        return metadata
+
+    def records(self, path: Path) -> Iterator[dict[str, Any]]:
+        """Yield the records of a file while it is decompressed and parsed.
+
+        :param path: archived file
+        :return: API records
+        """
+        with self.open(path) as stream:
+            yield from ijson.items(stream, 'data.item', use_float=True)
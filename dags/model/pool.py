@@ -0,0 +1,226 @@
+import logging
+import os
+import threading
+import time
+import psycopg2
+from psycopg2._psycopg import connection
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError
+from collections.abc import Generator
+from contextlib import contextmanager
+
+# Connections inherited from the parent process. They are never closed nor garbage collected in the child: closing a connection,
+# explicitly or when it is deallocated, sends Terminate on the socket shared with the parent and ends the parent's session.
+_inherited: list[connection] = []
+
+
+class ConnectionPool:
+    """Thread-safe pool of PostgreSQL connections shared by every task running in a worker process.
+
+    - Connections are checked out with the `connection()` context manager and returned when the block exits.
+    - Idle connections are health-checked with `SELECT 1` before reuse, broken ones are replaced.
+    - Opening a connection is retried with exponential backoff.
+    - Connections are never shared across processes: a forked child (LocalExecutor, Celery prefork)
+      sets the inherited connections aside without closing them and opens its own.
+    """
+
+    MIN_SIZE = 1  # Connections opened by warm()
+    MAX_SIZE = 10  # Upper bound of connections checked out at the same time
+    TIMEOUT = 30.0  # Seconds to wait for a free connection before giving up
+    RETRIES = 3  # Reconnect attempts after the first failure
+    BACKOFF = 0.5  # Seconds before the first reconnect, doubled on every attempt
+    CHECK_AFTER = 30.0  # Idle seconds after which a connection is validated before reuse
+
+    pools: dict[tuple[int, str], 'ConnectionPool'] = {}
+    registry_lock = threading.Lock()
+
+    def __init__(self, dsn: str, min_size: int = MIN_SIZE, max_size: int = MAX_SIZE) -> None:
+        """Initialize the pool without opening any connection.
+
+        :param dsn: PostgreSQL connection string
+        :param min_size: connections opened by warm()
+        :param max_size: maximum number of connections checked out at the same time
+        """
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.condition = threading.Condition()
+        self.reset()
+
+    @classmethod
+    def shared(cls, dsn: str | None = None) -> 'ConnectionPool':
+        """Get the pool of the current process for the connection string.
+
+        :param dsn: PostgreSQL connection string, POSTGRES_CONNECTION_STRING by default
+        :return: process-wide pool
+        """
+        dsn = dsn or os.environ['POSTGRES_CONNECTION_STRING']
+        key = (os.getpid(), dsn)
+
+        with cls.registry_lock:
+            if key not in cls.pools:
+                cls.pools[key] = cls(dsn)
+            return cls.pools[key]
+
+    @classmethod
+    def after_fork(cls) -> None:
+        """Forget the pools inherited from the parent process."""
+        cls.registry_lock = threading.Lock()
+        for pool in cls.pools.values():
+            pool.condition = threading.Condition()
+            pool.reset()
+        cls.pools = {}
+
+    def reset(self) -> None:
+        """Bind the pool to the current process, setting the connections of the parent process aside in _inherited.
+
+        The references are kept because closing a connection inherited through fork, or letting the garbage collector
+        deallocate it, would terminate the parent's session as well.
+        """
+        _inherited.extend(conn for conn, _ in getattr(self, 'idle', []))
+        _inherited.extend(getattr(self, 'used', {}).values())
+        self.pid = os.getpid()
+        self.idle: list[tuple[connection, float]] = []  # Connections with the time they were returned
+        self.used: dict[int, connection] = {}
+        self.opening = 0
+
+    @property
+    def size(self) -> int:
+        """Number of connections checked out or being opened."""
+        return len(self.used) + self.opening
+
+    def open(self) -> connection:
+        """Open a new connection, retrying with exponential backoff.
+
+        :return: new connection
+        """
+        attempt = 0
+        while True:
+            try:
+                return psycopg2.connect(self.dsn)
+            except psycopg2.OperationalError as e:
+                if attempt >= self.RETRIES:
+                    raise
+                delay = self.BACKOFF * 2 ** attempt
+                logging.warning(f"Error connecting to database, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+                attempt += 1
+
+    @staticmethod
+    def usable(conn: connection, idle_since: float) -> bool:
+        """Check if an idle connection can be reused.
+
+        :param conn: idle connection
+        :param idle_since: monotonic time the connection was returned
+        :return: True if the connection is healthy
+        """
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < ConnectionPool.CHECK_AFTER:
+            return True
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def discard(conn: connection) -> None:
+        """Close a connection which must not return to the pool."""
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def getconn(self, timeout: float = TIMEOUT) -> connection:
+        """Check out a healthy connection.
+
+        :param timeout: seconds to wait for a free connection
+        :return: connection reserved for the caller
+        """
+        deadline = time.monotonic() + timeout
+
+        with self.condition:
+            if self.pid != os.getpid():
+                self.reset()
+
+            while not self.idle and self.size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.condition.wait(remaining):
+                    raise PoolError(f"No connection available within {timeout}s (max_size={self.max_size})")
+
+            candidate = self.idle.pop() if self.idle else None
+            self.opening += 1
+
+        try:
+            if candidate is not None and not self.usable(*candidate):
+                self.discard(candidate[0])
+                candidate = None
+            conn = candidate[0] if candidate is not None else self.open()
+        except Exception:
+            with self.condition:
+                self.opening -= 1
+                self.condition.notify()
+            raise
+
+        with self.condition:
+            self.opening -= 1
+            self.used[id(conn)] = conn
+            return conn
+
+    def putconn(self, conn: connection) -> None:
+        """Return a connection to the pool, discarding it if it is broken or belongs to another process.
+
+        :param conn: connection obtained from getconn()
+        """
+        with self.condition:
+            if self.used.pop(id(conn), None) is None:
+                return  # Inherited from the parent process or already returned
+
+            try:
+                if not conn.closed and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                self.discard(conn)
+
+            if not conn.closed:
+                self.idle.append((conn, time.monotonic()))
+            self.condition.notify()
+
+    @contextmanager
+    def connection(self, timeout: float = TIMEOUT) -> Generator[connection, None, None]:
+        """Check out a connection for the duration of the block.
+
+        Uncommitted work is rolled back when the connection is returned.
+
+        :param timeout: seconds to wait for a free connection
+        """
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def warm(self) -> None:
+        """Open connections up to min_size, failing fast if the database is unreachable."""
+        conns = [self.getconn() for _ in range(max(self.min_size - len(self.idle), 0))]
+        for conn in conns:
+            self.putconn(conn)
+
+    def closeall(self) -> None:
+        """Close the idle connections, the pool reopens connections on demand."""
+        with self.condition:
+            if self.pid != os.getpid():
+                self.reset()
+            for conn, _ in self.idle:
+                self.discard(conn)
+            self.idle = []
+
+
+os.register_at_fork(after_in_child=ConnectionPool.after_fork)
@@ -1,52 +1,117 @@
-import logging
-import os
-import psycopg2
+import csv
+import io
+import itertools
+import uuid
 from psycopg2 import extras
-from psycopg2._psycopg import connection
-from collections.abc import Sequence
+from psycopg2._psycopg import cursor
+from collections.abc import Generator, Iterable, Iterator, Sequence
+from contextlib import contextmanager
 from typing import Any
+from .pool import ConnectionPool
+
+
+class CopyStream(io.TextIOBase):
+    """File-like object which lazily serializes rows into PostgreSQL COPY CSV format.
+
+    The rows are consumed only when PostgreSQL asks for more data, so arbitrarily large
+    iterables can be streamed without materializing the whole payload in memory.
+    None is written as an unquoted empty field, which COPY reads as NULL.
+    """
+
+    BATCH_SIZE = 1000  # Rows serialized per refill of the buffer
+
+    def __init__(self, rows: Iterable[Sequence[Any]]) -> None:
+        """Initialize the stream.
+
+        @param rows: iterable of row sequences
+        """
+        super().__init__()
+        self.rows: Iterator[Sequence[Any]] = iter(rows)
+        self.buffer = ''
+        self.position = 0
+
+    def readable(self) -> bool:
+        """Mark the stream as readable for psycopg2."""
+        return True
+
+    def serialize(self) -> str:
+        """Serialize the next batch of rows.
+
+        @return: CSV lines, empty string once the rows are exhausted
+        """
+        batch = list(itertools.islice(self.rows, self.BATCH_SIZE))
+        if not batch:
+            return ''
+
+        out = io.StringIO()
+        csv.writer(out, lineterminator='\n').writerows(batch)
+
+        return out.getvalue()
+
+    def read(self, size: int | None = -1) -> str:
+        """Read up to size characters of COPY formatted data.
+
+        @param size: number of characters to read, all remaining data if negative
+        @return: COPY formatted chunk, empty string once exhausted
+        """
+        if size is None or size < 0:
+            chunk = self.buffer[self.position:] + ''.join(iter(self.serialize, ''))
+            self.buffer, self.position = '', 0
+            return chunk
+
+        while len(self.buffer) - self.position < size:
+            more = self.serialize()
+            if not more:
+                break
+            self.buffer, self.position = self.buffer[self.position:] + more, 0
+
+        chunk = self.buffer[self.position:self.position + size]
+        self.position += len(chunk)
+
+        return chunk
 
 
 class PostgresSQL:
-    """The class is responsible for database connection and operations."""
+    """The class is responsible for database operations on pooled connections."""
 
-    instance = None
+    ITERSIZE = 10000  # Rows per round trip of a server-side cursor
 
-    def __new__(cls) -> 'PostgresSQL':
-        """Ensure only one instance of PostgresSQL class is created."""
-        if not cls.instance:
-            cls.instance = super().__new__(cls)
-        return cls.instance
+    def __init__(self, dsn: str | None = None) -> None:
+        """Initialize PostgresSQL class with the connection pool of the current process.
 
-    def __init__(self) -> None:
-        """Initialize PostgresSQL class."""
-        self.connection = None
+        @param dsn: PostgreSQL connection string, POSTGRES_CONNECTION_STRING by default
+        """
+        self.pool = ConnectionPool.shared(dsn)
 
-    def connect(self) -> connection:
-        """Establish connection with PostgresSQL database.
+    def connect(self) -> None:
+        """Warm up the connection pool.
 
-        If the connection already exists, return the existing connection.
+        @raise psycopg2.OperationalError: if the database stays unreachable after the retries
         """
-        if not self.connection:
-            try:
-                self.connection = psycopg2.connect(os.environ['POSTGRES_CONNECTION_STRING'])
-            except psycopg2.Error as e:
-                logging.error("Error connecting to database:" + str(e))
-        return self.connection
+        self.pool.warm()
 
     def disconnect(self) -> None:
-        """Disconnect the connection with PostgresSQL database."""
-        if self.connection is not None and self.connection.closed == 0:
-            self.connection.close()
+        """Close the idle connections with PostgresSQL database."""
+        self.pool.closeall()
+
+    @contextmanager
+    def transaction(self) -> Generator[cursor, None, None]:
+        """Run several statements in one transaction.
+
+        The transaction is committed when the block exits cleanly and rolled back otherwise.
+        """
+        with self.pool.connection() as conn:
+            with conn.cursor() as cur:
+                yield cur
+            conn.commit()
 
     def query(self, query: str) -> None:
         """Run a query.
 
         @param query: sql query
         """
-        with self.connection.cursor() as cursor:
+        with self.transaction() as cursor:
             cursor.execute(query)
-            self.connection.commit()
 
     def bulk_insert(self, query: str, data: Sequence[Any]) -> None:
         """Run a batch insert.
@@ -54,9 +119,21 @@ class PostgresSQL:
         @param query: sql query
         @param data: list of tuples of data
         """
-        with self.connection.cursor() as cursor:
+        with self.transaction() as cursor:
             extras.execute_values(cursor, query, data)
-            self.connection.commit()
+
+    @staticmethod
+    def copy(cur: cursor, query: str, data: Iterable[Sequence[Any]] | io.TextIOBase) -> int:
+        """Stream rows through COPY ... FROM STDIN within the cursor's transaction.
+
+        @param cur: cursor of an open transaction
+        @param query: COPY statement reading from STDIN in CSV format
+        @param data: iterable of tuples of data or a readable buffer already in CSV format
+        @return: number of copied rows
+        """
+        cur.copy_expert(query, data if isinstance(data, io.TextIOBase) else CopyStream(data))
+
+        return int(cur.rowcount)
 
     def fetch(self, query: str) -> list[tuple[Any, ...]] | Any:
         """Acquire data.
@@ -64,7 +141,7 @@ class PostgresSQL:
         @param query: sql query
         @return: list of tuples of data
         """
-        with self.connection.cursor() as cursor:
+        with self.transaction() as cursor:
             cursor.execute(query)
 
             return cursor.fetchall()
@@ -75,7 +152,49 @@ class PostgresSQL:
         @param query: sql query
         @return: tuple of data
         """
-        with self.connection.cursor() as cursor:
+        with self.transaction() as cursor:
             cursor.execute(query)
 
             return cursor.fetchone()
+
+    @contextmanager
+    def server_cursor(self, query: str, params: Sequence[Any] | dict[str, Any] | None = None,
+                      itersize: int = ITERSIZE) -> Generator[cursor, None, None]:
+        """Run a query on a named server-side cursor, the result stays on the server until it is fetched.
+
+        @param query: sql query
+        @param params: query parameters
+        @param itersize: rows per round trip when the cursor is iterated
+        """
+        with self.pool.connection() as conn:
+            with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cur:
+                cur.itersize = itersize
+                cur.execute(query, params)
+                yield cur
+            conn.commit()
+
+    def stream(self, query: str, params: Sequence[Any] | dict[str, Any] | None = None, itersize: int = ITERSIZE) -> Iterator[tuple[Any, ...]]:
+        """Acquire data row by row, with at most itersize rows held in memory.
+
+        The pooled connection is held until the rows are exhausted or the generator is closed.
+
+        @param query: sql query
+        @param params: query parameters
+        @param itersize: rows per round trip
+        @return: rows of the result
+        """
+        with self.server_cursor(query, params, itersize) as cur:
+            yield from cur
+
+    def stream_batches(self, query: str, params: Sequence[Any] | dict[str, Any] | None = None,
+                       itersize: int = ITERSIZE) -> Iterator[list[tuple[Any, ...]]]:
+        """Acquire data in batches of at most itersize rows.
+
+        @param query: sql query
+        @param params: query parameters
+        @param itersize: rows per batch and round trip
+        @return: lists of rows of the result
+        """
+        with self.server_cursor(query, params, itersize) as cur:
+            while batch := cur.fetchmany(itersize):
+                yield batch
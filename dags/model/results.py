@@ -0,0 +1,139 @@
+import logging
+import os
+from collections.abc import Sequence
+from typing import Any
+import pendulum
+from psycopg2 import extras
+from .postgres import PostgresSQL
+
+
+class ValidationResults(PostgresSQL):
+    """The class writes and compacts the Great Expectations validation results in PostgreSQL.
+
+    The results table is the one of the DatabaseStoreBackend of the validation results store: one row per suite and run keyed on
+    (expectation_suite_name, run_name, run_time, batch_identifier), with the result as JSON text in value. The results of a
+    validation are written in one statement instead of one transaction per suite. The results older than the retention keep
+    their statistics only, in the summary table, and both tables are indexed on run_time, whose format orders chronologically.
+    """
+
+    TABLE_NAME = os.environ.get('GX_TABLE_NAME', 'gx_scan_results')
+    KEY_COLUMNS = ('expectation_suite_name', 'run_name', 'run_time', 'batch_identifier')
+    RETENTION_DAYS = int(os.environ.get('PSR_GX_RETENTION_DAYS', 30))  # Days of results kept in full
+    RUN_TIME_FORMAT = '%Y%m%dT%H%M%S.%fZ'  # Format of RunIdentifier.run_time in the keys
+
+    def __init__(self, table_name: str | None = None, dsn: str | None = None) -> None:
+        """Initialize class.
+
+        @param table_name: name of the results table, TABLE_NAME by default
+        @param dsn: connection string of the results store, GX_POSTGRES_CONNECTION_STRING by default
+        """
+        # The store URL names the SQLAlchemy driver, psycopg2 takes the plain PostgreSQL URL
+        super().__init__((dsn or os.environ['GX_POSTGRES_CONNECTION_STRING']).replace('postgresql+psycopg2://', 'postgresql://', 1))
+
+        if table_name is not None:
+            self.TABLE_NAME = table_name
+
+        self.connect()  # Instantiate a connection
+
+    @property
+    def summary_table(self) -> str:
+        """Name of the table of the compacted results."""
+        return f"{self.TABLE_NAME}_summary"
+
+    def table_maintenance(self) -> None:
+        """Create the results table as the store would, the summary table and their run_time indexes if they don't exist."""
+        keys = ', '.join(self.KEY_COLUMNS)
+        self.query(f"""
+        CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
+            expectation_suite_name VARCHAR NOT NULL,
+            run_name VARCHAR NOT NULL,
+            run_time VARCHAR NOT NULL,
+            batch_identifier VARCHAR NOT NULL,
+            value VARCHAR,
+            PRIMARY KEY ({keys})
+        );
+        CREATE INDEX IF NOT EXISTS {self.TABLE_NAME}_run_time ON {self.TABLE_NAME} (run_time);
+
+        CREATE TABLE IF NOT EXISTS {self.summary_table} (
+            expectation_suite_name VARCHAR NOT NULL,
+            run_name VARCHAR NOT NULL,
+            run_time VARCHAR NOT NULL,
+            batch_identifier VARCHAR NOT NULL,
+            success BOOLEAN,
+            evaluated INTEGER,
+            successful INTEGER,
+            unsuccessful INTEGER,
+            success_percent DOUBLE PRECISION,
+            compacted_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'UTC'),
+            PRIMARY KEY ({keys})
+        );
+        CREATE INDEX IF NOT EXISTS {self.summary_table}_run_time ON {self.summary_table} (run_time);
+
+        COMMENT ON TABLE {self.summary_table} IS 'Statistics of the validation results compacted out of {self.TABLE_NAME}.';
+        """)
+
+    def write(self, results: Sequence[tuple[str, str, str, str, str]]) -> None:
+        """Upsert validation results in one statement.
+
+        @param results: key columns and serialized value of every result, as the store's key_to_tuple and serialize give them
+        """
+        if not results:
+            return
+
+        with self.transaction() as cur:
+            extras.execute_values(cur, f"""
+                INSERT INTO {self.TABLE_NAME} ({', '.join(self.KEY_COLUMNS)}, value) VALUES %s
+                ON CONFLICT ({', '.join(self.KEY_COLUMNS)}) DO UPDATE SET value = EXCLUDED.value
+            """, results, page_size=len(results))
+
+    def compact(self, days: int | None = None) -> int:
+        """Replace the results older than the retention by their statistics in the summary table, in one transaction.
+
+        @param days: days of results kept in full, RETENTION_DAYS by default
+        @return: number of results compacted
+        """
+        cutoff = pendulum.now('UTC').subtract(days=self.RETENTION_DAYS if days is None else days).strftime(self.RUN_TIME_FORMAT)
+        keys = ', '.join(self.KEY_COLUMNS)
+
+        with self.transaction() as cur:
+            cur.execute(f"""
+                WITH expired AS (
+                    DELETE FROM {self.TABLE_NAME} WHERE run_time < %(cutoff)s
+                    RETURNING {keys}, value::jsonb AS result
+                )
+                INSERT INTO {self.summary_table} ({keys}, success, evaluated, successful, unsuccessful, success_percent)
+                SELECT {keys}, (result ->> 'success')::BOOLEAN,
+                       (result -> 'statistics' ->> 'evaluated_expectations')::INTEGER,
+                       (result -> 'statistics' ->> 'successful_expectations')::INTEGER,
+                       (result -> 'statistics' ->> 'unsuccessful_expectations')::INTEGER,
+                       (result -> 'statistics' ->> 'success_percent')::DOUBLE PRECISION
+                FROM expired
+                ON CONFLICT ({keys}) DO NOTHING
+            """, {'cutoff': cutoff})
+            compacted = int(cur.rowcount)
+
+        logging.info(f"{compacted} validation results before {cutoff} compacted into {self.summary_table}")
+
+        return compacted
+
+    def history(self, run_time_from: str, run_time_to: str) -> list[tuple[Any, ...]]:
+        """Get the outcome of the validations run in a time range, from the full and the compacted results.
+
+        @param run_time_from: first run time, in RUN_TIME_FORMAT or any prefix of it, e.g. '20241001'
+        @param run_time_to: run time the range ends before, same format
+        @return: run time, suite name, success, evaluated and successful expectations and whether the result is kept in full
+        """
+        with self.transaction() as cur:
+            cur.execute(f"""
+                SELECT run_time, expectation_suite_name, (value::jsonb ->> 'success')::BOOLEAN,
+                       (value::jsonb -> 'statistics' ->> 'evaluated_expectations')::INTEGER,
+                       (value::jsonb -> 'statistics' ->> 'successful_expectations')::INTEGER, TRUE
+                FROM {self.TABLE_NAME} WHERE run_time >= %(from)s AND run_time < %(to)s
+                UNION ALL
+                SELECT run_time, expectation_suite_name, success, evaluated, successful, FALSE
+                FROM {self.summary_table} WHERE run_time >= %(from)s AND run_time < %(to)s
+                ORDER BY 1, 2
+            """, {'from': run_time_from, 'to': run_time_to})
+            rows: list[tuple[Any, ...]] = cur.fetchall()
+
+        return rows
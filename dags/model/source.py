@@ -1,7 +1,20 @@
+import os
+import threading
+import time
+import ijson  # type: ignore
 import pendulum
 import requests  # type: ignore
-from typing import Any, cast
+from requests.adapters import HTTPAdapter  # type: ignore
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, cast
 from urllib.parse import quote
+from .cache import ResponseCache
+from .client import APIClient, CircuitBreaker, TokenBucket
+from .landing import LandingZone
+
+if TYPE_CHECKING:
+    from helper.metrics import Span
 
 
 class SourceAPI:
@@ -10,12 +23,74 @@ class SourceAPI:
     API_URL = ('https://data.elexon.co.uk/bmrs/api/v1/generation/actual/per-type/'
                'wind-and-solar?from={from_date}&to={to_date}&format=json')
     STATUS_OK = 200  # HTTP status code for successful request
+    TIMEOUT = (5, 60)  # Connect and read timeout in seconds
+    PERIOD = pendulum.duration(minutes=30)  # Length of a settlement period, the granularity of from/to
+    WORKERS = 4  # Concurrent requests of a chunked fetch
+    RETRIES = 4  # Retries of a request after a connection error, a timeout, 429 or 5xx
+    BACKOFF = 1.0  # Base delay of the retries in seconds, doubled on every retry with full jitter
+    MAX_BACKOFF = 60.0  # Longest delay in seconds, a longer Retry-After fails the request
+    RATE = float(os.environ.get('PSR_API_RATE', 10))  # Requests per second of the process, all threads included
+    BREAKER_THRESHOLD = 5  # Consecutive failures after which requests fail fast
+    BREAKER_RESET = 60.0  # Seconds of failing fast before a trial request
+
+    session_pid: int | None = None
+    shared_session: requests.Session | None = None
+    session_size = 0  # Keep-alive connections of the shared session, the most concurrent windows requested in the process
+    session_lock = threading.Lock()
+    client_pid: int | None = None
+    shared_client: APIClient | None = None
+
+    def __init__(self, workers: int = WORKERS, cache: ResponseCache | None = None, span: 'Span | None' = None,
+                 landing: LandingZone | None = None, endpoint: str | None = None) -> None:
+        """Initialize class.
+
+        The HTTP session and client are shared by the instances of every endpoint of the process.
+
+        :param workers: maximum number of windows fetched concurrently
+        :param cache: on-disk cache of responses, every window is requested from the API if None
+        :param span: span of the fetch stage recording the latency, status and size of every request and the cache hits
+        :param landing: archive of every payload received from the API, nothing is archived if None
+        :param endpoint: URL template of the dataset with {from_date} and {to_date}, API_URL by default
+        """
+        self.endpoint = endpoint or self.API_URL
+        self.workers = workers
+        self.cache = cache
+        self.span = span
+        self.landing = landing
+
+    @classmethod
+    def session(cls, workers: int = WORKERS) -> requests.Session:
+        """Get the keep-alive HTTP session of the current process.
 
-    def __init__(self) -> None:
-        """Initialize class."""
-        pass
+        The session is shared by every thread. Its connection pool holds a connection per concurrent worker of the largest
+        fetch of the process, a smaller pool would discard the connections of the other workers after every request.
 
-    def url_friendly_datetime(self, dt: pendulum.DateTime) -> str:
+        :param workers: concurrent requests the session must keep a connection for
+        """
+        with cls.session_lock:
+            if cls.shared_session is None or cls.session_pid != os.getpid():
+                cls.shared_session, cls.session_pid, cls.session_size = requests.Session(), os.getpid(), 0
+            if workers > cls.session_size:
+                # Replace the adapter by a larger one, the connections of the previous one are closed
+                cls.shared_session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+                cls.session_size = workers
+            return cls.shared_session
+
+    @classmethod
+    def client(cls) -> APIClient:
+        """Get the HTTP client of the current process.
+
+        The client is shared by every thread, so the rate limit and the circuit breaker apply to all the concurrent fetches.
+        """
+        with cls.session_lock:
+            if cls.shared_client is None or cls.client_pid != os.getpid():
+                cls.shared_client = APIClient(cls.session, cls.TIMEOUT, cls.RETRIES, cls.BACKOFF, cls.MAX_BACKOFF,
+                                              TokenBucket(cls.RATE, cls.WORKERS), CircuitBreaker(cls.BREAKER_THRESHOLD, cls.BREAKER_RESET))
+                cls.client_pid = os.getpid()
+            return cls.shared_client
+
+    @staticmethod
+    def url_friendly_datetime(dt: pendulum.DateTime) -> str:
         """To format datetime object for API query.
 
         :param dt: datetime object
@@ -23,19 +98,155 @@ class SourceAPI:
         """
         return quote(dt.strftime('%Y-%m-%d %H:%M'))
 
-    def fetch_json(self, from_date: pendulum.DateTime, to_date: pendulum.DateTime) -> dict[str, Any]:
+    def url(self, from_date: pendulum.DateTime, to_date: pendulum.DateTime) -> str:
+        """Build the API URL of a window.
+
+        :param from_date:   from start date in datetime format
+        :param to_date:     to start date in datetime format
+        :return:            URL of the JSON response
+        """
+        return self.endpoint.format(from_date=self.url_friendly_datetime(from_date), to_date=self.url_friendly_datetime(to_date))
+
+    @classmethod
+    def windows(cls, from_date: pendulum.DateTime, to_date: pendulum.DateTime,
+                chunk: pendulum.Duration) -> list[tuple[pendulum.DateTime, pendulum.DateTime]]:
+        """Split an inclusive range of settlement periods into consecutive non-overlapping windows.
+
+        :param from_date:   from start date in datetime format
+        :param to_date:     to start date in datetime format
+        :param chunk:       length of a window, at least one settlement period
+        :return:            list of inclusive (from, to) windows in chronological order
+        """
+        if chunk < cls.PERIOD:
+            raise ValueError(f"Chunk must cover at least one settlement period, got {chunk}")
+
+        windows = []
+        start = from_date
+        while start <= to_date:
+            end = min(start + chunk - cls.PERIOD, to_date)
+            windows.append((start, end))
+            start = start + chunk
+
+        return windows
+
+    def fetch_json(self, from_date: pendulum.DateTime, to_date: pendulum.DateTime,
+                   chunk: pendulum.Duration | None = None) -> dict[str, Any]:
         """Fetch JSON data from API.
 
+        If a chunk is given, the range is split into windows of that length which are fetched
+        concurrently and merged back in chronological order.
+
+        :param from_date:   from start date in datetime format
+        :param to_date:     to start date in datetime format
+        :param chunk:       length of a window, e.g. one settlement day; one request for the whole range if None
+        :return:            JSON data as a dictionary
+        """
+        if chunk is None:
+            return self.fetch_window(from_date, to_date)
+
+        windows = self.windows(from_date, to_date, chunk)
+        if len(windows) == 1:
+            return self.fetch_window(*windows[0])
+
+        workers = min(self.workers, len(windows))
+        self.session(workers)  # One keep-alive connection per worker
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            payloads = list(executor.map(lambda window: self.fetch_window(*window), windows))
+
+        return {**payloads[0], 'data': [item for payload in payloads for item in payload['data']]}
+
+    def fetch_window(self, from_date: pendulum.DateTime, to_date: pendulum.DateTime) -> dict[str, Any]:
+        """Fetch JSON data of a single window from the cache or the API.
+
+        Empty responses are not cached, the data may not have been published yet.
+
         :param from_date:   from start date in datetime format
         :param to_date:     to start date in datetime format
         :return:            JSON data as a dictionary
         """
-        url = SourceAPI.API_URL.format(from_date=self.url_friendly_datetime(from_date),
-                             to_date=self.url_friendly_datetime(to_date))
+        if self.cache is not None:
+            cached = self.cache.get(self.endpoint, from_date, to_date)
+            if cached is not None:
+                if self.span is not None:
+                    self.span.add('cache_hits')
+                return cached
 
-        response = requests.get(url)
+        started = time.perf_counter()
+        url = self.url(from_date, to_date)
+        response = self.client().get(url)
+        seconds = time.perf_counter() - started
+
+        if self.span is not None:
+            self.span.request(response.status_code, seconds, len(response.content))
 
         if response.status_code != self.STATUS_OK:
             raise Exception(f"Failed to fetch data: {response.status_code}")
 
-        return cast(dict[str, Any], response.json())
+        data = cast(dict[str, Any], response.json())
+
+        if self.cache is not None and data.get('data'):
+            self.cache.put(self.endpoint, from_date, to_date, data)
+
+        if self.landing is not None and data.get('data'):
+            self.landing.put(url, from_date, to_date, data, status=response.status_code, bytes=len(response.content), seconds=seconds)
+
+        return data
+
+    def stream_records(self, from_date: pendulum.DateTime, to_date: pendulum.DateTime,
+                       chunk: pendulum.Duration | None = None) -> Iterator[dict[str, Any]]:
+        """Yield the records of a range one by one while the responses are parsed incrementally.
+
+        The windows are requested one after the other, so at most one response is in flight
+        and memory does not grow with the length of the range.
+
+        :param from_date:   from start date in datetime format
+        :param to_date:     to start date in datetime format
+        :param chunk:       length of a window, e.g. one settlement day; one request for the whole range if None
+        :return:            records in chronological order of the windows
+        """
+        windows = self.windows(from_date, to_date, chunk) if chunk is not None else [(from_date, to_date)]
+
+        for window in windows:
+            yield from self.stream_window(*window)
+
+    def stream_window(self, from_date: pendulum.DateTime, to_date: pendulum.DateTime) -> Iterator[dict[str, Any]]:
+        """Yield the records of a single window from the cache or the streamed API response.
+
+        :param from_date:   from start date in datetime format
+        :param to_date:     to start date in datetime format
+        :return:            records of the window
+        """
+        if self.cache is not None:
+            cached = self.cache.get(self.endpoint, from_date, to_date)
+            if cached is not None:
+                if self.span is not None:
+                    self.span.add('cache_hits')
+                yield from cached['data']
+                return
+
+        records = []
+        keep = self.cache is not None or self.landing is not None
+
+        started = time.perf_counter()
+        url = self.url(from_date, to_date)
+        with self.client().get(url, stream=True) as response:
+            latency = time.perf_counter() - started  # Until the headers, the body is read while the records are consumed
+            try:
+                if response.status_code != self.STATUS_OK:
+                    raise Exception(f"Failed to fetch data: {response.status_code}")
+
+                response.raw.decode_content = True  # Let urllib3 undo a gzip transfer encoding
+                for record in ijson.items(response.raw, 'data.item', use_float=True):
+                    if keep:
+                        records.append(record)  # Bounded by the window length
+                    yield record
+            finally:
+                size = response.raw.tell()
+                if self.span is not None:
+                    self.span.request(response.status_code, latency, size)
+
+        if self.cache is not None and records:
+            self.cache.put(self.endpoint, from_date, to_date, {'data': records})
+
+        if self.landing is not None and records:
+            self.landing.put(url, from_date, to_date, {'data': records}, status=response.status_code, bytes=size, seconds=latency)
@@ -0,0 +1,89 @@
+import argparse
+import logging
+import os
+from great_expectations.data_context import AbstractDataContext
+from great_expectations.data_context.types.resource_identifiers import ExpectationSuiteIdentifier, ValidationResultIdentifier
+from .data_validation import DataValidator
+
+
+class DataDocs:
+    """Render the stored validation results into the Data Docs sites, outside of the ingestion runs.
+
+    The Validator task only stores the results. The pages already written to a site tell which results are rendered, so every
+    build renders the pending results only, newest first, and rewrites the index once.
+    """
+
+    SITE_NAMES = ("ingestion_time_site",)  # Sites rendered by default, see quality/gx_init.py
+    LIMIT = int(os.environ.get('PSR_GX_DOCS_LIMIT', 500))  # Results rendered per build at most, the older ones by the next builds
+
+    def __init__(self, project_dir: str | None = None, site_names: tuple[str, ...] | list[str] | None = None):
+        """Initialize the renderer of a project.
+
+        :param project_dir: Great Expectations project directory, $AIRFLOW_HOME/quality by default.
+        :param site_names: Names of the sites to render, SITE_NAMES by default.
+        """
+        self.context: AbstractDataContext = DataValidator.get_context(project_dir or os.path.join(os.environ['AIRFLOW_HOME'], "quality"))
+        self.site_names = tuple(site_names or self.SITE_NAMES)
+
+    def rendered(self, site_name: str) -> tuple[set[ValidationResultIdentifier], set[ExpectationSuiteIdentifier]]:
+        """Get the validation results and suites which have a page on a site.
+
+        :param site_name: Name of the site.
+        :return: Keys of the rendered validation results and suites.
+        """
+        site = self.context._init_site_builder_for_data_docs_site_creation(site_name, self.context.variables.data_docs_sites[site_name])  # type: ignore[index]
+        backends = site.target_store.store_backends
+
+        return ({ValidationResultIdentifier.from_tuple(key) for key in backends[ValidationResultIdentifier].list_keys()},
+                {ExpectationSuiteIdentifier.from_tuple(key) for key in backends[ExpectationSuiteIdentifier].list_keys()})
+
+    def pending(self, rendered: set[ValidationResultIdentifier]) -> list[ValidationResultIdentifier]:
+        """Get the stored validation results without a page, newest first.
+
+        :param rendered: Keys of the validation results rendered on the site.
+        :return: Keys of the validation results to render.
+        """
+        stored = self.context.validation_results_store.list_keys()
+
+        return sorted((key for key in stored if key not in rendered), key=lambda key: key.run_id.run_time, reverse=True)
+
+    def render(self, limit: int | None = None) -> dict[str, int]:
+        """Render the pending validation results, and the pages of their suites if missing, then rebuild the index.
+
+        :param limit: Results rendered per site at most, LIMIT by default.
+        :return: Number of results rendered by site name.
+        """
+        limit = limit or self.LIMIT
+        counts = {}
+
+        for site_name in self.site_names:
+            results, suites = self.rendered(site_name)
+            pending = self.pending(results)[:limit]
+            if pending:
+                missing = {key.expectation_suite_identifier for key in pending} - suites
+                self.context.build_data_docs(site_names=[site_name], resource_identifiers=[*pending, *missing])  # type: ignore[list-item]
+            counts[site_name] = len(pending)
+            logging.info(f"Data Docs site {site_name}: {len(pending)} results rendered, {len(results)} rendered before")
+
+        return counts
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Render the pending validation results from the command line.
+
+    python -m validation.data_docs --limit 1000
+    """
+    parser = argparse.ArgumentParser(description="Render the validation results which are not in the Data Docs sites yet.")
+    parser.add_argument("--project-dir", help="Great Expectations project directory, $AIRFLOW_HOME/quality by default.")
+    parser.add_argument("--site", action="append", dest="sites", help="Name of a site to render, repeatable, ingestion_time_site by default.")
+    parser.add_argument("--limit", type=int, help="Results rendered per site at most, $PSR_GX_DOCS_LIMIT or 500 by default.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("great_expectations").setLevel(logging.WARNING)
+
+    DataDocs(args.project_dir, args.sites).render(args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,148 @@
 import os
-from typing import Any, cast
+import random
+import threading
+import time
+from typing import Any
 import great_expectations as gx
 import pendulum
 from great_expectations import RunIdentifier
+from great_expectations.core import ExpectationSuiteValidationResult
+from great_expectations.constants import DATAFRAME_REPLACEMENT_STR
+from great_expectations.data_context import AbstractDataContext
+from great_expectations.data_context.store import DatabaseStoreBackend
+from great_expectations.data_context.types.resource_identifiers import ExpectationSuiteIdentifier, ValidationResultIdentifier
+from great_expectations.validator.v1_validator import Validator as BatchValidator
 import pandas as pd
 from .validator import Validator
 import logging
 
 class DataValidator(Validator):
-    """Class to validate data using great_expectations library."""
+    """Class to validate data using great_expectations library.
 
-    def __init__(self, data: list[dict[str, Any]]):
+    The suites of every checkpoint of the dataset, CHECKPOINTS by default, are evaluated in one combined run: the batch is built once,
+    the results are stored per suite as a checkpoint run would. The Data Docs are rendered from the stored results later on, see
+    validation/data_docs.py.
+    """
+
+    CHECKPOINTS = ("statistical_checkpoint", "completeness_checkpoint")
+    FULL_RUN_HOURS = int(os.environ.get('PSR_GX_FULL_RUN_HOURS', 6))  # Scheduled runs validated by GX on the hour divisible by it
+    SAMPLE_RATE = float(os.environ.get('PSR_GX_SAMPLE_RATE', 0.0))  # Share of the other scheduled runs validated by GX
+
+    contexts: dict[tuple[int, str], AbstractDataContext] = {}
+    context_lock = threading.Lock()
+
+    def __init__(self, data: list[dict[str, Any]], checkpoints: tuple[str, ...] | list[str] | None = None):
         """"Initialize data validator with data.
 
         :param data: List of dictionaries containing data to be validated.
+        :param checkpoints: Names of the checkpoints to run, CHECKPOINTS by default.
         """
+        self.checkpoints = tuple(checkpoints or self.CHECKPOINTS)
         try:
             self.df = pd.DataFrame(data)
         except Exception as e:
             logging.error(f"Error while converting data to pandas dataframe: {e}")
 
-        # Define the project directory
-        project_dir = os.path.join(os.environ['AIRFLOW_HOME'], "quality")
-        # Get the Great Expectations context
-        self.context = gx.get_context(mode="file", project_root_dir=project_dir)
+        # Seconds spent per validation step and results by suite name, filled by validate()
+        self.timings: dict[str, float] = {}
+        self.results: dict[str, ExpectationSuiteValidationResult] = {}
+
+        start = time.perf_counter()
+        # Get the Great Expectations context of the project directory
+        self.context = self.get_context(os.path.join(os.environ['AIRFLOW_HOME'], "quality"))
+        self.timings["context"] = time.perf_counter() - start
+
+    @classmethod
+    def get_context(cls, project_dir: str) -> AbstractDataContext:
+        """Get the context of a project, loaded from disk only once per process.
+
+        :param project_dir: Great Expectations project directory.
+        :return: The file data context.
+        """
+        key = (os.getpid(), project_dir)
+
+        with cls.context_lock:
+            if key not in cls.contexts:
+                cls.contexts[key] = gx.get_context(mode="file", project_root_dir=project_dir)
+            return cls.contexts[key]
+
+    @classmethod
+    def due(cls, logical_date: pendulum.DateTime) -> bool:
+        """Check if a scheduled run is validated by the full checkpoint run on top of the fast path.
+
+        :param logical_date: Logical date of the run.
+        :return: True on the scheduled hours and for the sampled share of the other runs.
+        """
+        if logical_date.minute == 0 and logical_date.hour % cls.FULL_RUN_HOURS == 0:
+            return True
+
+        return random.random() < cls.SAMPLE_RATE
 
     def validate(self) -> bool:
         """"Validate data using great_expectations library."""
+        start = time.perf_counter()
         # Define the run name and time.
         run_id = RunIdentifier(run_name="Ingestion time scan", run_time=pendulum.now('UTC').strftime('%Y%m%dT%H%M%S.%f'))
-        # Run the statistical checkpoints
-        statistical_result = self.context.checkpoints.get("statistical_checkpoint").run(
-            batch_parameters={"dataframe": self.df}, run_id=run_id,
-        )
-        # Run the completeness checkpoints
-        completeness_result = self.context.checkpoints.get("completeness_checkpoint").run(
-            batch_parameters={"dataframe": self.df}, run_id=run_id,
-        )
-
-        return cast(bool, statistical_result.success and completeness_result.success)
+        checkpoints = [self.context.checkpoints.get(name) for name in self.checkpoints]
+        definitions = [(checkpoint, definition) for checkpoint in checkpoints for definition in checkpoint.validation_definitions]
+
+        # Build the batch once, every validation definition shares the same batch definition
+        step = time.perf_counter()
+        batch_parameters = {"dataframe": self.df}
+        validator = BatchValidator(batch_definition=definitions[0][1].batch_definition, batch_parameters=batch_parameters)
+        batch_id = validator.active_batch_id
+        self.timings["batch"] = time.perf_counter() - step
+
+        # Evaluate the suites
+        results: dict[ValidationResultIdentifier, ExpectationSuiteValidationResult] = {}
+        for checkpoint, definition in definitions:
+            step = time.perf_counter()
+            validator.result_format = checkpoint.result_format
+            result = validator.validate_expectation_suite(definition.suite)
+            result.meta.update({
+                "validation_id": definition.id,
+                "checkpoint_id": checkpoint.id,
+                "run_id": run_id,
+                "validation_time": run_id.run_time,
+                "batch_parameters": {"dataframe": DATAFRAME_REPLACEMENT_STR},
+            })
+            key = ValidationResultIdentifier(
+                expectation_suite_identifier=ExpectationSuiteIdentifier(name=definition.suite.name),
+                run_id=run_id, batch_identifier=batch_id,
+            )
+            results[key] = result
+            self.results[definition.suite.name] = result
+            self.timings[f"suite.{definition.suite.name}"] = time.perf_counter() - step
+
+        # Store the results
+        step = time.perf_counter()
+        self.store(results)
+        self.timings["store"] = time.perf_counter() - step
+
+        self.timings["total"] = time.perf_counter() - start
+        logging.info(f"Data validation timings: {', '.join(f'{name}={seconds:.3f}s' for name, seconds in self.timings.items())}")
+
+        return all(result.success for result in results.values())
+
+    def store(self, results: dict[ValidationResultIdentifier, ExpectationSuiteValidationResult]) -> None:
+        """Store the results of a validation.
+
+        A database store gets them all in one statement and one transaction, any other store one by one.
+
+        :param results: Results by key.
+        """
+        store = self.context.validation_results_store
+        if not isinstance(store.store_backend, DatabaseStoreBackend):
+            for key, result in results.items():
+                store.store_validation_results(suite_validation_result=result, suite_validation_result_identifier=key,
+                                               expectation_suite_identifier=key.expectation_suite_identifier)
+            return
+
+        from model.results import ValidationResults
+
+        config = store.store_backend.config
+        ValidationResults(config["table_name"], config["url"]).write(
+            [(*store.key_to_tuple(key), store.serialize(result)) for key, result in results.items()])
 
     def doc(self) -> None:
         """Build the Data Docs."""
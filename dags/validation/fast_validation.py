@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+import numpy as np
+import numpy.typing as npt
+from .validator import Validator
+
+
+class FastDataValidator(Validator):
+    """Validate data with vectorized NumPy checks mirroring the Great Expectations suites.
+
+    The expectations are read from the suite files of the Great Expectations project, so both paths always evaluate the same
+    configuration. Only the expectation types used by `quality/gx_init.py` are supported, an unsupported one fails the fast
+    path so that the caller falls back to the full checkpoint run.
+    """
+
+    def __init__(self, data: list[dict[str, Any]], project_dir: str | Path | None = None,
+                 suites: tuple[str, ...] | list[str] | None = None):
+        """Initialize the validator with data.
+
+        :param data: List of dictionaries containing data to be validated.
+        :param project_dir: Great Expectations project directory, $AIRFLOW_HOME/quality by default.
+        :param suites: Names of the suites to evaluate, every suite of the project by default.
+        """
+        self.data = data
+        self.project_dir = Path(project_dir or Path(os.environ['AIRFLOW_HOME']) / "quality")
+        self.suite_names = tuple(suites) if suites else None
+        # Per-expectation results, filled by validate()
+        self.results: list[dict[str, Any]] = []
+
+        # Column names in first-seen order, as a pandas DataFrame built from the records would have them
+        self.columns = list(dict.fromkeys(key for item in data for key in item))
+        self.arrays: dict[str, npt.NDArray[np.object_]] = {}
+
+    def column(self, name: str) -> npt.NDArray[np.object_]:
+        """Get the values of a column as an object array, missing keys are None.
+
+        :param name: Column name.
+        :return: Column values.
+        """
+        if name not in self.arrays:
+            values = np.empty(len(self.data), dtype=object)
+            values[:] = [item.get(name) for item in self.data]
+            self.arrays[name] = values
+
+        return self.arrays[name]
+
+    def nulls(self, name: str) -> npt.NDArray[np.bool_]:
+        """Get the mask of null values of a column, None and NaN count as null.
+
+        :param name: Column name.
+        :return: Boolean mask.
+        """
+        values = self.column(name)
+
+        return np.asarray(np.equal(values, np.array(None)) | np.not_equal(values, values), dtype=bool)
+
+    def suites(self) -> dict[str, list[dict[str, Any]]]:
+        """Load the expectation configurations of the suites to evaluate.
+
+        :return: Expectation configurations by suite name.
+        :raise FileNotFoundError: if one of the requested suites is not in the project.
+        """
+        directory = self.project_dir / "gx" / "expectations"
+        paths = sorted(directory.glob("*.json")) if self.suite_names is None else [directory / f"{name}.json" for name in self.suite_names]
+
+        return {path.stem: json.loads(path.read_text())["expectations"] for path in paths}
+
+    def expect_column_to_exist(self, column: str, **kwargs: Any) -> tuple[bool, Any, int]:
+        """Check a column is present."""
+        return column in self.columns, column in self.columns, 0
+
+    def expect_table_column_count_to_equal(self, value: int, **kwargs: Any) -> tuple[bool, Any, int]:
+        """Check the number of columns."""
+        return len(self.columns) == value, len(self.columns), 0
+
+    def expect_table_row_count_to_be_between(self, min_value: int | None = None, max_value: int | None = None,
+                                             **kwargs: Any) -> tuple[bool, Any, int]:
+        """Check the number of rows within inclusive bounds, a missing bound is unbounded."""
+        rows = len(self.data)
+
+        return (min_value is None or rows >= min_value) and (max_value is None or rows <= max_value), rows, 0
+
+    def expect_column_values_to_not_be_null(self, column: str, mostly: float = 1.0, **kwargs: Any) -> tuple[bool, Any, int]:
+        """Check the share of non-null values of a column."""
+        if column not in self.columns:
+            return False, None, len(self.data)
+
+        unexpected = int(self.nulls(column).sum())
+
+        return len(self.data) == 0 or 1 - unexpected / len(self.data) >= mostly, unexpected, unexpected
+
+    def expect_column_values_to_be_between(self, column: str, min_value: float | None = None, max_value: float | None = None,  # noqa: PLR0913
+                                           strict_min: bool = False, strict_max: bool = False, mostly: float = 1.0,
+                                           **kwargs: Any) -> tuple[bool, Any, int]:
+        """Check the share of non-null values of a column within the bounds, null values are ignored."""
+        if column not in self.columns:
+            return False, None, len(self.data)
+
+        values = np.array(self.column(column)[~self.nulls(column)].tolist())
+        if values.size == 0:
+            return True, None, 0
+        if values.dtype.kind not in "iuf":
+            return False, None, int(values.size)  # Non-numeric values cannot be compared with the bounds
+
+        inside = np.ones(values.size, dtype=bool)
+        if min_value is not None:
+            inside &= values > min_value if strict_min else values >= min_value
+        if max_value is not None:
+            inside &= values < max_value if strict_max else values <= max_value
+        unexpected = int(values.size - inside.sum())
+
+        return 1 - unexpected / values.size >= mostly, unexpected, unexpected
+
+    def validate(self) -> bool:
+        """Evaluate every expectation of every suite and keep the per-expectation results."""
+        self.results = []
+
+        for suite, expectations in self.suites().items():
+            for expectation in expectations:
+                check: Callable[..., tuple[bool, Any, int]] | None = getattr(self, expectation["type"], None)
+                if check is None or not expectation["type"].startswith("expect_"):
+                    logging.warning(f"Expectation {expectation['type']} of suite {suite} is not supported by the fast path")
+                    success, observed, unexpected = False, None, 0
+                else:
+                    success, observed, unexpected = check(**expectation["kwargs"])
+
+                self.results.append({
+                    "suite": suite,
+                    "expectation": expectation["type"],
+                    "kwargs": expectation["kwargs"],
+                    "success": bool(success),
+                    "observed_value": observed,
+                    "unexpected_count": unexpected,
+                })
+
+        if not self.results:
+            # No suite file or no expectation, passing would let every batch through unchecked
+            logging.error(f"No expectation evaluated, the suites of {self.project_dir / 'gx' / 'expectations'} are missing or empty")
+            return False
+
+        return all(result["success"] for result in self.results)
@@ -14,7 +14,8 @@ class GXInitiator:
     - schema: This suite validates the schema definition of the data.
     - volume: This suite validates the quantity of the data.
 
-    The checkpoints also have an action to generate data docs for the transactions data. It stores the validation results in a database store as well.
+    The validation results are stored in a database store. The checkpoints have no action to generate data docs, so validating stays off
+    the HTML rendering: the data_docs DAG renders the stored results into the ingestion time site.
 
 
     Once anything changes regarding context, it must be recreated using `python init.py --mode recreate`.
@@ -28,11 +29,8 @@ class GXInitiator:
     BATCH_NAME = "psr batch"
     INGESTION_TIME_SITE_NAME = "ingestion_time_site"
     DOC_BASE_DIR_INGESTION_TIME = "uncommitted/data_docs/" + INGESTION_TIME_SITE_NAME + "/"
-    ACTIONS = [
-        gx.checkpoint.actions.UpdateDataDocsAction(
-            name="Automatically data docs generation",
-            site_names=[INGESTION_TIME_SITE_NAME],
-        ),
+    # The data docs are rendered by the data_docs DAG (dags/validation/data_docs.py), not by an UpdateDataDocsAction per run
+    ACTIONS: list[gx.checkpoint.actions.ValidationAction] = [
         # Add more actions here if needed
     ]
 
@@ -46,18 +46,12 @@ def destination() -> Generator[DestinationPostgreSQL, None, None]:
     # Perform setup actions if needed (e.g., create table)
     dest.TABLE_NAME = "test_psr"
 
-    dest.query(f"""
-    DROP TABLE IF EXISTS {dest.TABLE_NAME};
-    CREATE TABLE {dest.TABLE_NAME} (
-        curve_name VARCHAR(255),
-        curve_date TIMESTAMP NOT NULL,
-        value NUMERIC,
-        PRIMARY KEY (curve_name, curve_date)
-    );""")
+    dest.drop_tables()
+    dest.table_maintenance()
 
     # Yield instance for use in tests
     yield dest
 
     # Drop the table after the session ends
-    dest.query(f"DROP TABLE IF EXISTS {dest.TABLE_NAME};")
+    dest.drop_tables()
     dest.disconnect()
@@ -9,3 +9,19 @@ def dag_psr_sync() -> DagBag | Any:
     bag.id = "psr_sync"
 
     return bag
+
+@pytest.fixture(scope='module')
+def dag_psr_backfill() -> DagBag | Any:
+    """Initialize the psr_backfill DAG."""
+    bag = DagBag().get_dag("psr_backfill")
+    bag.id = "psr_backfill"
+
+    return bag
+
+@pytest.fixture(scope='module')
+def dag_data_docs() -> DagBag | Any:
+    """Initialize the data_docs DAG."""
+    bag = DagBag().get_dag("data_docs")
+    bag.id = "data_docs"
+
+    return bag
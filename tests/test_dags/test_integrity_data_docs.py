@@ -0,0 +1,29 @@
+from .integrity_tester import IntegrityTester
+from airflow.models import DagBag
+from airflow.task.priority_strategy import validate_and_load_priority_weight_strategy
+from airflow.utils.weight_rule import WeightRule
+
+
+class TestDataDocsDAG(IntegrityTester):
+    """Test the data_docs DAG."""
+
+    def test_dag_loaded(self, dag_data_docs: DagBag) -> None:
+        """Test if the DAG is correctly loaded."""
+        assert DagBag().import_errors == {}, "Improper import"
+        assert dag_data_docs.id in DagBag().dags, f"DAG '{dag_data_docs.id}' is missing"
+        assert dag_data_docs.max_active_runs == 1, "Builds should not overlap"
+
+    def test_task_count(self, dag_data_docs: DagBag) -> None:
+        """Test the number of tasks in the DAG."""
+        assert sorted(task.task_id for task in dag_data_docs.tasks) == ["compact", "render"]
+
+    def test_task_dependencies(self, dag_data_docs: DagBag) -> None:
+        """Test the old results are compacted once the new ones are rendered, outside of the ingestion DAGs."""
+        assert not dag_data_docs.get_task("render").upstream_list
+        assert [task.task_id for task in dag_data_docs.get_task("compact").upstream_list] == ["render"]
+
+    def test_low_priority(self, dag_data_docs: DagBag) -> None:
+        """Test the tasks keep the lowest priority, below every ingestion task."""
+        for task in dag_data_docs.tasks:
+            assert task.weight_rule == validate_and_load_priority_weight_strategy(WeightRule.ABSOLUTE)
+            assert task.priority_weight_total == 1
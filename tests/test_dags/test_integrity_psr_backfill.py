@@ -0,0 +1,56 @@
+import pytest
+from .integrity_tester import IntegrityTester
+from airflow.exceptions import AirflowException
+from airflow.models import DagBag
+from airflow.models.mappedoperator import MappedOperator
+from dag_psr_backfill import POOL, split
+
+
+class TestPSRBackfillDAG(IntegrityTester):
+    """Test the psr_backfill DAG."""
+
+    def test_dag_loaded(self, dag_psr_backfill: DagBag) -> None:
+        """Test if the DAG is correctly loaded."""
+        assert DagBag().import_errors == {}, "Improper import"
+        assert dag_psr_backfill.id in DagBag().dags, f"DAG '{dag_psr_backfill.id}' is missing"
+        assert dag_psr_backfill.schedule_interval is None, "Backfills should only be triggered manually"
+
+    def test_task_count(self, dag_psr_backfill: DagBag) -> None:
+        """Test the number of tasks in the DAG."""
+        expected_task_count = 3
+        assert len(dag_psr_backfill.tasks) == expected_task_count, f"Expected {expected_task_count} tasks, but got {len(dag_psr_backfill.tasks)}"
+
+    def test_task_dependencies(self, dag_psr_backfill: DagBag) -> None:
+        """Test the dependencies between the tasks."""
+        task_deps = {
+            "plan": [],
+            "load": ["plan"],
+            "report": ["load"],
+        }
+
+        for task_id, upstream_ids in task_deps.items():
+            task = dag_psr_backfill.get_task(task_id)
+            assert task is not None, f"Task '{task_id}' is missing in the DAG"
+            assert set(upstream_ids) == {t.task_id for t in task.upstream_list}, f"Task '{task_id}' has incorrect upstream dependencies"
+
+    def test_load_mapped_in_pool(self, dag_psr_backfill: DagBag) -> None:
+        """Test the windows are loaded by a mapped task bounded by the backfill pool."""
+        load = dag_psr_backfill.get_task("load")
+
+        assert isinstance(load, MappedOperator), "Load task should be mapped over the windows"
+        assert load.pool == POOL
+
+    def test_split(self) -> None:
+        """Test a range is split into windows of whole settlement periods, the last one shorter."""
+        windows = split({"date_from": "2024-01-01T00:00:00Z", "date_to": "2024-01-17T10:45:00Z", "window_days": 7})
+
+        assert windows == [
+            {"date_from": "2024-01-01T00:00:00Z", "date_to": "2024-01-07T23:30:00Z"},
+            {"date_from": "2024-01-08T00:00:00Z", "date_to": "2024-01-14T23:30:00Z"},
+            {"date_from": "2024-01-15T00:00:00Z", "date_to": "2024-01-17T10:30:00Z"},
+        ]
+
+    def test_split_invalid(self) -> None:
+        """Test a range ending before it starts is rejected."""
+        with pytest.raises(AirflowException):
+            split({"date_from": "2024-01-02T00:00:00Z", "date_to": "2024-01-01T00:00:00Z", "window_days": 7})
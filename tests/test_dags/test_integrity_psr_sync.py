@@ -1,4 +1,5 @@
 from .integrity_tester import IntegrityTester
+from typing import Any
 from airflow.models import DagBag
 
 
@@ -18,17 +19,19 @@ class TestPSRSyncDAG(IntegrityTester):
 
     def test_task_count(self, dag_psr_sync: DagBag) -> None:
         """Test the number of tasks in the DAG."""
-        expected_task_count = 6
-        assert len(dag_psr_sync.tasks) == expected_task_count, f"Expected 5 tasks, but got {len(dag_psr_sync.tasks)}"
+        expected_task_count = 8
+        assert len(dag_psr_sync.tasks) == expected_task_count, f"Expected {expected_task_count} tasks, but got {len(dag_psr_sync.tasks)}"
 
     def test_task_dependencies(self, dag_psr_sync: DagBag) -> None:
         """Test the dependencies between the tasks."""
         # Define expected upstream and downstream dependencies
         task_deps = {
-            "Processor.fetch": ["parameterize"],
+            "available": ["parameterize"],
+            "Processor.fetch": ["available"],
             "Processor.validate": ["Processor.fetch"],
             "Processor.transform": ["Processor.validate"],
             "sync": ["Processor.transform"],
+            "stream": ["parameterize"],
         }
 
         for task_id, upstream_ids in task_deps.items():
@@ -36,3 +39,15 @@ class TestPSRSyncDAG(IntegrityTester):
             assert task is not None, f"Task '{task_id}' is missing in the DAG"
             upstream_tasks = [t.task_id for t in task.upstream_list]
             assert set(upstream_ids) == set(upstream_tasks), f"Task '{task_id}' has incorrect upstream dependencies"
+
+    def test_cleanup_callback(self, dag_psr_sync: DagBag, monkeypatch: Any) -> None:
+        """Test the XCom cleanup is only attached to the DAG when the reference-passing backend is configured."""
+        from dag_factory import ingestion_dag
+        from helper.xcom_backend import ReferenceXComBackend
+        from model.dataset import Dataset
+
+        assert dag_psr_sync.on_success_callback is None
+
+        monkeypatch.setenv("AIRFLOW__CORE__XCOM_BACKEND", "helper.xcom_backend.ReferenceXComBackend")
+        dag = ingestion_dag(Dataset.registry()["psr"])
+        assert dag.on_success_callback == ReferenceXComBackend.cleanup
@@ -0,0 +1,101 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+import pytest
+import yaml
+
+DAGS_FOLDER = Path(__file__).parents[2] / "dags"
+
+# Budget of parsing one DAG file in a scheduler which already imported Airflow
+PARSE_SECONDS = 0.5
+PARSE_MEGABYTES = 20
+# Budget of every further DAG generated by the factory, and the size of the registry it is measured with
+DATASET_SECONDS = 0.05
+DATASETS = 50
+
+# Libraries which only the tasks need
+HEAVY_MODULES = ("great_expectations", "pandas", "numpy", "scipy", "pyarrow", "psycopg2", "aiohttp", "ijson")
+
+# Parse the file like the DAG processor does, in a fresh interpreter which only imported the Airflow modules used by any DAG file
+PARSE_SCRIPT = """
+import json, resource, sys, time
+import airflow.decorators, airflow.operators.python, airflow.sensors.base, airflow.utils.edgemodifier
+from airflow.models import DagBag
+
+path = sys.argv[1]
+bag = DagBag(dag_folder=path, include_examples=False, collect_dags=False)
+before, rss = set(sys.modules), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+dags = bag.process_file(path)
+seconds = time.perf_counter() - started
+
+print(json.dumps({
+    "dag_ids": [dag.dag_id for dag in dags],
+    "errors": {str(file): str(error) for file, error in bag.import_errors.items()},
+    "seconds": seconds,
+    "megabytes": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) / 1024,
+    "modules": sorted({name.split(".")[0] for name in set(sys.modules) - before}),
+}))
+"""
+
+
+def parse(dag_file: str, **env: str) -> dict[str, Any]:
+    """Parse a DAG file in a subprocess.
+
+    :param dag_file: file name in the DAGs folder
+    :param env: further environment variables of the subprocess
+    :return: DAG ids, import errors, seconds, megabytes and top-level modules imported by the parse
+    """
+    # The DAG processor has the DAGs folder on sys.path, the pythonpath of pytest.ini only applies to the pytest process
+    path = os.pathsep.join(filter(None, [str(DAGS_FOLDER), os.environ.get("PYTHONPATH")]))
+    output = subprocess.run([sys.executable, "-c", PARSE_SCRIPT, str(DAGS_FOLDER / dag_file)], capture_output=True, text=True, check=True,
+                            env={**os.environ, "PYTHONPATH": path, "AIRFLOW__CORE__DAGS_FOLDER": str(DAGS_FOLDER), **env}).stdout
+    result: dict[str, Any] = json.loads(output.splitlines()[-1])
+
+    return result
+
+
+class TestParseTime:
+    """Test the DAG files stay cheap to parse for the scheduler."""
+
+    @pytest.mark.parametrize(("dag_file", "dag_id"), [("dag_factory.py", "psr_sync"), ("dag_psr_backfill.py", "psr_backfill"),
+                                                    ("dag_data_docs.py", "data_docs")])
+    def test_parse_budget(self, dag_file: str, dag_id: str) -> None:
+        """Test a DAG file parses within the time and memory budget without importing the task libraries.
+
+        :param dag_file: DAG file name.
+        :param dag_id: DAG id defined by the file.
+        """
+        result = parse(dag_file)
+
+        assert not result["errors"]
+        assert result["dag_ids"] == [dag_id]
+        assert not set(HEAVY_MODULES) & set(result["modules"]), "Heavy libraries should only be imported by the tasks"
+        assert result["seconds"] < PARSE_SECONDS, f"Parsing took {result['seconds']:.2f}s"
+        assert result["megabytes"] < PARSE_MEGABYTES, f"Parsing took {result['megabytes']:.0f} MB"
+
+    def test_factory_scales(self, tmp_path: Path) -> None:
+        """Test the factory parses a large registry at a small cost per dataset, and a task run builds its DAG only.
+
+        :param tmp_path: The pytest temporary directory.
+        """
+        psr = yaml.safe_load((DAGS_FOLDER / "datasets.yml").read_text())["psr"]
+        registry = tmp_path / "datasets.yml"
+        registry.write_text(yaml.safe_dump({f"dataset{n}": {**psr, "dag_id": f"dataset{n}_sync", "table": f"dataset{n}"} for n in range(DATASETS)}))
+
+        single = parse("dag_factory.py")
+        every = parse("dag_factory.py", PSR_DATASETS=str(registry))
+        task = parse("dag_factory.py", PSR_DATASETS=str(registry), _AIRFLOW_PARSING_CONTEXT_DAG_ID="dataset7_sync")
+
+        assert not every["errors"]
+        assert sorted(every["dag_ids"]) == sorted(f"dataset{n}_sync" for n in range(DATASETS))
+        assert not set(HEAVY_MODULES) & set(every["modules"])
+        seconds = (every["seconds"] - single["seconds"]) / (DATASETS - 1)
+        assert seconds < DATASET_SECONDS, f"Every further dataset took {seconds:.3f}s"
+        assert every["megabytes"] < PARSE_MEGABYTES, f"Parsing took {every['megabytes']:.0f} MB"
+
+        assert task["dag_ids"] == ["dataset7_sync"]
+        assert task["seconds"] < PARSE_SECONDS, f"Parsing the DAG of a task took {task['seconds']:.2f}s"
@@ -1,7 +1,7 @@
 from typing import Any
 from datetime import datetime, timezone
 import pendulum
-from helper.api_helper import APIHelper
+from helper.api_helper import APIHelper, CurveNames
 
 
 class TestAPIHelper:
@@ -18,6 +18,75 @@ class TestAPIHelper:
             ('bmreports, Solar, min30', '2023-07-21T04:30:00Z', 89.0),
         ]
 
+    def test_fields(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test the transforms map the fields of another dataset.
+
+        :param mock_data: Mock data from fixture.
+        """
+        fields = {'curve_name': 'elexon, {businessType}, {psrType:.4}', 'curve_date': 'startTime', 'value': 'settlementPeriod',
+                  'publish_time': 'publishTime'}
+        names = ['elexon, Wind generation, Wind', 'elexon, Wind generation, Wind', 'elexon, Solar generation, Sola']
+
+        assert APIHelper.transform(mock_data, fields) == [(name, '2023-07-21T04:30:00Z', 12) for name in names]
+        assert APIHelper.revisions(mock_data, fields) == [(name, '2023-07-21T04:30:00Z', 12, '2023-07-21T06:58:08Z') for name in names]
+        assert list(APIHelper.transform_columnar(mock_data, fields)['curve_name']) == names
+        assert set(APIHelper.watermarks(mock_data, fields)) == set(names)
+        loaded = {(name, curve_date): value for name, curve_date, value in APIHelper.transform(mock_data, fields)}
+        assert APIHelper.incremental(mock_data, loaded, fields)['data'] == []
+
+    def test_curve_names(self) -> None:
+        """Test every curve name is built once and shared by the records of the curve."""
+        names = CurveNames('bmreports, {psrType}, min30')
+        first, second = {'psrType': ''.join(['So', 'lar'])}, {'psrType': 'Solar'}
+
+        assert names(first) is names(second) == 'bmreports, Solar, min30'
+        assert len(names) == 1
+        assert CurveNames('constant')({}) == 'constant'
+
+    def test_watermarks(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test the latest publish time and curve date per curve.
+
+        :param mock_data: Mock data from fixture.
+        """
+        data = {'data': [*mock_data['data'], {**mock_data['data'][0], 'startTime': '2023-07-21T05:00:00Z', 'publishTime': '2023-07-21T06:30:00Z'}]}
+
+        assert APIHelper.watermarks(data)['bmreports, Wind Onshore, min30'] == ('2023-07-21T06:58:08Z', '2023-07-21T05:00:00Z')
+        assert len(APIHelper.watermarks(data)) == len(mock_data['data'])
+
+    def test_incremental(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test only the records not loaded yet or with another value than the loaded row are kept.
+
+        :param mock_data: Mock data from fixture.
+        """
+        onshore, offshore, solar = mock_data['data']
+        missing = {**solar, 'quantity': None}
+        loaded = {
+            ('bmreports, Wind Onshore, min30', '2023-07-21T04:30:00Z'): 640.283,  # Already loaded
+            ('bmreports, Wind Offshore, min30', '2023-07-21T04:30:00Z'): 70.0,  # Revised since
+            ('bmreports, Solar, min30', '2023-07-21T05:00:00Z'): 90.0,  # A later period, the earlier one was never loaded
+        }
+
+        assert APIHelper.incremental(mock_data, loaded)['data'] == [offshore, solar]
+        assert APIHelper.incremental(mock_data, {})['data'] == [onshore, offshore, solar]
+        assert APIHelper.incremental({'data': [missing]}, {('bmreports, Solar, min30', '2023-07-21T04:30:00Z'): None})['data'] == []
+        assert APIHelper.incremental({'data': [solar]}, {('bmreports, Solar, min30', '2023-07-21T04:30:00Z'): None})['data'] == [solar]
+
+    def test_deduplicate(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test only the revision published last of a curve and curve date is kept, the records keeping their order.
+
+        :param mock_data: Mock data from fixture.
+        """
+        onshore, offshore, solar = mock_data['data']
+        revised = {**onshore, 'quantity': 1.0, 'publishTime': '2023-07-21T07:30:00Z'}
+        resent = {**solar, 'quantity': 2.0}  # Same publish time, the later record wins
+        stale = {**offshore, 'quantity': 3.0, 'publishTime': '2023-07-21T06:00:00Z'}
+
+        data, dropped = APIHelper.deduplicate({'data': [onshore, offshore, solar, revised, resent, stale]})
+
+        assert data['data'] == [offshore, revised, resent]
+        assert dropped == len([onshore, solar, stale])
+        assert APIHelper.deduplicate(mock_data) == (mock_data, 0)
+
     def test_date_param(self) -> None:
         """Test the date_param method."""
         assert APIHelper.date_param(
@@ -29,3 +98,26 @@ class TestAPIHelper:
         assert APIHelper.floored_to_30_min(
             pendulum.instance(datetime(2024, 10, 16, 10, 45, tzinfo=timezone.utc))) == pendulum.instance(
             datetime(2024, 10, 16, 10, 30, tzinfo=timezone.utc))
+
+    def test_transform_columnar(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test the columnar transform matches the tuple transform.
+
+        :param mock_data: Mock data from fixture.
+        """
+        frame = APIHelper.transform_columnar(mock_data)
+
+        assert list(frame.itertuples(index=False, name=None)) == APIHelper.transform(mock_data)
+        assert list(frame['curve_name'].cat.categories) == ['bmreports, Wind Onshore, min30', 'bmreports, Wind Offshore, min30', 'bmreports, Solar, min30']
+
+    def test_copy_buffer(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test the columns are serialized into COPY CSV format, missing values as NULL.
+
+        :param mock_data: Mock data from fixture.
+        """
+        data = {'data': [*mock_data['data'][:2], {**mock_data['data'][2], 'quantity': None}]}
+
+        assert APIHelper.copy_buffer(APIHelper.transform_columnar(data)).read() == (
+            '"bmreports, Wind Onshore, min30",2023-07-21T04:30:00Z,640.283\n'
+            '"bmreports, Wind Offshore, min30",2023-07-21T04:30:00Z,77.014\n'
+            '"bmreports, Solar, min30",2023-07-21T04:30:00Z,\n'
+        )
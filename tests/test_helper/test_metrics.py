@@ -0,0 +1,162 @@
+import json
+import socket
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from helper.metrics import FileSink, Metrics, MetricsSink, OpenTelemetrySink, Span, StatsDSink
+
+
+class TestMetrics:
+    """Test the Metrics class and its sinks."""
+
+    def test_stage(self, tmp_path: Path) -> None:
+        """Test a stage emits its wall time, counters and requests, correlated to the DAG run.
+
+        :param tmp_path: The pytest temporary directory.
+        """
+        sink = FileSink(tmp_path / "spans.jsonl")
+        metrics = Metrics([sink], "psr_sync", "manual__1", task_id="Processor.fetch")
+
+        with metrics.stage("fetch") as span:
+            span.add("rows", 3)
+            span.request(200, 0.25, 100)
+            span.request(503, 0.5, 0)
+        with metrics.stage("validate"):
+            pass
+
+        fetch, validate = (json.loads(line) for line in sink.path.read_text().splitlines())
+        assert fetch["name"] == "fetch"
+        assert fetch["status"] == "ok"
+        assert fetch["duration"] >= 0
+        assert fetch["counters"] == {"rows": 3, "bytes": 100}
+        assert fetch["http"] == {"requests": 2, "statuses": {"200": 1, "503": 1}, "latency_total": 0.75, "latency_max": 0.5}
+        assert fetch["attributes"] == {"dag_id": "psr_sync", "run_id": "manual__1", "task_id": "Processor.fetch"}
+        assert fetch["trace_id"] == validate["trace_id"] == Metrics(dag_id="psr_sync", run_id="manual__1").trace_id
+        assert fetch["span_id"] != validate["span_id"]
+        assert fetch["trace_id"] != Metrics(dag_id="psr_sync", run_id="manual__2").trace_id
+
+    def test_stage_error(self, tmp_path: Path) -> None:
+        """Test a failing stage is emitted with its error and the exception is raised.
+
+        :param tmp_path: The pytest temporary directory.
+        """
+        sink = FileSink(tmp_path / "spans.jsonl")
+
+        with pytest.raises(ValueError, match="boom"), Metrics([sink]).stage("sync"):
+            raise ValueError("boom")
+
+        record = json.loads(sink.path.read_text())
+        assert record["status"] == "error"
+        assert record["error"] == "ValueError('boom')"
+
+    def test_sink_failure(self) -> None:
+        """Test a failing sink does not fail the stage."""
+        class BrokenSink(MetricsSink):
+            def emit(self, span: Span) -> None:
+                raise OSError("unreachable")
+
+        with Metrics([BrokenSink()]).stage("fetch") as span:
+            span.add("rows")
+
+        assert span.duration is not None
+
+    def test_sink_abstract(self) -> None:
+        """Test a sink must implement emit."""
+        class NoSink(MetricsSink):
+            pass
+
+        with pytest.raises(TypeError):
+            NoSink()  # type: ignore[abstract]
+
+    def test_statsd_sink(self, monkeypatch: Any) -> None:
+        """Test the spans are sent to StatsD as timers and counters, without leaving a socket open.
+
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        opened: list[socket.socket] = []
+
+        class TrackedSocket(socket.socket):
+            def __init__(self, *args: Any) -> None:
+                super().__init__(*args)
+                opened.append(self)
+
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(("127.0.0.1", 0))
+        server.settimeout(5)
+
+        monkeypatch.setattr("helper.metrics.socket.socket", TrackedSocket)
+        with Metrics([StatsDSink("127.0.0.1", server.getsockname()[1])]).stage("fetch") as span:
+            span.add("rows", 3)
+            span.request(200, 0.25, 100)
+
+        lines = {server.recv(1024).decode() for _ in range(5)}
+        server.close()
+        assert {"psr.fetch.rows:3|c", "psr.fetch.bytes:100|c", "psr.fetch.http.latency:250.000|ms", "psr.fetch.http.status.200:1|c"} < lines
+        assert any(line.startswith("psr.fetch.duration:") and line.endswith("|ms") for line in lines)
+        assert opened
+        assert all(sock.fileno() == -1 for sock in opened), "The socket should be closed once the span is sent"
+
+    def test_opentelemetry_sink(self) -> None:
+        """Test the spans are exported through OpenTelemetry as children of the DAG run."""
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        metrics = Metrics([OpenTelemetrySink(provider)], "psr_sync", "manual__1")
+        inserted = 2
+
+        with metrics.stage("sync") as span:
+            span.add("db_inserted", inserted)
+
+        exported, = exporter.get_finished_spans()
+        assert exported.name == "sync"
+        assert exported.context is not None
+        assert f"{exported.context.trace_id:032x}" == metrics.trace_id
+        assert exported.parent is not None
+        assert f"{exported.parent.span_id:016x}" == metrics.parent_id
+        assert exported.attributes is not None
+        assert exported.attributes["psr.db_inserted"] == inserted
+        assert exported.attributes["run_id"] == "manual__1"
+
+    def test_from_context(self, tmp_path: Path, monkeypatch: Any) -> None:
+        """Test the sinks are configured from the environment and the spans labelled with the task instance.
+
+        :param tmp_path: The pytest temporary directory.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        monkeypatch.setenv("PSR_METRICS_SINKS", "file, statsd")
+        monkeypatch.setenv("PSR_METRICS_FILE", str(tmp_path / "spans.jsonl"))
+        ti = SimpleNamespace(dag_id="psr_backfill", run_id="manual__1", task_id="load", try_number=1, map_index=3)
+
+        metrics = Metrics.from_context({"ti": ti})
+
+        assert [type(sink) for sink in metrics.sinks] == [FileSink, StatsDSink]
+        assert metrics.span("sync").attributes == {"dag_id": "psr_backfill", "run_id": "manual__1", "task_id": "load", "try_number": 1, "map_index": 3}
+
+    def test_unknown_sink(self, tmp_path: Path, monkeypatch: Any, caplog: pytest.LogCaptureFixture) -> None:
+        """Test an unknown sink is skipped with a warning instead of failing the task.
+
+        :param tmp_path: The pytest temporary directory.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        :param caplog: The pytest log capture fixture.
+        """
+        monkeypatch.setenv("PSR_METRICS_SINKS", "prometheus, file")
+        monkeypatch.setenv("PSR_METRICS_FILE", str(tmp_path / "spans.jsonl"))
+        ti = SimpleNamespace(dag_id="psr_backfill", run_id="manual__1", task_id="load", try_number=1, map_index=-1)
+
+        metrics = Metrics.from_context({"ti": ti})
+
+        assert [type(sink) for sink in metrics.sinks] == [FileSink]
+        assert "prometheus" in caplog.text
+
+    def test_metered(self) -> None:
+        """Test the items pass through unchanged and are counted as rows."""
+        span = Metrics().span("validate")
+
+        assert list(Metrics.metered(iter([[1, 2], [3]]), span, len)) == [[1, 2], [3]]
+        assert span.counters == {"rows": 3}
+        assert span.elapsed >= 0
@@ -0,0 +1,147 @@
+import json
+import pendulum
+import pytest
+from pathlib import Path
+from typing import Any
+from helper.metrics import FileSink, Metrics
+from helper.stream_helper import StreamHelper, main
+from model.dataset import Dataset
+from model.destination import DestinationPostgreSQL
+from model.landing import LandingZone
+from model.source import SourceAPI
+
+
+class TestStreamHelper:
+    """Test the StreamHelper class."""
+
+    def test_batched(self) -> None:
+        """Test records are grouped into bounded batches."""
+        assert [len(batch) for batch in StreamHelper.batched(({'n': n} for n in range(5)), size=2)] == [2, 2, 1]
+
+    def test_validated(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test a batch failing validation stops the stream after the valid batches.
+
+        :param mock_data: Mock data from fixture.
+        """
+        batches = StreamHelper.validated(iter([mock_data["data"], [{**item, "settlementPeriod": 49} for item in mock_data["data"]]]))
+
+        assert next(batches) == mock_data["data"]
+        with pytest.raises(ValueError, match="Batch 1"):
+            next(batches)
+
+    def test_dataset(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test the stages map the fields of the dataset.
+
+        :param mock_data: Mock data from fixture.
+        """
+        fields = {"curve_name": "elexon, {businessType}", "curve_date": "startTime", "value": "settlementPeriod", "publish_time": "publishTime"}
+        dataset = Dataset("generation", Dataset.get("psr").endpoint, "generation", fields, ["completeness_checkpoint"], ["schema"],
+                          pendulum.datetime(2024, 1, 1))
+        watermarks: dict[str, tuple[str, str]] = {}
+
+        rows = list(StreamHelper.transformed(StreamHelper.watermarked(StreamHelper.validated([mock_data["data"]], dataset), watermarks, dataset), dataset))
+
+        assert rows == [(f"elexon, {item['businessType']}", item["startTime"], item["settlementPeriod"], item["publishTime"]) for item in mock_data["data"]]
+        assert set(watermarks) == {"elexon, Wind generation", "elexon, Solar generation"}
+
+    def test_sync(self, destination: DestinationPostgreSQL, mock_data: dict[str, list[dict[str, Any]]], monkeypatch: Any) -> None:
+        """Test records streamed from the source end up in the destination with their watermarks.
+
+        :param destination: The destination object from fixture.
+        :param mock_data: Mock data from fixture.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        records = [{**item, "psrType": f"Stream {item['psrType']}", "startTime": f"2023-07-22T0{hour}:00:00Z"}
+                   for hour in range(3) for item in mock_data["data"]]
+        monkeypatch.setattr(SourceAPI, "stream_records", lambda self, *args, **kwargs: iter(records))
+        monkeypatch.setattr(StreamHelper, "BATCH_SIZE", 2)
+
+        count = StreamHelper.sync(SourceAPI(), destination, pendulum.datetime(2023, 7, 22), pendulum.datetime(2023, 7, 22, 2))
+
+        assert count == len(records)
+        assert destination.sync_stats["inserted"] == len(records)
+        assert destination.watermarks()["bmreports, Stream Solar, min30"] == ("2023-07-21T06:58:08Z", "2023-07-22T02:00:00Z")
+
+    def test_sync_duplicates(self, destination: DestinationPostgreSQL, mock_data: dict[str, list[dict[str, Any]]], monkeypatch: Any) -> None:
+        """Test revisions of a settlement period within and across batches are loaded once, the one published last winning.
+
+        :param destination: The destination object from fixture.
+        :param mock_data: Mock data from fixture.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        records = [{**item, "psrType": f"Revised {item['psrType']}"} for item in mock_data["data"]]
+        revisions = [{**item, "quantity": 1.0, "publishTime": "2023-07-21T07:30:00Z"} for item in records]
+        stale = [{**item, "quantity": 2.0, "publishTime": "2023-07-21T06:00:00Z"} for item in records]  # Fetched last, published first
+        monkeypatch.setattr(SourceAPI, "stream_records", lambda self, *args, **kwargs: iter(records + revisions + stale))
+        # Batches of 4: one record and its revision in the first batch, one revision and its stale record in the second
+        monkeypatch.setattr(StreamHelper, "BATCH_SIZE", 4)
+
+        count = StreamHelper.sync(SourceAPI(), destination, pendulum.datetime(2023, 7, 21), pendulum.datetime(2023, 7, 21))
+
+        assert count == len(records + revisions + stale) - 2
+        assert destination.sync_stats["duplicates"] == len(records + revisions + stale) - 2 - len(records)
+        assert destination.fetch(f"SELECT DISTINCT value::float8 FROM {destination.TABLE_NAME} WHERE curve_name LIKE '%Revised%'") == [(1.0,)]
+
+    def test_sync_metrics(self, destination: DestinationPostgreSQL, mock_data: dict[str, list[dict[str, Any]]], tmp_path: Path, monkeypatch: Any) -> None:
+        """Test a streamed sync emits one span per stage with its rows and the rows written.
+
+        :param destination: The destination object from fixture.
+        :param mock_data: Mock data from fixture.
+        :param tmp_path: The pytest temporary directory.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        records = [{**item, "psrType": f"Metered {item['psrType']}"} for item in mock_data["data"]]
+        monkeypatch.setattr(SourceAPI, "stream_records", lambda self, *args, **kwargs: iter(records))
+        sink = FileSink(tmp_path / "spans.jsonl")
+
+        StreamHelper.sync(SourceAPI(), destination, pendulum.datetime(2023, 7, 21), pendulum.datetime(2023, 7, 21), metrics=Metrics([sink]))
+
+        spans = {span["name"]: span for span in map(json.loads, sink.path.read_text().splitlines())}
+        assert list(spans) == ["fetch", "validate", "transform", "sync"]
+        assert all(span["counters"]["rows"] == len(records) for span in spans.values())
+        assert spans["sync"]["counters"]["db_inserted"] == len(records)
+        assert all(span["duration"] >= 0 for span in spans.values())
+        assert len({span["trace_id"] for span in spans.values()}) == 1
+
+    def test_replay(self, destination: DestinationPostgreSQL, mock_data: dict[str, list[dict[str, Any]]], tmp_path: Path, monkeypatch: Any) -> None:
+        """Test the archived payloads are reloaded without the API, the latest revision of a window winning.
+
+        :param destination: The destination object from fixture.
+        :param mock_data: Mock data from fixture.
+        :param tmp_path: The pytest temporary directory.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        def no_api(*args: Any, **kwargs: Any) -> Any:
+            raise AssertionError("The API should not be requested")
+
+        monkeypatch.setattr(SourceAPI, "client", no_api)
+        landing = LandingZone(tmp_path)
+        records = [{**item, "psrType": f"Replay {item['psrType']}", "settlementDate": "2023-06-30", "startTime": "2023-06-30T04:30:00Z"}
+                   for item in mock_data["data"]]
+        period = pendulum.datetime(2023, 6, 30, 4, 30)
+        landing.put("url", period, period, {"data": [{**item, "quantity": 1.0} for item in records]})
+        landing.put("url", period, period, {"data": [{**item, "quantity": 2.0} for item in records]})
+        # Fetched last, the wider window sorts first by name but is replayed last
+        landing.put("url", period.subtract(hours=4), period, {"data": records})
+        landing.put("url", period.add(days=1), period.add(days=1), {"data": [{**item, "settlementDate": "2023-07-01"} for item in records]})
+
+        totals = StreamHelper.replay(landing, destination, "2023-06-30", "2023-06-30")
+
+        assert totals == {"files": 2, "rows": 2 * len(records), "inserted": len(records), "updated": len(records), "duplicates": 0}
+        assert destination.fetch(f"SELECT curve_name, value::float8 FROM {destination.TABLE_NAME} WHERE curve_name LIKE '%Replay%' ORDER BY curve_name") == [
+            ("bmreports, Replay Solar, min30", 89), ("bmreports, Replay Wind Offshore, min30", 77.014), ("bmreports, Replay Wind Onshore, min30", 640.283)]
+        assert destination.watermarks()["bmreports, Replay Solar, min30"] == ("2023-07-21T06:58:08Z", "2023-06-30T04:30:00Z")
+
+    def test_replay_command(self, destination: DestinationPostgreSQL, mock_data: dict[str, list[dict[str, Any]]], tmp_path: Path) -> None:
+        """Test the command line replays a range of the landing zone into the given table.
+
+        :param destination: The destination object from fixture.
+        :param mock_data: Mock data from fixture.
+        :param tmp_path: The pytest temporary directory.
+        """
+        records = [{**item, "psrType": f"Command {item['psrType']}", "settlementDate": "2023-06-29"} for item in mock_data["data"]]
+        LandingZone(tmp_path, dataset="psr").put("url", pendulum.datetime(2023, 6, 29), pendulum.datetime(2023, 6, 29), {"data": records})
+
+        main(["--date-from", "2023-06-29", "--date-to", "2023-06-29", "--landing-dir", str(tmp_path), "--table", destination.TABLE_NAME])
+
+        assert destination.fetch(f"SELECT count(*) FROM {destination.TABLE_NAME} WHERE curve_name LIKE '%Command%'") == [(len(records),)]
@@ -0,0 +1,101 @@
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, cast
+from airflow.utils.context import Context
+from helper.xcom_backend import ReferenceXComBackend as Backend
+
+DAG_ID = "psr_sync"
+RUN_ID = "manual__2024-10-16T10:00:00+00:00"
+
+
+@pytest.fixture
+def store(tmp_path: Path, monkeypatch: Any) -> Path:
+    """Point the backend to a temporary directory and offload every tabular payload.
+
+    :param tmp_path: The pytest tmp_path fixture.
+    :param monkeypatch: The pytest monkeypatch fixture.
+    """
+    monkeypatch.setenv("PSR_XCOM_DIR", str(tmp_path))
+    monkeypatch.setattr(Backend, "MIN_ROWS", 1)
+
+    return tmp_path
+
+
+def roundtrip(value: Any, task_id: str) -> tuple[Any, Any]:
+    """Serialize a value like a task return and load it like a downstream task.
+
+    :param value: XCom value
+    :param task_id: producing task
+    :return: stored reference and deserialized value
+    """
+    result = SimpleNamespace(value=Backend.serialize_value(value, task_id=task_id, dag_id=DAG_ID, run_id=RUN_ID, key="return_value"))
+
+    return Backend.orm_deserialize_value(result), Backend.deserialize_value(result)  # type: ignore[arg-type]
+
+
+class TestReferenceXComBackend:
+    """Test the ReferenceXComBackend class."""
+
+    def test_records_offloaded(self, store: Path, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test an API payload is stored in a file and restored from the reference.
+
+        :param store: The store directory from fixture.
+        :param mock_data: Mock data from fixture.
+        """
+        reference, value = roundtrip(mock_data, "Processor.fetch")
+
+        assert Backend.is_reference(reference), "Only a reference should be stored in XCom"
+        assert Path(reference["path"]).is_relative_to(store)
+        assert value == mock_data
+
+    def test_rows_offloaded(self, store: Path) -> None:
+        """Test a list of tuples is stored in a file and restored from the reference.
+
+        :param store: The store directory from fixture.
+        """
+        rows = [("bmreports, Solar, min30", "2023-07-21T04:30:00Z", 89.0), ("bmreports, Wind Onshore, min30", "2023-07-21T04:30:00Z", 640.283)]
+
+        reference, value = roundtrip(rows, "Processor.transform")
+
+        assert reference["rows"] == len(rows)
+        assert value == rows
+
+    def test_small_values_inline(self, store: Path, monkeypatch: Any) -> None:
+        """Test values below the threshold and other shapes stay in the metadata DB.
+
+        :param store: The store directory from fixture.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        monkeypatch.setattr(Backend, "MIN_ROWS", 100)
+
+        values: tuple[Any, ...] = ({"date_from": "2024-10-16"}, [["a", 1]], {"data": []})
+        for value in values:
+            reference, restored = roundtrip(value, "parameterize")
+            assert not Backend.is_reference(reference)
+            assert restored == value
+        assert not any(store.rglob("*.parquet")), "No file should be written"
+
+    def test_purge(self, store: Path, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test purging a cleared XCom entry deletes its file.
+
+        :param store: The store directory from fixture.
+        :param mock_data: Mock data from fixture.
+        """
+        result = SimpleNamespace(value=Backend.serialize_value(mock_data, task_id="Processor.fetch", dag_id=DAG_ID, run_id=RUN_ID, key="return_value"))
+
+        Backend.purge(result, session=None)  # type: ignore[arg-type]
+
+        assert not any(store.rglob("*.parquet"))
+
+    def test_cleanup(self, store: Path, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test the run directory is removed after the DAG run.
+
+        :param store: The store directory from fixture.
+        :param mock_data: Mock data from fixture.
+        """
+        roundtrip(mock_data, "Processor.fetch")
+
+        Backend.cleanup(cast(Context, {"dag_run": SimpleNamespace(dag_id=DAG_ID, run_id=RUN_ID)}))
+
+        assert not Backend.run_dir(DAG_ID, RUN_ID).exists()
@@ -1,24 +1,46 @@
+import io
+import json
 import pytest
 from typing import Any
+from collections.abc import Generator
+from model.backfill import BackfillStatus
+from model.results import ValidationResults
 from model.source import SourceAPI
 
 @pytest.fixture
-def _mock_requests_get(monkeypatch: Any, mock_data: dict[str, list[dict[str, Any]]]) -> None:
-    """Monkeypatch the requests.get() method to return a mock response.
+def requested_urls() -> list[str]:
+    """Collect the URLs requested through the mocked session."""
+    return []
+
+@pytest.fixture
+def _mock_requests_get(monkeypatch: Any, mock_data: dict[str, list[dict[str, Any]]], requested_urls: list[str]) -> None:
+    """Monkeypatch the requests.Session.get() method to return a mock response.
 
     :param monkeypatch: The pytest monkeypatch fixture.
     :param mock_data: The mock data fixture.
+    :param requested_urls: The list collecting the requested URLs.
     :return: None.
     """
-    def mock_get(url: str) -> Any:
+    def mock_get(self: Any, url: str, **kwargs: Any) -> Any:
+        requested_urls.append(url)
+
         class MockResponse:
             status_code = 200
+            content = json.dumps(mock_data).encode()
+            raw = io.BytesIO(content)  # Body read by streaming requests
+
             def json(self) -> dict[str, list[dict[str, Any]]]:
                 return mock_data
 
+            def __enter__(self) -> Any:
+                return self
+
+            def __exit__(self, *args: Any) -> None:
+                pass
+
         return MockResponse()
 
-    monkeypatch.setattr("requests.get", mock_get)
+    monkeypatch.setattr("requests.Session.get", mock_get)
 
 @pytest.fixture
 def api_mocker(_mock_requests_get: Any) -> SourceAPI:
@@ -28,3 +50,28 @@ def api_mocker(_mock_requests_get: Any) -> SourceAPI:
     :return: SourceAPI instance.
     """
     return SourceAPI()
+
+@pytest.fixture
+def backfill_status() -> Generator[BackfillStatus, None, None]:
+    """Instantiate the BackfillStatus class on an empty test table."""
+    status = BackfillStatus()
+    status.TABLE_NAME = "test_psr_backfill"
+
+    status.query(f"DROP TABLE IF EXISTS {status.TABLE_NAME};")
+    status.table_maintenance()
+
+    yield status
+
+    status.query(f"DROP TABLE IF EXISTS {status.TABLE_NAME};")
+
+@pytest.fixture
+def validation_results() -> Generator[ValidationResults, None, None]:
+    """Instantiate the ValidationResults class on empty test tables."""
+    results = ValidationResults("test_gx_scan_results")
+
+    results.query(f"DROP TABLE IF EXISTS {results.TABLE_NAME}, {results.summary_table};")
+    results.table_maintenance()
+
+    yield results
+
+    results.query(f"DROP TABLE IF EXISTS {results.TABLE_NAME}, {results.summary_table};")
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import threading
+import pendulum
+import pytest
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from airflow.exceptions import AirflowSensorTimeout, AirflowSkipException, TaskDeferred
+from model.availability import DataAvailabilitySensor, DataAvailabilityTrigger
+from model.source import SourceAPI
+
+PERIOD = "2024-10-16T14:30:00Z"
+
+
+class PublishingHandler(BaseHTTPRequestHandler):
+    """Answer empty data for the first requests and the records once published."""
+
+    empty_responses = 0
+    requests = 0
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Serve the JSON body of the API."""
+        PublishingHandler.requests += 1
+        records = [] if PublishingHandler.requests <= PublishingHandler.empty_responses else [{"quantity": 1.0}, {"quantity": 2.0}]
+        body = json.dumps({"data": records}).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        """Keep the test output quiet."""
+
+
+@pytest.fixture
+def api_server(monkeypatch: Any) -> Generator[type[PublishingHandler], None, None]:
+    """Point the API URL to a local HTTP server.
+
+    :param monkeypatch: The pytest monkeypatch fixture.
+    :return: The request handler class, to set the empty responses and count the requests.
+    """
+    PublishingHandler.empty_responses, PublishingHandler.requests = 0, 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PublishingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(SourceAPI, "API_URL", f"http://127.0.0.1:{server.server_port}/?from={{from_date}}&to={{to_date}}")
+    monkeypatch.setattr(SourceAPI, "shared_session", None)
+
+    yield PublishingHandler
+
+    server.shutdown()
+    server.server_close()
+
+
+def first_event(trigger: DataAvailabilityTrigger) -> Any:
+    """Run a trigger until its first event.
+
+    :param trigger: The trigger.
+    :return: The payload of the event.
+    """
+    async def run() -> Any:
+        async for event in trigger.run():
+            return event.payload
+
+    return asyncio.run(run())
+
+
+class TestDataAvailabilityTrigger:
+    """Test the DataAvailabilityTrigger class."""
+
+    def test_serialize(self) -> None:
+        """Test the trigger is rebuilt from its serialized form."""
+        endpoint = "https://example.com/?from={from_date}&to={to_date}"
+        classpath, kwargs = DataAvailabilityTrigger(PERIOD, 30.0, 1.0, endpoint).serialize()
+
+        assert classpath == "model.availability.DataAvailabilityTrigger"
+        assert kwargs == {"period": PERIOD, "poke_interval": 30.0, "deadline": 1.0, "endpoint": endpoint}
+
+    def test_fires_once_published(self, api_server: type[PublishingHandler]) -> None:
+        """Test the trigger polls until the period has records.
+
+        :param api_server: The local API server from fixture.
+        """
+        api_server.empty_responses = 2
+
+        assert first_event(DataAvailabilityTrigger(PERIOD, 0.01)) == {"status": "available", "period": PERIOD}
+        assert api_server.requests == api_server.empty_responses + 1
+
+    def test_timeout(self, api_server: type[PublishingHandler]) -> None:
+        """Test the trigger gives up after the deadline.
+
+        :param api_server: The local API server from fixture.
+        """
+        api_server.empty_responses = 1000
+
+        assert first_event(DataAvailabilityTrigger(PERIOD, 0.01, deadline=0.0)) == {"status": "timeout", "period": PERIOD}
+
+
+class TestDataAvailabilitySensor:
+    """Test the DataAvailabilitySensor class."""
+
+    def sensor(self, **kwargs: Any) -> DataAvailabilitySensor:
+        """Build a sensor on a window ending at PERIOD."""
+        window = {"date_from": pendulum.parse("2024-10-16T12:00:00Z"), "date_to": pendulum.parse(PERIOD)}
+
+        return DataAvailabilitySensor(task_id="available", window=window, **kwargs)
+
+    def test_published(self, api_server: type[PublishingHandler]) -> None:
+        """Test the window is returned without deferring when the data is already published.
+
+        :param api_server: The local API server from fixture.
+        """
+        sensor = self.sensor()
+
+        assert sensor.execute({}) == sensor.window  # type: ignore[arg-type]
+        assert api_server.requests == 1
+
+    def test_defers(self, api_server: type[PublishingHandler]) -> None:
+        """Test the sensor defers to the trigger when the data is not published yet.
+
+        :param api_server: The local API server from fixture.
+        """
+        api_server.empty_responses = 1
+
+        with pytest.raises(TaskDeferred) as deferred:
+            self.sensor(poke_interval=30).execute({})  # type: ignore[arg-type]
+
+        trigger = deferred.value.trigger
+        assert isinstance(trigger, DataAvailabilityTrigger)
+        assert (trigger.period, trigger.poke_interval, trigger.endpoint) == (PERIOD, 30, None)
+        assert deferred.value.method_name == "execute_complete"
+
+    def test_skip_param(self, api_server: type[PublishingHandler]) -> None:
+        """Test the sensor is skipped without polling when its skip param is set.
+
+        :param api_server: The local API server from fixture.
+        """
+        sensor = self.sensor(skip_param="stream")
+
+        with pytest.raises(AirflowSkipException):
+            sensor.execute({"params": {"stream": True}})  # type: ignore[arg-type, typeddict-item]
+        assert api_server.requests == 0
+        assert sensor.execute({"params": {"stream": False}}) == sensor.window  # type: ignore[arg-type, typeddict-item]
+
+    def test_execute_complete(self) -> None:
+        """Test the outcome of the trigger event."""
+        sensor = self.sensor()
+
+        assert sensor.execute_complete({}, {"status": "available", "period": PERIOD}) == sensor.window  # type: ignore[arg-type]
+        with pytest.raises(AirflowSensorTimeout):
+            sensor.execute_complete({}, {"status": "timeout", "period": PERIOD})  # type: ignore[arg-type]
+        with pytest.raises(AirflowSkipException):
+            self.sensor(soft_fail=True).execute_complete({}, {"status": "timeout", "period": PERIOD})  # type: ignore[arg-type]
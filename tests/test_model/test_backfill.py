@@ -0,0 +1,51 @@
+from model.backfill import BackfillStatus
+
+WINDOWS = [
+    {"date_from": "2024-01-01T00:00:00Z", "date_to": "2024-01-07T23:30:00Z"},
+    {"date_from": "2024-01-08T00:00:00Z", "date_to": "2024-01-14T23:30:00Z"},
+    {"date_from": "2024-01-15T00:00:00Z", "date_to": "2024-01-16T23:30:00Z"},
+]
+
+
+class TestBackfillStatus:
+    """Test the BackfillStatus class."""
+
+    def test_plan(self, backfill_status: BackfillStatus) -> None:
+        """Test the windows which are done are left out of the next plan of the same range.
+
+        :param backfill_status: The backfill status object from fixture.
+        """
+        assert backfill_status.plan(WINDOWS) == WINDOWS
+
+        backfill_status.update(WINDOWS[0], backfill_status.RUNNING)
+        backfill_status.update(WINDOWS[0], backfill_status.DONE, rows=100)
+        backfill_status.update(WINDOWS[1], backfill_status.RUNNING)
+        backfill_status.update(WINDOWS[1], backfill_status.FAILED, error="Timeout")
+
+        assert backfill_status.plan(WINDOWS) == WINDOWS[1:], "Only the failed and pending windows should be planned again"
+        assert backfill_status.plan([]) == []
+
+    def test_attempts(self, backfill_status: BackfillStatus) -> None:
+        """Test every start of a window counts as an attempt and the last error is kept until it is done.
+
+        :param backfill_status: The backfill status object from fixture.
+        """
+        backfill_status.plan(WINDOWS[:1])
+        backfill_status.update(WINDOWS[0], backfill_status.RUNNING)
+        backfill_status.update(WINDOWS[0], backfill_status.FAILED, error="Timeout")
+        assert backfill_status.single(f"SELECT status, attempts, error FROM {backfill_status.TABLE_NAME}") == ('failed', 1, 'Timeout')
+
+        backfill_status.update(WINDOWS[0], backfill_status.RUNNING)
+        backfill_status.update(WINDOWS[0], backfill_status.DONE, rows=10)
+        assert backfill_status.single(f"SELECT status, attempts, error, rows FROM {backfill_status.TABLE_NAME}") == ('done', 2, None, 10)
+
+    def test_summary(self, backfill_status: BackfillStatus) -> None:
+        """Test the windows are counted by status, unrecorded ones as pending.
+
+        :param backfill_status: The backfill status object from fixture.
+        """
+        backfill_status.update(WINDOWS[0], backfill_status.DONE, rows=100)
+        backfill_status.update(WINDOWS[1], backfill_status.FAILED, error="Timeout")
+
+        assert backfill_status.summary(WINDOWS) == {'windows': {'done': 1, 'failed': 1, 'pending': 1}, 'rows': 100}
+        assert backfill_status.summary(WINDOWS[:1]) == {'windows': {'done': 1}, 'rows': 100}
@@ -0,0 +1,136 @@
+import pendulum
+import pytest
+from pathlib import Path
+from typing import Any
+from model.cache import ResponseCache
+from model.source import SourceAPI
+
+ENDPOINT = SourceAPI.API_URL
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ResponseCache:
+    """Instantiate a cache in a temporary directory.
+
+    :param tmp_path: The pytest tmp_path fixture.
+    """
+    return ResponseCache(tmp_path)
+
+
+class TestResponseCache:
+    """Test the ResponseCache class."""
+
+    def test_miss_then_hit(self, cache: ResponseCache, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test a stored window is served and counted as a hit.
+
+        :param cache: The cache from fixture.
+        :param mock_data: Mock data from fixture.
+        """
+        window = (pendulum.datetime(2023, 7, 21, 4, 30), pendulum.datetime(2023, 7, 21, 4, 30))
+
+        assert cache.get(ENDPOINT, *window) is None
+        cache.put(ENDPOINT, *window, mock_data)
+
+        assert cache.get(ENDPOINT, *window) == mock_data
+        assert cache.stats() == {'hits': 1, 'misses': 1}
+
+    def test_window_normalized(self, cache: ResponseCache, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test the same instant in another timezone maps to the same entry.
+
+        :param cache: The cache from fixture.
+        :param mock_data: Mock data from fixture.
+        """
+        utc = pendulum.datetime(2023, 7, 21, 4, 30)
+        cache.put(ENDPOINT, utc, utc, mock_data)
+        london = utc.in_timezone('Europe/London')
+
+        assert cache.get(ENDPOINT, london, london) == mock_data
+
+    def test_recent_window_expires(self, tmp_path: Path, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test a window stored before it settled is only served within the TTL.
+
+        :param tmp_path: The pytest tmp_path fixture.
+        :param mock_data: Mock data from fixture.
+        """
+        cache = ResponseCache(tmp_path, ttl=pendulum.duration(seconds=0))
+        now = pendulum.now('UTC')
+        cache.put(ENDPOINT, now, now, mock_data)
+
+        assert cache.get(ENDPOINT, now, now) is None
+
+    def test_settled_window_immutable(self, tmp_path: Path, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test a window stored after it settled ignores the TTL.
+
+        :param tmp_path: The pytest tmp_path fixture.
+        :param mock_data: Mock data from fixture.
+        """
+        cache = ResponseCache(tmp_path, ttl=pendulum.duration(seconds=0))
+        old = pendulum.datetime(2023, 7, 21, 4, 30)
+        cache.put(ENDPOINT, old, old, mock_data)
+
+        assert cache.get(ENDPOINT, old, old) == mock_data
+
+    def test_lru_eviction(self, tmp_path: Path, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test the least recently used entry is evicted beyond the size bound.
+
+        :param tmp_path: The pytest tmp_path fixture.
+        :param mock_data: Mock data from fixture.
+        """
+        cache = ResponseCache(tmp_path)
+        days = [pendulum.datetime(2023, 7, day) for day in (1, 2, 3)]
+        cache.put(ENDPOINT, days[0], days[0], mock_data)
+        cache.max_bytes = cache.path(ENDPOINT, days[0], days[0]).stat().st_size * 2
+        cache.put(ENDPOINT, days[1], days[1], mock_data)
+        cache.get(ENDPOINT, days[0], days[0])  # The first day becomes the most recently used one
+        cache.put(ENDPOINT, days[2], days[2], mock_data)
+
+        assert cache.get(ENDPOINT, days[0], days[0]) is not None
+        assert cache.get(ENDPOINT, days[1], days[1]) is None, "Least recently used entry should be evicted"
+        assert cache.get(ENDPOINT, days[2], days[2]) is not None
+
+    def test_eviction_scans(self, cache: ResponseCache, mock_data: dict[str, list[dict[str, Any]]], monkeypatch: Any) -> None:
+        """Test the directory is only scanned by the first put, every SCAN_EVERY puts and the puts exceeding the size bound.
+
+        :param cache: The cache from fixture.
+        :param mock_data: Mock data from fixture.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        scans = []
+        evict = cache.evict
+
+        def counted() -> None:
+            scans.append(cache.puts)
+            evict()
+
+        monkeypatch.setattr(cache, "evict", counted)
+        monkeypatch.setattr(cache, "SCAN_EVERY", 10)
+        days = [pendulum.datetime(2023, 7, 1).add(days=day) for day in range(25)]
+
+        for day in days:
+            cache.put(ENDPOINT, day, day, mock_data)
+        cache.put(ENDPOINT, days[0], days[0], mock_data)  # Replacing an entry keeps the size
+
+        assert scans == [1, 10, 20]
+        assert cache.size == sum(path.stat().st_size for path in cache.directory.glob("*.json"))
+
+        cache.max_bytes = cache.size
+        cache.put(ENDPOINT, days[0].add(years=1), days[0].add(years=1), mock_data)
+
+        assert scans == [1, 10, 20, 27]
+        assert len(list(cache.directory.glob("*.json"))) == len(days)
+
+    @pytest.mark.usefixtures("_mock_requests_get")
+    def test_source_served_from_cache(self, cache: ResponseCache, requested_urls: list[str]) -> None:
+        """Test SourceAPI requests a window only once when a cache is attached.
+
+        :param cache: The cache from fixture.
+        :param requested_urls: URLs requested through the mocked session.
+        """
+        source = SourceAPI(cache=cache)
+        dt = pendulum.datetime(2023, 7, 21, 4, 30)
+
+        first = source.fetch_json(dt, dt)
+        second = source.fetch_json(dt, dt)
+
+        assert first == second
+        assert len(requested_urls) == 1, "Second fetch should be served from the cache"
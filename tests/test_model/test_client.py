@@ -0,0 +1,211 @@
+import json
+import threading
+import time
+import pendulum
+import pytest
+import requests  # type: ignore
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from model.client import APIClient, CircuitBreaker, CircuitOpenError, TokenBucket
+from model.source import SourceAPI
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answer the scripted responses in order, then 200 with an API body."""
+
+    script: list[dict[str, Any]] = []
+    requests = 0
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Serve the next scripted response."""
+        ScriptedHandler.requests += 1
+        answer = ScriptedHandler.script.pop(0) if ScriptedHandler.script else {}
+        time.sleep(answer.get("sleep", 0))
+        body = json.dumps({"data": [{"quantity": 1.0}]}).encode()
+
+        self.send_response(answer.get("status", 200))
+        for name, value in answer.get("headers", {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        """Keep the test output quiet."""
+
+
+@pytest.fixture
+def stub_server() -> Generator[str, None, None]:
+    """Start a local HTTP server answering the script of ScriptedHandler.
+
+    :return: The URL of the server.
+    """
+    ScriptedHandler.script, ScriptedHandler.requests = [], 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    yield f"http://127.0.0.1:{server.server_port}/"
+
+    server.shutdown()
+    server.server_close()
+
+
+def client(retries: int = 3, threshold: int = 10, reset_timeout: float = 60.0, timeout: tuple[float, float] = (1, 1)) -> APIClient:
+    """Build a client with short delays.
+
+    :param retries: retries after the first attempt.
+    :param threshold: consecutive failures opening the circuit.
+    :param reset_timeout: seconds the circuit stays open.
+    :param timeout: connect and read timeout.
+    :return: The client.
+    """
+    session = requests.Session()
+
+    return APIClient(lambda: session, timeout, retries, 0.01, 2.0, TokenBucket(1000, 10), CircuitBreaker(threshold, reset_timeout))
+
+
+class TestAPIClient:
+    """Test the APIClient class against a local stub server."""
+
+    def test_retry_server_errors(self, stub_server: str) -> None:
+        """Test 5xx and 429 responses are retried until a success.
+
+        :param stub_server: The URL of the stub server.
+        """
+        failures = [{"status": 503}, {"status": 429}, {"status": 500}]
+        ScriptedHandler.script = list(failures)
+
+        response = client().get(stub_server)
+
+        assert response.status_code == SourceAPI.STATUS_OK
+        assert ScriptedHandler.requests == len(failures) + 1
+
+    def test_retries_exhausted(self, stub_server: str) -> None:
+        """Test the last failed response is returned once the retries are exhausted.
+
+        :param stub_server: The URL of the stub server.
+        """
+        retries = 1
+        ScriptedHandler.script = [{"status": 502}] * 3
+
+        response = client(retries=retries).get(stub_server)
+
+        assert response.status_code == requests.codes.bad_gateway
+        assert ScriptedHandler.requests == retries + 1
+
+    def test_retry_after(self, stub_server: str) -> None:
+        """Test the delay of a Retry-After header is honoured.
+
+        :param stub_server: The URL of the stub server.
+        """
+        ScriptedHandler.script = [{"status": 429, "headers": {"Retry-After": "1"}}]
+
+        started = time.monotonic()
+        response = client().get(stub_server)
+
+        assert response.status_code == SourceAPI.STATUS_OK
+        assert time.monotonic() - started >= 1
+
+    def test_retry_after_too_long(self, stub_server: str) -> None:
+        """Test a Retry-After longer than the maximum backoff is not waited for.
+
+        :param stub_server: The URL of the stub server.
+        """
+        ScriptedHandler.script = [{"status": 503, "headers": {"Retry-After": "3600"}}]
+
+        response = client().get(stub_server)
+
+        assert response.status_code == requests.codes.service_unavailable
+        assert ScriptedHandler.requests == 1
+
+    def test_retry_after_date(self) -> None:
+        """Test a Retry-After header given as an HTTP date."""
+        seconds = 30
+        response = requests.Response()
+        response.headers["Retry-After"] = pendulum.now("UTC").add(seconds=seconds).format("ddd, DD MMM YYYY HH:mm:ss [GMT]")
+
+        assert 0 < (APIClient.retry_after(response) or 0) <= seconds
+
+        response.headers["Retry-After"] = "soon"
+        assert APIClient.retry_after(response) is None
+
+    def test_read_timeout(self, stub_server: str) -> None:
+        """Test a hung request times out and is retried.
+
+        :param stub_server: The URL of the stub server.
+        """
+        retries = 1
+        ScriptedHandler.script = [{"sleep": 1}, {"sleep": 1}]
+
+        with pytest.raises(requests.Timeout):
+            client(retries=retries, timeout=(1, 0.2)).get(stub_server)
+        assert ScriptedHandler.requests == retries + 1
+
+    def test_circuit_breaker(self, stub_server: str) -> None:
+        """Test the circuit opens after consecutive failures, fails fast and closes after a successful trial.
+
+        :param stub_server: The URL of the stub server.
+        """
+        threshold = 2
+        ScriptedHandler.script = [{"status": 500}] * threshold
+        api = client(retries=0, threshold=threshold, reset_timeout=0.2)
+
+        for _ in range(threshold):
+            assert api.get(stub_server).status_code == requests.codes.internal_server_error
+        with pytest.raises(CircuitOpenError):
+            api.get(stub_server)
+        assert ScriptedHandler.requests == threshold, "An open circuit should not send requests"
+
+        time.sleep(0.2)
+        assert api.get(stub_server).status_code == SourceAPI.STATUS_OK
+        assert api.breaker.state == CircuitBreaker.CLOSED
+
+    def test_circuit_breaker_trial_failure(self) -> None:
+        """Test a failed trial opens the circuit again and only one trial goes through."""
+        breaker = CircuitBreaker(1, 0.05)
+        breaker.failure()
+
+        time.sleep(0.05)
+        breaker.allow()
+        with pytest.raises(CircuitOpenError, match="half-open"):
+            breaker.allow()
+
+        breaker.failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.allow()
+
+    def test_token_bucket(self) -> None:
+        """Test the bucket lets a burst through and then limits the rate, across threads."""
+        rate, capacity, acquired = 20, 2, 6
+        bucket = TokenBucket(rate, capacity)
+        started = time.monotonic()
+
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(acquired)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert time.monotonic() - started >= (acquired - capacity) / rate * 0.9
+
+    def test_source_api(self, stub_server: str, monkeypatch: Any) -> None:
+        """Test SourceAPI fetches through the client and fails on a persistent error.
+
+        :param stub_server: The URL of the stub server.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        monkeypatch.setattr(SourceAPI, "API_URL", stub_server + "?from={from_date}&to={to_date}")
+        monkeypatch.setattr(SourceAPI, "BACKOFF", 0.01)
+        monkeypatch.setattr(SourceAPI, "shared_client", None)
+        period = pendulum.datetime(2024, 10, 16, 14, 30)
+        ScriptedHandler.script = [{"status": 503}]
+
+        assert SourceAPI().fetch_window(period, period) == {"data": [{"quantity": 1.0}]}
+        assert list(SourceAPI().stream_window(period, period)) == [{"quantity": 1.0}]
+
+        ScriptedHandler.script = [{"status": 503}] * (SourceAPI.RETRIES + 1)
+        with pytest.raises(Exception, match="Failed to fetch data: 503"):
+            SourceAPI().fetch_window(period, period)
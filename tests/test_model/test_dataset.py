@@ -0,0 +1,67 @@
+import pendulum
+import pytest
+from pathlib import Path
+from typing import Any
+from helper.api_helper import APIHelper
+from model.dataset import Dataset
+from model.source import SourceAPI
+
+ENTRY = """
+fuelinst:
+  endpoint: https://data.elexon.co.uk/bmrs/api/v1/datasets/FUELINST?publishDateTimeFrom={from_date}&publishDateTimeTo={to_date}
+  table: fuelinst
+  fields:
+    curve_name: "bmreports, {fuelType}, fuelinst"
+    curve_date: startTime
+    value: generation
+    publish_time: publishTime
+  checkpoints: [completeness_checkpoint]
+  suites: [missingness]
+  start_date: 2024-10-13T10:45:00Z
+"""
+
+
+class TestDataset:
+    """Test the Dataset class and the registry."""
+
+    def test_registry(self) -> None:
+        """Test the registry shipped with the DAGs declares the wind and solar dataset as the code defaults."""
+        psr = Dataset.get("psr")
+
+        assert (psr.dag_id, psr.endpoint, psr.table, psr.fields) == ("psr_sync", SourceAPI.API_URL, "psr", APIHelper.FIELDS)
+        assert psr.start_date == pendulum.datetime(2024, 10, 13, 10, 45)
+
+    def test_defaults(self, tmp_path: Path) -> None:
+        """Test the optional keys of an entry.
+
+        :param tmp_path: The pytest temporary directory.
+        """
+        path = tmp_path / "datasets.yml"
+        path.write_text(ENTRY)
+
+        fuelinst = Dataset.registry(path)["fuelinst"]
+
+        assert (fuelinst.dag_id, fuelinst.schedule, fuelinst.tags) == ("fuelinst_sync", None, [])
+        assert Dataset.registry(path) is Dataset.registry(path), "The registry should be loaded once per version of the file"
+
+    @pytest.mark.parametrize(("change", "error"), [
+        ({"tabel": "psr"}, "unknown keys"),
+        ({"table": None}, "misses the keys"),
+        ({"table": "psr; DROP TABLE psr"}, "SQL identifier"),
+        ({"endpoint": "https://example.com/"}, "from_date"),
+        ({"fields": {"curve_name": "{psrType}"}}, "misses the fields"),
+        ({"suites": []}, "at least one"),
+    ])
+    def test_invalid(self, change: dict[str, Any], error: str) -> None:
+        """Test an invalid entry is rejected.
+
+        :param change: Keys changed in a valid entry, a None value removes the key.
+        :param error: Expected error message.
+        """
+        psr = Dataset.get("psr")
+        entry = {"endpoint": psr.endpoint, "table": psr.table, "fields": psr.fields, "checkpoints": psr.checkpoints, "suites": psr.suites,
+                 "start_date": "2024-10-13T10:45:00Z"}
+        entry = {key: value for key, value in {**entry, **change}.items() if value is not None}
+
+        with pytest.raises(ValueError, match=error):
+            Dataset.from_entry("psr", entry)
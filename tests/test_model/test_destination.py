@@ -1,4 +1,13 @@
-from model.destination import DestinationPostgreSQL
+import numpy as np
+import pandas as pd
+import psycopg2
+import pendulum
+import pytest
+import threading
+import time
+from typing import Any
+from helper.api_helper import APIHelper
+from model.destination import DestinationPostgreSQL, main
 
 
 class TestDestination:
@@ -41,3 +50,415 @@ class TestDestination:
             f"SELECT value FROM {destination.TABLE_NAME} WHERE curve_name='bmreports, Wind Onshore, min30' AND curve_date='2023-07-21T04:30:00Z';")
         expected_value = 740.283
         assert float(result[0]) == expected_value, "Conflict resolution did not update value correctly"
+
+    def test_bulk_sync_copy(self, destination: DestinationPostgreSQL) -> None:
+        """Test the COPY load path upserts data through the staging table.
+
+        :param destination: The destination object from fixture.
+        """
+        data = [
+            ('bmreports, Wind Onshore, min30', '2023-07-21T04:30:00Z', 840.283),
+            ('bmreports, Wind Onshore, min30', '2023-07-21T05:00:00Z', 650.0),
+        ]
+
+        # Insert mock data
+        inserted_count = destination.bulk_sync(data, mode=destination.LOAD_COPY)
+
+        # Verify data count and the upserted value
+        assert inserted_count == len(data), "Not all data was inserted"
+        result = destination.fetch(
+            f"SELECT value FROM {destination.TABLE_NAME} WHERE curve_name='bmreports, Wind Onshore, min30' ORDER BY curve_date;")
+        assert [float(row[0]) for row in result] == [840.283, 650.0], "COPY load did not upsert values correctly"
+
+    def test_bulk_sync_copy_buffer(self, destination: DestinationPostgreSQL, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test a COPY-ready buffer from the columnar transform is loaded.
+
+        :param destination: The destination object from fixture.
+        :param mock_data: Mock data from fixture.
+        """
+        buffer = APIHelper.copy_buffer(APIHelper.transform_columnar(mock_data))
+
+        assert destination.bulk_sync(buffer, mode=destination.LOAD_COPY) == len(mock_data['data'])
+
+        with pytest.raises(ValueError, match="CSV buffers"):
+            destination.bulk_sync(buffer)
+
+    def test_bulk_sync_unknown_mode(self, destination: DestinationPostgreSQL) -> None:
+        """Test an unknown load mode is rejected.
+
+        :param destination: The destination object from fixture.
+        """
+        with pytest.raises(ValueError, match="Unknown load mode"):
+            destination.bulk_sync([], mode="unknown")
+
+    @pytest.mark.parametrize("mode", DestinationPostgreSQL.LOAD_MODES)
+    def test_bulk_sync_stats(self, destination: DestinationPostgreSQL, mode: str) -> None:
+        """Test rows with an unchanged value are skipped and counted separately from inserts and updates.
+
+        :param destination: The destination object from fixture.
+        :param mode: The load path.
+        """
+        curve_name = f'bmreports, Stats {mode}, min30'
+        data: list[Any] = [(curve_name, '2023-07-21T04:30:00Z', 1.5), (curve_name, '2023-07-21T05:00:00Z', None)]  # NULL values compare as equal
+
+        destination.bulk_sync(data, mode=mode)
+        assert destination.sync_stats == {'inserted': 2, 'updated': 0, 'skipped': 0, 'duplicates': 0}
+
+        destination.bulk_sync(data, mode=mode)
+        assert destination.sync_stats == {'inserted': 0, 'updated': 0, 'skipped': 2, 'duplicates': 0}, "Unchanged rows were rewritten"
+
+        destination.bulk_sync([data[0], (curve_name, '2023-07-21T05:00:00Z', 2.5)], mode=mode)
+        assert destination.sync_stats == {'inserted': 0, 'updated': 1, 'skipped': 1, 'duplicates': 0}
+
+    @pytest.mark.parametrize("mode", DestinationPostgreSQL.LOAD_MODES)
+    def test_bulk_sync_duplicates(self, destination: DestinationPostgreSQL, mode: str, monkeypatch: Any) -> None:
+        """Test a key written twice by one load keeps its last row instead of failing the upsert.
+
+        :param destination: The destination object from fixture.
+        :param mode: The load path.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        monkeypatch.setattr(destination, "BATCH_SIZE", 3)
+        curve_name = f'bmreports, Duplicates {mode}, min30'
+        data = [(curve_name, '2023-07-21T04:30:00Z', 1.0), (curve_name, '2023-07-21T05:00:00Z', 2.0), (curve_name, '2023-07-21T04:30:00Z', 3.0),
+                (curve_name, '2023-07-21T05:00:00Z', 4.0)]  # The last duplicate falls into the next batch of the values mode
+
+        assert destination.bulk_sync(data, mode=mode) == len(data)
+        assert destination.fetch(f"SELECT value::float8 FROM {destination.TABLE_NAME} WHERE curve_name = '{curve_name}' ORDER BY curve_date") == [
+            (3.0,), (4.0,)]
+        assert destination.sync_stats['duplicates'] == (1 if mode == destination.LOAD_VALUES else 2)
+
+    @pytest.mark.parametrize("mode", DestinationPostgreSQL.LOAD_MODES)
+    def test_bulk_sync_revisions(self, destination: DestinationPostgreSQL, mode: str, monkeypatch: Any) -> None:
+        """Test a key written twice by one load keeps its row published last, within and across batches.
+
+        :param destination: The destination object from fixture.
+        :param mode: The load path.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        monkeypatch.setattr(destination, "BATCH_SIZE", 3)
+        curve_name = f'bmreports, Revisions {mode}, min30'
+        data = [(curve_name, '2023-07-21T04:30:00Z', 1.0, '2023-07-21T07:00:00Z'), (curve_name, '2023-07-21T05:00:00Z', 2.0, '2023-07-21T07:00:00Z'),
+                (curve_name, '2023-07-21T04:30:00Z', 3.0, '2023-07-21T06:00:00Z'),
+                (curve_name, '2023-07-21T05:00:00Z', 4.0, '2023-07-21T06:30:00Z')]  # An earlier revision in the next batch of the values mode
+
+        assert destination.bulk_sync(data, mode=mode) == len(data)
+        assert destination.fetch(f"SELECT value::float8 FROM {destination.TABLE_NAME} WHERE curve_name = '{curve_name}' ORDER BY curve_date") == [
+            (1.0,), (2.0,)]
+        assert destination.sync_stats['duplicates'] == len(data) // 2
+
+    def test_watermarks(self, destination: DestinationPostgreSQL) -> None:
+        """Test the watermarks are stored with the load and never move back.
+
+        :param destination: The destination object from fixture.
+        """
+        curve_name = 'bmreports, Watermark, min30'
+        data = [(curve_name, '2023-07-21T04:30:00Z', 1.0)]
+
+        destination.bulk_sync(data, watermarks={curve_name: ('2023-07-21T06:58:08Z', '2023-07-21T04:30:00Z')})
+        destination.bulk_sync(data, watermarks={curve_name: ('2023-07-21T06:00:00Z', '2023-07-21T05:00:00Z')})
+
+        assert destination.watermarks()[curve_name] == ('2023-07-21T06:58:08Z', '2023-07-21T05:00:00Z')
+
+    def test_loaded(self, destination: DestinationPostgreSQL) -> None:
+        """Test the rows of a window are keyed like the API records.
+
+        :param destination: The destination object from fixture.
+        """
+        curve_name = 'bmreports, Loaded, min30'
+        destination.bulk_sync([(curve_name, '2023-07-21T04:30:00Z', 1.5), (curve_name, '2023-07-21T05:00:00Z', 0.0),
+                               (curve_name, '2023-07-21T05:30:00Z', 2.0)])
+
+        assert destination.loaded('2023-07-21T04:30:00Z', '2023-07-21T05:00:00Z', [curve_name]) == {
+            (curve_name, '2023-07-21T04:30:00Z'): 1.5, (curve_name, '2023-07-21T05:00:00Z'): 0.0}
+
+    def test_loaded_to_watermarks(self, destination: DestinationPostgreSQL) -> None:
+        """Test the loaded rows are only read up to the watermark of their curve, and the dropped records counted as skipped.
+
+        :param destination: The destination object from fixture.
+        """
+        curve_name = 'bmreports, Loaded Watermark, min30'
+        dates = ['2023-08-01T04:30:00Z', '2023-08-01T05:00:00Z', '2023-08-01T05:30:00Z']
+        destination.bulk_sync([(curve_name, dates[0], 1.0), (curve_name, dates[1], 2.0)], watermarks={curve_name: ('2023-08-01T06:00:00Z', dates[0])})
+        destination.bulk_sync([(curve_name, dates[2], 3.0)])  # Loaded without watermarks, e.g. from a script
+
+        loaded = destination.loaded_to_watermarks(dates[0], dates[2])
+
+        assert {key: value for key, value in loaded.items() if key[0] == curve_name} == {(curve_name, dates[0]): 1.0}
+        assert destination.loaded_to_watermarks('2023-08-01T05:00:00Z', '2023-08-02T00:00:00Z').keys().isdisjoint({(curve_name, date) for date in dates})
+
+        destination.bulk_sync([(curve_name, dates[1], 2.0)], skipped=2)
+        assert destination.sync_stats['skipped'] == len(dates)
+
+    @pytest.mark.parametrize("mode", DestinationPostgreSQL.LOAD_MODES)
+    def test_bulk_sync_generator(self, destination: DestinationPostgreSQL, mode: str, monkeypatch: Any) -> None:
+        """Test rows produced by a generator are loaded in batches.
+
+        :param destination: The destination object from fixture.
+        :param mode: The load path.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        monkeypatch.setattr(destination, "BATCH_SIZE", 2)
+        curve_name = f'bmreports, Generator {mode}, min30'
+        hours = 5
+        rows = ((curve_name, f'2023-07-21T0{hour}:00:00Z', float(hour)) for hour in range(hours))
+
+        assert destination.bulk_sync(rows, mode=mode) == hours
+        assert destination.sync_stats == {'inserted': hours, 'updated': 0, 'skipped': 0, 'duplicates': 0}
+
+    def test_partitioned(self, destination: DestinationPostgreSQL) -> None:
+        """Test the data table is partitioned by month with partitions ahead of the current month and a BRIN index.
+
+        :param destination: The destination object from fixture.
+        """
+        assert destination.single(f"SELECT relkind FROM pg_class WHERE oid = to_regclass('{destination.TABLE_NAME}')")[0] == 'v'
+        assert destination.single(f"SELECT relkind FROM pg_class WHERE oid = to_regclass('{destination.data_table}')")[0] == 'p'
+
+        partitions = {row[0] for row in destination.fetch(f"SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass('{destination.data_table}')")}
+        now = pendulum.now('UTC')
+        assert {destination.partition_name(now.add(months=months)) for months in range(destination.PARTITIONS_AHEAD + 1)} <= partitions
+
+        assert destination.single(f"SELECT to_regclass('{destination.data_table}_curve_date_brin')")[0] is not None
+
+    @pytest.mark.parametrize("mode", DestinationPostgreSQL.LOAD_MODES)
+    def test_partition_created_on_load(self, destination: DestinationPostgreSQL, mode: str) -> None:
+        """Test loading rows of a month without partition creates it.
+
+        :param destination: The destination object from fixture.
+        :param mode: The load path.
+        """
+        month = 1 + DestinationPostgreSQL.LOAD_MODES.index(mode)
+        destination.bulk_sync([('bmreports, Solar, min30', f'2001-0{month}-15T12:00:00Z', 1.0)], mode=mode)
+
+        partition = destination.partition_name(pendulum.date(2001, month, 1))
+        assert destination.single(f"SELECT count(*) FROM {partition}")[0] == 1, "Row should be routed to its monthly partition"
+
+    @pytest.mark.parametrize("mode", DestinationPostgreSQL.LOAD_MODES)
+    def test_curve_ids(self, destination: DestinationPostgreSQL, mode: str) -> None:
+        """Test the curves are registered once in the dimension and their ids are cached after the commit.
+
+        :param destination: The destination object from fixture.
+        :param mode: The load path.
+        """
+        curve_name = f'bmreports, Dimension {mode}, min30'
+        destination.bulk_sync([(curve_name, '2023-07-21T00:00:00Z', 1.0), (curve_name, '2023-07-21T00:30:00Z', 2.0)], mode=mode)
+
+        curve_id = destination.single(f"SELECT curve_id FROM {destination.curve_table} WHERE curve_name = '{curve_name}'")[0]
+        assert destination.curves[destination.curve_key][curve_name] == curve_id
+        assert destination.fetch(f"SELECT value FROM {destination.TABLE_NAME} WHERE curve_name = '{curve_name}' ORDER BY curve_date") == [(1,), (2,)]
+
+        destination.bulk_sync([(curve_name, '2023-07-21T01:00:00Z', 3.0)], mode=mode)
+        assert destination.single(f"SELECT count(*) FROM {destination.curve_table} WHERE curve_name = '{curve_name}'")[0] == 1
+
+    def test_curve_ids_rollback(self, destination: DestinationPostgreSQL) -> None:
+        """Test the ids of curves registered by a load failing afterwards are neither cached nor kept in the dimension.
+
+        :param destination: The destination object from fixture.
+        """
+        curve_name = 'bmreports, Rolled Back, min30'
+        data: list[Any] = [(curve_name, '2023-07-21T00:00:00Z', 1.0), (curve_name, '2023-07-21T00:30:00Z', 'not a number')]
+
+        with pytest.raises(psycopg2.errors.InvalidTextRepresentation):
+            destination.bulk_sync(data)  # The upsert fails once the curve is registered
+
+        assert curve_name in destination.pending_curves, "The curve should have been registered before the failure"
+        assert curve_name not in destination.curves.get(destination.curve_key, {})
+        assert destination.single(f"SELECT count(*) FROM {destination.curve_table} WHERE curve_name = '{curve_name}'")[0] == 0
+
+        destination.bulk_sync([(curve_name, '2023-07-21T00:00:00Z', 1.0)])
+        assert destination.fetch(f"SELECT value FROM {destination.TABLE_NAME} WHERE curve_name = '{curve_name}'") == [(1,)]
+
+    @pytest.mark.parametrize("layout", ["", "PARTITION BY RANGE (curve_date)"])
+    def test_migrate_table(self, destination: DestinationPostgreSQL, monkeypatch: Any, layout: str) -> None:
+        """Test a flat or partitioned table keyed on curve names is migrated in place to the dimension layout.
+
+        :param destination: The destination object from fixture.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        :param layout: Partitioning clause of the existing table.
+        """
+        monkeypatch.setattr(destination, "TABLE_NAME", "test_psr_migrate")
+        destination.drop_tables()
+        destination.query(f"""
+        CREATE TABLE {destination.TABLE_NAME} (
+            curve_name VARCHAR(255),
+            curve_date TIMESTAMP NOT NULL,
+            value NUMERIC,
+            PRIMARY KEY (curve_name, curve_date)
+        ) {layout};
+        """)
+        if layout:
+            destination.query(f"CREATE TABLE {destination.TABLE_NAME}_p2020 PARTITION OF {destination.TABLE_NAME} FOR VALUES FROM ('2020-01-01') TO ('2021-01-01');")
+        destination.query(f"""
+        INSERT INTO {destination.TABLE_NAME} VALUES
+            ('bmreports, Solar, min30', '2020-01-31T23:30:00Z', 1), ('bmreports, Solar, min30', '2020-03-01T00:00:00Z', 2);
+        """)
+
+        try:
+            destination.table_maintenance()
+
+            assert destination.single(f"SELECT relkind FROM pg_class WHERE oid = to_regclass('{destination.TABLE_NAME}')")[0] == 'v'
+            assert destination.fetch(f"SELECT tableoid::regclass::text, value FROM {destination.data_table} ORDER BY curve_date") == [
+                ('test_psr_migrate_v2_p2020_01', 1), ('test_psr_migrate_v2_p2020_03', 2)]
+            assert destination.fetch(f"SELECT curve_name, value FROM {destination.TABLE_NAME} ORDER BY curve_date") == [
+                ('bmreports, Solar, min30', 1), ('bmreports, Solar, min30', 2)]
+
+            destination.bulk_sync([('bmreports, Solar, min30', '2020-01-31T23:30:00Z', 3.0)])
+            assert destination.sync_stats == {'inserted': 0, 'updated': 1, 'skipped': 0, 'duplicates': 0}, "Rows should keep their key through the migration"
+        finally:
+            destination.drop_tables()
+
+    @pytest.mark.parametrize("output", DestinationPostgreSQL.READ_OUTPUTS)
+    def test_read_range(self, destination: DestinationPostgreSQL, output: str) -> None:
+        """Test a time window of some curves is read into columns, ordered by curve and curve date.
+
+        :param destination: The destination object from fixture.
+        :param output: The column container.
+        """
+        curves = ['bmreports, Read A, min30', 'bmreports, Read B, min30', 'bmreports, Read C, min30']
+        destination.bulk_sync([(curve, f'2002-01-31T{hour:02}:00:00Z', float(hour)) for curve in curves for hour in range(20, 24)]
+                              + [(curves[0], '2002-02-01T00:00:00Z', None)])  # type: ignore[list-item]
+
+        columns = destination.read_range('2002-01-31T22:00:00Z', '2002-02-01T00:00:00Z', curves[:1] + curves[2:], output=output, itersize=2)
+
+        names = [curves[0]] * 3 + [curves[2]] * 2
+        dates = np.array(['2002-01-31T22:00', '2002-01-31T23:00', '2002-02-01T00:00', '2002-01-31T22:00', '2002-01-31T23:00'], dtype='datetime64[us]')
+        if output == DestinationPostgreSQL.READ_FRAME:
+            assert isinstance(columns, pd.DataFrame)
+            assert columns['curve_name'].dtype == 'category'
+            columns = {name: columns[name].to_numpy() for name in columns}
+
+        assert list(columns['curve_name']) == names
+        np.testing.assert_array_equal(columns['curve_date'], dates)
+        np.testing.assert_array_equal(columns['value'], [22.0, 23.0, np.nan, 22.0, 23.0])
+
+    def test_read_range_empty(self, destination: DestinationPostgreSQL) -> None:
+        """Test a window without rows or an unknown curve reads into empty columns.
+
+        :param destination: The destination object from fixture.
+        """
+        frame = destination.read_range('1990-01-01T00:00:00Z', '1990-01-02T00:00:00Z')
+        assert list(frame.columns) == ['curve_name', 'curve_date', 'value']  # type: ignore[union-attr]
+        assert frame.empty  # type: ignore[union-attr]
+
+        arrays = destination.read_range('2002-01-31T00:00:00Z', '2002-02-01T00:00:00Z', ['unknown'], output=destination.READ_ARRAYS)
+        assert {name: len(values) for name, values in arrays.items()} == {'curve_name': 0, 'curve_date': 0, 'value': 0}  # type: ignore[union-attr]
+
+        with pytest.raises(ValueError, match="Unknown output"):
+            destination.read_range('2002-01-31T00:00:00Z', '2002-02-01T00:00:00Z', output='tuples')
+
+    @pytest.mark.parametrize("mode", DestinationPostgreSQL.LOAD_MODES)
+    def test_rollups(self, destination: DestinationPostgreSQL, mode: str) -> None:
+        """Test the hourly and daily rollups follow the loads, NULL values are left out of the average.
+
+        :param destination: The destination object from fixture.
+        :param mode: The load path.
+        """
+        curve_name = f'bmreports, Rollup {mode}, min30'
+        destination.bulk_sync([(curve_name, '2003-05-01T10:00:00Z', 10.0), (curve_name, '2003-05-01T10:30:00Z', 20.0),
+                               (curve_name, '2003-05-01T11:00:00Z', 30.0), (curve_name, '2003-05-01T11:30:00Z', None)], mode=mode)  # type: ignore[list-item]
+
+        hourly = f"SELECT bucket::text, value_sum, value_count, value_avg FROM {destination.TABLE_NAME}_hourly WHERE curve_name = '{curve_name}' ORDER BY bucket"
+        daily = f"SELECT bucket::text, value_sum, value_count, value_avg FROM {destination.TABLE_NAME}_daily WHERE curve_name = '{curve_name}'"
+        assert destination.fetch(hourly) == [('2003-05-01 10:00:00', 30, 2, 15), ('2003-05-01 11:00:00', 30, 1, 30)]
+        assert destination.fetch(daily) == [('2003-05-01 00:00:00', 60, 3, 20)]
+
+        destination.bulk_sync([(curve_name, '2003-05-01T11:30:00Z', 40.0)], mode=mode)
+        assert destination.fetch(hourly)[1] == ('2003-05-01 11:00:00', 70, 2, 35)
+        assert destination.fetch(daily) == [('2003-05-01 00:00:00', 100, 4, 25)]
+
+    def test_rollups_touched_only(self, destination: DestinationPostgreSQL) -> None:
+        """Test a load only recomputes the buckets of the rows it wrote and a rebuild repairs any bucket of the range.
+
+        :param destination: The destination object from fixture.
+        """
+        curve_name = 'bmreports, Rollup Repair, min30'
+        rows = [(curve_name, '2003-06-01T10:00:00Z', 1.0), (curve_name, '2003-06-01T11:00:00Z', 2.0)]
+        destination.bulk_sync(rows)
+
+        hourly = f"SELECT value_sum FROM {destination.TABLE_NAME}_hourly WHERE curve_name = '{curve_name}' ORDER BY bucket"
+        destination.query(f"UPDATE {destination.rollup_table('hourly')} SET value_sum = -1 WHERE bucket = '2003-06-01T10:00:00'")
+
+        destination.bulk_sync([rows[0], (curve_name, '2003-06-01T11:00:00Z', 3.0)])
+        assert destination.fetch(hourly) == [(-1,), (3,)], "Only the bucket of the updated row should be recomputed"
+
+        assert destination.rebuild_rollups('2003-06-01T00:00:00Z', '2003-06-01T00:00:00Z') == {'hourly': 2, 'daily': 1}
+        assert destination.fetch(hourly) == [(1,), (3,)]
+
+    def test_rollups_scale(self, destination: DestinationPostgreSQL) -> None:
+        """Test the rollups of a large load are refreshed in linear time, every bucket reading its own rows only.
+
+        :param destination: The destination object from fixture.
+        """
+        rows, curves, budget = 50000, 3, 10.0  # A refresh joining every row of a curve to every hour took minutes
+        start = pendulum.datetime(2004, 1, 1)
+        dates = [(start + pendulum.duration(minutes=30 * period)).strftime('%Y-%m-%dT%H:%M:%SZ') for period in range(rows // curves + 1)]
+        data = ((f'bmreports, Scale {n % curves}, min30', dates[n // curves], 1.0) for n in range(rows))
+
+        started = time.perf_counter()
+        destination.bulk_sync(data, mode=destination.LOAD_COPY)
+        seconds = time.perf_counter() - started
+
+        daily = f"SELECT sum(value_count) FROM {destination.TABLE_NAME}_daily WHERE curve_name LIKE 'bmreports, Scale%'"
+        assert destination.single(daily)[0] == rows
+        assert seconds < budget, f"Loading {rows} rows took {seconds:.1f}s"
+
+    def test_rollups_lock_slots(self, destination: DestinationPostgreSQL) -> None:
+        """Test a load of more curves and days than max_locks_per_transaction allows only takes LOCK_SLOTS day locks.
+
+        :param destination: The destination object from fixture.
+        """
+        curves, days = 4, 5000  # 20000 curves and days, one lock each exhausted the shared lock table
+        start = pendulum.datetime(1990, 1, 1)
+        dates = [(start + pendulum.duration(days=day)).strftime('%Y-%m-%dT%H:%M:%SZ') for day in range(days)]
+
+        destination.bulk_sync([(f'bmreports, Slots {curve}, min30', date, 1.0) for curve in range(curves) for date in dates])
+
+        daily = f"SELECT count(*), sum(value_count) FROM {destination.TABLE_NAME}_daily WHERE curve_name LIKE 'bmreports, Slots%'"
+        assert destination.single(daily) == (curves * days, curves * days)
+
+    def test_rollups_concurrent(self, destination: DestinationPostgreSQL, monkeypatch: Any) -> None:
+        """Test two loads of different hours of the same day, on two connections, both count in the daily bucket.
+
+        :param destination: The destination object from fixture.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        curve_name = 'bmreports, Rollup Concurrent, min30'
+        destination.bulk_sync([(curve_name, '2003-08-01T09:00:00Z', 1.0)])
+        other = DestinationPostgreSQL(destination.TABLE_NAME)
+        refreshed, release = threading.Event(), threading.Event()
+
+        def paused(cur: Any, watermarks: dict[str, tuple[str, str]]) -> None:
+            refreshed.set()  # The first load recomputed its buckets and holds its transaction open
+            release.wait(timeout=10)
+
+        monkeypatch.setattr(destination, "advance_watermarks", paused)
+        first = threading.Thread(target=destination.bulk_sync, args=([(curve_name, '2003-08-01T10:00:00Z', 10.0)],),
+                                 kwargs={'watermarks': {curve_name: ('2003-08-01T12:00:00Z', '2003-08-01T10:00:00Z')}})
+        second = threading.Thread(target=other.bulk_sync, args=([(curve_name, '2003-08-01T11:00:00Z', 100.0)],))
+
+        first.start()
+        assert refreshed.wait(timeout=10)
+        second.start()
+        waiting = f"SELECT count(*) FROM pg_stat_activity WHERE wait_event_type = 'Lock' AND query LIKE '%{destination.TABLE_NAME}%'"
+        deadline = time.monotonic() + 10
+        while destination.single(waiting)[0] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        first.join()
+        second.join()
+
+        daily = f"SELECT value_sum, value_count FROM {destination.TABLE_NAME}_daily WHERE curve_name = '{curve_name}'"
+        assert destination.fetch(daily) == [(111, 3)], "A load overwrote the daily bucket of the other"
+
+    def test_rollups_repair_command(self, destination: DestinationPostgreSQL) -> None:
+        """Test the command line rebuilds the rollups of the range of the given table.
+
+        :param destination: The destination object from fixture.
+        """
+        curve_name = 'bmreports, Rollup Command, min30'
+        destination.bulk_sync([(curve_name, '2003-07-01T10:00:00Z', 1.0)])
+        destination.query(f"DELETE FROM {destination.rollup_table('daily')} WHERE bucket = '2003-07-01'")
+
+        main(["--date-from", "2003-07-01T00:00:00Z", "--date-to", "2003-07-01T23:30:00Z", "--table", destination.TABLE_NAME])
+
+        assert destination.fetch(f"SELECT value_sum FROM {destination.TABLE_NAME}_daily WHERE curve_name = '{curve_name}'") == [(1,)]
@@ -0,0 +1,87 @@
+import json
+import pendulum
+import pyarrow as pa
+from pathlib import Path
+from typing import Any
+from model.landing import LandingZone
+
+URL = "https://data.elexon.co.uk/bmrs/api/v1/generation/actual/per-type/wind-and-solar"
+
+
+def records(settlement_date: str, quantity: float) -> list[dict[str, Any]]:
+    """Build the records of one settlement period.
+
+    :param settlement_date: Settlement date as YYYY-MM-DD.
+    :param quantity: Quantity of every record.
+    :return: API records.
+    """
+    return [{"psrType": psr_type, "quantity": quantity, "settlementDate": settlement_date, "startTime": f"{settlement_date}T22:30:00Z"}
+            for psr_type in ("Solar", "Wind Offshore")]
+
+
+class TestLandingZone:
+    """Test the LandingZone class."""
+
+    def test_put(self, tmp_path: Path) -> None:
+        """Test a payload is split by settlement date into zstd files with the request metadata.
+
+        :param tmp_path: The pytest temporary directory.
+        """
+        landing = LandingZone(tmp_path)
+        payload = {"metadata": {"datasets": ["AGWS"]}, "data": records("2024-10-16", 1.0) + records("2024-10-17", 2.0)}
+
+        paths = landing.put(URL, pendulum.datetime(2024, 10, 16, 22), pendulum.datetime(2024, 10, 16, 23, 30), payload, status=200, bytes=512)
+
+        assert [path.parent.name for path in paths] == ["settlement_date=2024-10-16", "settlement_date=2024-10-17"]
+        assert list(landing.records(paths[1])) == records("2024-10-17", 2.0)
+        request = landing.request(paths[0])
+        assert request["url"] == URL
+        assert request["from"] == "2024-10-16T22:00:00+00:00"
+        assert (request["settlement_date"], request["records"], request["status"], request["bytes"]) == ("2024-10-16", 2, 200, 512)
+
+        with pa.CompressedInputStream(pa.OSFile(str(paths[0])), "zstd") as stream:
+            document = json.loads(stream.read())
+        assert document["metadata"] == payload["metadata"], "The files should be plain zstd frames of the payload"
+
+    def test_files(self, tmp_path: Path) -> None:
+        """Test the files of a range of settlement dates, by default only the latest revision of every window.
+
+        :param tmp_path: The pytest temporary directory.
+        """
+        landing = LandingZone(tmp_path)
+        first, second = pendulum.datetime(2024, 10, 16, 22), pendulum.datetime(2024, 10, 17, 22)
+        old, = landing.put(URL, first, first, {"data": records("2024-10-16", 1.0)})
+        new, = landing.put(URL, first, first, {"data": records("2024-10-16", 1.5)})
+        other, = landing.put(URL, second, second, {"data": records("2024-10-17", 2.0)})
+        landing.put(URL, second, second, {"data": records("2024-10-18", 3.0)})
+
+        assert landing.files("2024-10-16", "2024-10-17") == [new, other]
+        assert landing.files("2024-10-16", "2024-10-16", revisions=True) == [old, new]
+        assert LandingZone(tmp_path / "missing").files("2024-10-16", "2024-10-17") == []
+
+    def test_files_fetch_order(self, tmp_path: Path) -> None:
+        """Test overlapping windows are listed in the order they were fetched, not by window.
+
+        :param tmp_path: The pytest temporary directory.
+        """
+        landing = LandingZone(tmp_path)
+        period = pendulum.datetime(2024, 10, 16, 22)
+        narrow, = landing.put(URL, period, period, {"data": records("2024-10-16", 1.0)})
+        wide, = landing.put(URL, period.subtract(hours=2), period, {"data": records("2024-10-16", 1.5)})
+        again, = landing.put(URL, period, period, {"data": records("2024-10-16", 2.0)})
+
+        assert wide.name < narrow.name, "The wide window should sort first by name"
+        assert landing.files("2024-10-16", "2024-10-16") == [wide, again]
+        assert landing.files("2024-10-16", "2024-10-16", revisions=True) == [narrow, wide, again]
+
+    def test_dataset(self, tmp_path: Path) -> None:
+        """Test every dataset is archived in its own subdirectory.
+
+        :param tmp_path: The pytest temporary directory.
+        """
+        period = pendulum.datetime(2024, 10, 16, 22)
+        psr, = LandingZone(tmp_path, dataset="psr").put(URL, period, period, {"data": records("2024-10-16", 1.0)})
+        LandingZone(tmp_path, dataset="other").put(URL, period, period, {"data": records("2024-10-16", 2.0)})
+
+        assert psr.parent.parent == tmp_path / "psr"
+        assert LandingZone(tmp_path, dataset="psr").files("2024-10-16", "2024-10-16") == [psr]
@@ -0,0 +1,129 @@
+import gc
+import os
+import threading
+import pytest
+from typing import Any
+from collections.abc import Generator
+from psycopg2.pool import PoolError
+from model import pool as pool_module
+from model.pool import ConnectionPool
+
+
+@pytest.fixture
+def pool() -> Generator[ConnectionPool, None, None]:
+    """Instantiate a small private pool."""
+    pool = ConnectionPool(os.environ['POSTGRES_CONNECTION_STRING'], min_size=1, max_size=2)
+    yield pool
+    pool.closeall()
+
+
+class TestConnectionPool:
+    """Test the ConnectionPool class."""
+
+    def test_connection_reused(self, pool: ConnectionPool) -> None:
+        """Test a returned connection is handed out again.
+
+        :param pool: The pool from fixture.
+        """
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            assert second is first, "Idle connection was not reused"
+
+    def test_invalid_size(self) -> None:
+        """Test inconsistent sizes are rejected."""
+        with pytest.raises(ValueError, match="Invalid pool size"):
+            ConnectionPool("", min_size=3, max_size=2)
+
+    def test_exhausted(self, pool: ConnectionPool) -> None:
+        """Test checkout fails once max_size connections are in use.
+
+        :param pool: The pool from fixture.
+        """
+        with pool.connection(), pool.connection(), pytest.raises(PoolError):
+            pool.getconn(timeout=0.1)
+
+    def test_waits_for_returned_connection(self, pool: ConnectionPool) -> None:
+        """Test a waiting checkout is served as soon as a connection is returned.
+
+        :param pool: The pool from fixture.
+        """
+        held = [pool.getconn(), pool.getconn()]
+        timer = threading.Timer(0.1, pool.putconn, args=(held[0],))
+        timer.start()
+
+        assert pool.getconn(timeout=5) is held[0], "Returned connection was not handed to the waiter"
+        timer.join()
+
+        for conn in held:
+            pool.putconn(conn)
+
+    def test_broken_connection_replaced(self, pool: ConnectionPool) -> None:
+        """Test a connection closed while idle is replaced.
+
+        :param pool: The pool from fixture.
+        """
+        with pool.connection() as first:
+            pass
+        first.close()
+
+        with pool.connection() as second:
+            assert second is not first, "Closed connection was handed out"
+            assert second.closed == 0
+
+    def test_stale_connection_validated(self, pool: ConnectionPool, monkeypatch: Any) -> None:
+        """Test an idle connection past CHECK_AFTER is validated and kept if healthy.
+
+        :param pool: The pool from fixture.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        monkeypatch.setattr(ConnectionPool, "CHECK_AFTER", 0)
+        with pool.connection() as first:
+            pass
+
+        with pool.connection() as second:
+            assert second is first, "Healthy connection should survive validation"
+
+    def test_uncommitted_work_rolled_back(self, pool: ConnectionPool) -> None:
+        """Test an open transaction is rolled back when the connection is returned.
+
+        :param pool: The pool from fixture.
+        """
+        with pool.connection() as conn, conn.cursor() as cursor:
+            cursor.execute("CREATE TEMPORARY TABLE pool_probe (id INT)")
+
+        with pool.connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pg_temp.pool_probe')")
+            assert cursor.fetchone()[0] is None, "Uncommitted table should be rolled back"
+
+    def test_fork_keeps_parent_connections(self, pool: ConnectionPool) -> None:
+        """Test a forked child opens its own connections and leaves the parent's session alive.
+
+        :param pool: The pool from fixture.
+        """
+        with pool.connection() as inherited:
+            pass
+
+        pid = os.fork()
+        if pid == 0:  # Child: exit code 0 only if it used a connection of its own and kept the parent's one referenced
+            status = 1
+            try:
+                with pool.connection() as own:
+                    status = int(own is inherited or not any(conn is inherited for conn in pool_module._inherited))
+                del inherited  # The pool holds the only reference of the child, as in a task process
+                pool.closeall()
+                gc.collect()
+            finally:
+                os._exit(status)
+
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0, "Child reused or released the inherited connection"
+
+        with pool.connection() as conn, conn.cursor() as cursor:
+            assert conn is inherited
+            cursor.execute("SELECT 1")
+            assert cursor.fetchone() == (1,), "Parent session was terminated by the child"
+
+    def test_shared_per_process(self) -> None:
+        """Test the shared pool is a process-wide instance."""
+        assert ConnectionPool.shared() is ConnectionPool.shared()
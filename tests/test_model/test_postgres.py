@@ -0,0 +1,57 @@
+from model.postgres import CopyStream, PostgresSQL
+
+
+class TestCopyStream:
+    """Test the CopyStream class."""
+
+    def test_read_formats_rows(self) -> None:
+        """Test rows are serialized into COPY CSV format with quoting and NULLs."""
+        stream = CopyStream([('bmreports, Solar, min30', '2023-07-21T04:30:00Z', 1.5), ('a"b', None, 2)])
+
+        assert stream.read() == '"bmreports, Solar, min30",2023-07-21T04:30:00Z,1.5\n"a""b",,2\n'
+        assert stream.read() == '', "Exhausted stream should return an empty string"
+
+    def test_read_in_chunks(self) -> None:
+        """Test chunked reads reassemble into the complete payload."""
+        rows = [('bmreports, Solar, min30', f'2023-07-21T{hour:02}:00:00Z', hour) for hour in range(24)]
+        stream = CopyStream(rows)
+
+        chunks = iter(lambda: stream.read(7), '')
+
+        assert ''.join(chunks) == CopyStream(rows).read()
+
+
+class TestPostgresSQL:
+    """Test the PostgresSQL class."""
+
+    def test_stream(self, destination: PostgresSQL) -> None:
+        """Test rows are streamed from a server-side cursor in order.
+
+        :param destination: The destination object from fixture.
+        """
+        rows = destination.stream("SELECT i, i * 2 FROM generate_series(1, %s) AS i", (25,), itersize=10)
+
+        assert list(rows) == [(i, i * 2) for i in range(1, 26)]
+
+    def test_stream_batches(self, destination: PostgresSQL) -> None:
+        """Test rows are fetched in batches of at most itersize rows.
+
+        :param destination: The destination object from fixture.
+        """
+        batches = destination.stream_batches("SELECT i FROM generate_series(1, 25) AS i", itersize=10)
+
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+
+    def test_stream_closed_early(self, destination: PostgresSQL) -> None:
+        """Test the connection is returned to the pool when the consumer stops early.
+
+        :param destination: The destination object from fixture.
+        """
+        idle = len(destination.pool.idle)
+        rows = destination.stream("SELECT i FROM generate_series(1, 100000) AS i", itersize=100)
+
+        assert next(rows) == (1,)
+        rows.close()  # type: ignore[attr-defined]
+
+        assert len(destination.pool.idle) == max(idle, 1), "Connection should be back in the pool"
+        assert destination.single("SELECT 1") == (1,)
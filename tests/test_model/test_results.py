@@ -0,0 +1,64 @@
+import json
+import pendulum
+from model.results import ValidationResults
+
+
+def result(success: bool, evaluated: int, successful: int) -> str:
+    """Serialize a validation result with its statistics.
+
+    :param success: Outcome of the suite.
+    :param evaluated: Number of expectations evaluated.
+    :param successful: Number of expectations met.
+    :return: JSON text as the store writes it.
+    """
+    return json.dumps({"success": success, "results": [{"success": success}] * evaluated, "statistics": {
+        "evaluated_expectations": evaluated, "successful_expectations": successful,
+        "unsuccessful_expectations": evaluated - successful, "success_percent": 100.0 * successful / evaluated}})
+
+
+RECENT = pendulum.now("UTC").strftime(ValidationResults.RUN_TIME_FORMAT)
+OLD = "20240101T000000.000000Z"
+
+
+class TestValidationResults:
+    """Test the ValidationResults class."""
+
+    def test_write(self, validation_results: ValidationResults) -> None:
+        """Test the results of a validation are upserted together.
+
+        :param validation_results: The validation results object from fixture.
+        """
+        validation_results.write([("schema", "scan", RECENT, "pandas-psr", result(True, 2, 2)),
+                                  ("volume", "scan", RECENT, "pandas-psr", result(True, 1, 1))])
+        validation_results.write([("volume", "scan", RECENT, "pandas-psr", result(False, 1, 0))])
+        validation_results.write([])
+
+        assert validation_results.history(RECENT, "99991231") == [(RECENT, "schema", True, 2, 2, True), (RECENT, "volume", False, 1, 0, True)]
+
+    def test_compact(self, validation_results: ValidationResults) -> None:
+        """Test the results older than the retention keep their statistics only.
+
+        :param validation_results: The validation results object from fixture.
+        """
+        validation_results.write([("schema", "scan", OLD, "pandas-psr", result(False, 2, 1)),
+                                  ("schema", "scan", RECENT, "pandas-psr", result(True, 2, 2))])
+
+        assert validation_results.compact(days=30) == 1
+        assert validation_results.compact(days=30) == 0, "Compacted results should not be compacted again"
+        assert validation_results.fetch(f"SELECT run_time FROM {validation_results.TABLE_NAME}") == [(RECENT,)]
+        assert validation_results.fetch(f"SELECT success, evaluated, successful, unsuccessful, success_percent FROM {validation_results.summary_table}") == [
+            (False, 2, 1, 1, 50.0)]
+        assert validation_results.history("2024", "2025") == [(OLD, "schema", False, 2, 1, False)]
+
+    def test_run_time_index(self, validation_results: ValidationResults) -> None:
+        """Test both tables are indexed for lookups by run time.
+
+        :param validation_results: The validation results object from fixture.
+        """
+        indexes = validation_results.fetch(f"""
+            SELECT tablename, indexdef FROM pg_indexes
+            WHERE tablename IN ('{validation_results.TABLE_NAME}', '{validation_results.summary_table}') AND indexname LIKE '%run_time'
+        """)
+
+        assert sorted(table for table, _ in indexes) == [validation_results.TABLE_NAME, validation_results.summary_table]
+        assert all(definition.endswith("(run_time)") for _, definition in indexes)
@@ -1,4 +1,11 @@
+import json
+import pytest
 import pendulum
+from pathlib import Path
+from typing import Any
+from helper.metrics import Metrics
+from model.cache import ResponseCache
+from model.landing import LandingZone
 from model.source import SourceAPI
 
 
@@ -26,3 +33,107 @@ class TestSourceAPI:
         assert isinstance(result, dict)
         assert result["data"][0]["psrType"] == "Wind Onshore"
         assert result["data"][1]["psrType"] == "Wind Offshore"
+
+    @pytest.mark.usefixtures("_mock_requests_get")
+    def test_session_pool_size(self) -> None:
+        """Test the keep-alive pool of the shared session holds a connection per worker of the largest fetch."""
+        workers = SourceAPI.WORKERS * 2
+        SourceAPI(workers=workers).fetch_json(pendulum.datetime(2024, 10, 1), pendulum.datetime(2024, 10, 12), chunk=pendulum.duration(days=1))
+        SourceAPI(workers=1).fetch_json(pendulum.datetime(2024, 10, 1), pendulum.datetime(2024, 10, 2), chunk=pendulum.duration(days=1))
+
+        adapter = SourceAPI.session().get_adapter("https://data.elexon.co.uk")
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == workers, "A smaller fetch should not shrink the pool"
+
+    def test_windows(self) -> None:
+        """Test the range is split into inclusive, non-overlapping windows."""
+        windows = SourceAPI.windows(pendulum.datetime(2024, 10, 10), pendulum.datetime(2024, 10, 12, 12), pendulum.duration(days=1))
+
+        assert windows == [
+            (pendulum.datetime(2024, 10, 10), pendulum.datetime(2024, 10, 10, 23, 30)),
+            (pendulum.datetime(2024, 10, 11), pendulum.datetime(2024, 10, 11, 23, 30)),
+            (pendulum.datetime(2024, 10, 12), pendulum.datetime(2024, 10, 12, 12)),
+        ]
+
+    def test_windows_single_period(self) -> None:
+        """Test a range of one settlement period yields one window."""
+        dt = pendulum.datetime(2024, 10, 10, 9)
+
+        assert SourceAPI.windows(dt, dt, pendulum.duration(days=1)) == [(dt, dt)]
+
+    def test_windows_invalid_chunk(self) -> None:
+        """Test a chunk shorter than a settlement period is rejected."""
+        with pytest.raises(ValueError, match="at least one settlement period"):
+            SourceAPI.windows(pendulum.datetime(2024, 10, 10), pendulum.datetime(2024, 10, 11), pendulum.duration(minutes=10))
+
+    def test_fetch_json_chunked(self, api_mocker: SourceAPI, requested_urls: list[str], mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test a chunked fetch requests every window and merges the data in order.
+
+        :param api_mocker: Mocked SourceAPI object from fixture.
+        :param requested_urls: URLs requested through the mocked session.
+        :param mock_data: Mock data from fixture.
+        """
+        days = 3
+        result = api_mocker.fetch_json(pendulum.datetime(2024, 10, 10), pendulum.datetime(2024, 10, 12, 23, 30), chunk=pendulum.duration(days=1))
+
+        assert len(set(requested_urls)) == len(requested_urls) == days, "Every window should be requested once"
+        assert len(result["data"]) == days * len(mock_data["data"])
+        assert [item["psrType"] for item in result["data"][:3]] == ["Wind Onshore", "Wind Offshore", "Solar"]
+
+    def test_stream_records(self, api_mocker: SourceAPI, requested_urls: list[str], mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test the streamed records of a chunked range match the parsed responses.
+
+        :param api_mocker: Mocked SourceAPI object from fixture.
+        :param requested_urls: URLs requested through the mocked session.
+        :param mock_data: Mock data from fixture.
+        """
+        days = 2
+        records = api_mocker.stream_records(pendulum.datetime(2024, 10, 10), pendulum.datetime(2024, 10, 11, 23, 30), chunk=pendulum.duration(days=1))
+
+        assert not requested_urls, "Nothing should be requested before the records are consumed"
+        assert list(records) == days * mock_data["data"]
+        assert len(requested_urls) == days
+
+    @pytest.mark.usefixtures("_mock_requests_get")
+    def test_stream_records_cached(self, tmp_path: Any, requested_urls: list[str], mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test a streamed window is cached and served from the cache afterwards.
+
+        :param tmp_path: The pytest tmp_path fixture.
+        :param requested_urls: URLs requested through the mocked session.
+        :param mock_data: Mock data from fixture.
+        """
+        source = SourceAPI(cache=ResponseCache(tmp_path))
+        window = (pendulum.datetime(2024, 10, 10), pendulum.datetime(2024, 10, 10, 23, 30))
+
+        assert list(source.stream_records(*window)) == list(source.stream_records(*window)) == mock_data["data"]
+        assert len(requested_urls) == 1, "The second stream should be served from the cache"
+
+    def test_span(self, api_mocker: SourceAPI, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Test the status, latency and size of every request are recorded on the span of the fetch.
+
+        :param api_mocker: Mocked SourceAPI object from fixture.
+        :param mock_data: Mock data from fixture.
+        """
+        api_mocker.span = Metrics().span("fetch")
+        size = len(json.dumps(mock_data).encode())
+
+        api_mocker.fetch_json(pendulum.datetime(2024, 10, 10), pendulum.datetime(2024, 10, 10))
+        list(api_mocker.stream_records(pendulum.datetime(2024, 10, 10), pendulum.datetime(2024, 10, 10)))
+
+        assert [(request["status"], request["bytes"]) for request in api_mocker.span.requests] == [(200, size), (200, size)]
+        assert api_mocker.span.counters == {"bytes": 2 * size}
+
+    def test_landing(self, api_mocker: SourceAPI, mock_data: dict[str, list[dict[str, Any]]], tmp_path: Path) -> None:
+        """Test every payload received from the API is archived in the landing zone.
+
+        :param api_mocker: Mocked SourceAPI object from fixture.
+        :param mock_data: Mock data from fixture.
+        :param tmp_path: The pytest temporary directory.
+        """
+        api_mocker.landing = LandingZone(tmp_path)
+        period = pendulum.datetime(2023, 7, 21, 4, 30)
+
+        api_mocker.fetch_json(period, period)
+        list(api_mocker.stream_records(period, period))
+
+        paths = api_mocker.landing.files("2023-07-21", "2023-07-21", revisions=True)
+        assert [list(api_mocker.landing.records(path)) for path in paths] == [mock_data["data"]] * 2, "Both fetches should be archived"
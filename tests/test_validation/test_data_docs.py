@@ -0,0 +1,27 @@
+from typing import Any
+from validation.data_docs import DataDocs
+from validation.data_validation import DataValidator
+
+
+class TestDataDocs:
+    """Test the Data Docs renderer."""
+
+    def test_render_pending(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Check the results stored by a validation are rendered by the next build only, newest first.
+
+        :param mock_data: Mock data from fixture.
+        """
+        validator = DataValidator(mock_data["data"])
+        validator.validate()
+        docs = DataDocs()
+        site_name = docs.site_names[0]
+        suites = set(validator.results)
+
+        pending = docs.pending(docs.rendered(site_name)[0])
+        assert {key.expectation_suite_identifier.name for key in pending[:len(suites)]} == suites, "The validation should not render its results"
+
+        assert docs.render(limit=len(suites)) == {site_name: len(suites)}
+        rendered, rendered_suites = docs.rendered(site_name)
+        assert set(pending[:len(suites)]) <= rendered
+        assert {suite.name for suite in rendered_suites} >= suites
+        assert not set(pending[:len(suites)]) & set(docs.pending(rendered))
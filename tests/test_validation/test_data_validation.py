@@ -11,3 +11,54 @@ class TestDataValidator:
         :param mock_data: Mock data from fixture.
         """
         assert DataValidator(mock_data["data"]).validate(), "Data validation did not pass"
+
+    def test_invalid_data(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Run the validation on data failing the distribution suite only.
+
+        :param mock_data: Mock data from fixture.
+        """
+        data = [{**item, "settlementPeriod": 99} for item in mock_data["data"]]
+        assert not DataValidator(data).validate(), "Out of range settlement period passed validation"
+
+    def test_context_cached(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Check the context is loaded once per process.
+
+        :param mock_data: Mock data from fixture.
+        """
+        assert DataValidator(mock_data["data"]).context is DataValidator(mock_data["data"]).context
+
+    def test_timings(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Check the timing breakdown covers every step and suite of the combined run.
+
+        :param mock_data: Mock data from fixture.
+        """
+        validator = DataValidator(mock_data["data"])
+        validator.validate()
+
+        suites = {f"suite.{name}" for name in ("distribution", "missingness", "schema", "volume")}
+        assert {"context", "batch", "store", "total"} | suites == set(validator.timings)
+        assert validator.timings["total"] >= sum(validator.timings[name] for name in suites)
+
+    def test_checkpoints(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Check only the suites of the dataset checkpoints are evaluated.
+
+        :param mock_data: Mock data from fixture.
+        """
+        data = [{**item, "settlementPeriod": 99} for item in mock_data["data"]]
+        validator = DataValidator(data, checkpoints=["completeness_checkpoint"])
+
+        assert validator.validate(), "The distribution suite of the statistical checkpoint should not run"
+        assert set(validator.results) == {"missingness", "schema", "volume"}
+
+    def test_store(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Check the results written in one batch read back through the validation results store.
+
+        :param mock_data: Mock data from fixture.
+        """
+        validator = DataValidator(mock_data["data"])
+        validator.validate()
+        store = validator.context.validation_results_store
+        run_time = next(iter(validator.results.values())).meta["run_id"].run_time
+
+        stored = {key.expectation_suite_identifier.name: store.get(key) for key in store.list_keys() if key.run_id.run_time == run_time}
+        assert {name: result.success for name, result in stored.items()} == {name: result.success for name, result in validator.results.items()}
@@ -0,0 +1,97 @@
+import json
+import pytest
+from typing import Any
+from collections.abc import Callable
+from pathlib import Path
+from validation.data_validation import DataValidator
+from validation.fast_validation import FastDataValidator
+
+ROW_LIMIT = 1008  # Upper bound of the volume suite
+
+
+VARIANTS: dict[str, Callable[[list[dict[str, Any]]], list[dict[str, Any]]]] = {
+    "valid": lambda data: data,
+    "out_of_range_period": lambda data: [{**item, "settlementPeriod": 49} for item in data],
+    "null_period": lambda data: [{**item, "settlementPeriod": None} for item in data],
+    "null_psr_type": lambda data: [data[0], {**data[1], "psrType": None}, *data[2:]],
+    "missing_settlement_date": lambda data: [{k: v for k, v in item.items() if k != "settlementDate"} for item in data],
+    "extra_column": lambda data: [{**item, "extra": 1} for item in data],
+    "too_many_rows": lambda data: [data[i % len(data)] for i in range(ROW_LIMIT + 1)],
+}
+
+
+class TestFastDataValidator:
+    """Test the fast path data validator class."""
+
+    def test_valid(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Check the mock data passes every expectation.
+
+        :param mock_data: Mock data from fixture.
+        """
+        validator = FastDataValidator(mock_data["data"])
+
+        assert validator.validate(), "Data validation did not pass"
+        assert {result["suite"] for result in validator.results} == {"distribution", "missingness", "schema", "volume"}
+
+    def test_suites(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Check only the suites of the dataset are evaluated.
+
+        :param mock_data: Mock data from fixture.
+        """
+        validator = FastDataValidator(VARIANTS["out_of_range_period"](mock_data["data"]), suites=["missingness", "volume"])
+
+        assert validator.validate(), "The distribution suite should not run"
+        assert {result["suite"] for result in validator.results} == {"missingness", "volume"}
+
+        with pytest.raises(FileNotFoundError):
+            FastDataValidator(mock_data["data"], suites=["missing"]).validate()
+
+    def test_results(self, mock_data: dict[str, list[dict[str, Any]]]) -> None:
+        """Check the per-expectation results of a failing expectation.
+
+        :param mock_data: Mock data from fixture.
+        """
+        validator = FastDataValidator(VARIANTS["out_of_range_period"](mock_data["data"]))
+
+        assert not validator.validate()
+        failed = [result for result in validator.results if not result["success"]]
+        assert [(result["suite"], result["expectation"], result["unexpected_count"]) for result in failed] == [
+            ("distribution", "expect_column_values_to_be_between", len(mock_data["data"])),
+        ]
+
+    def test_unsupported_expectation(self, mock_data: dict[str, list[dict[str, Any]]], monkeypatch: Any) -> None:
+        """Check an expectation type without a NumPy implementation fails the fast path.
+
+        :param mock_data: Mock data from fixture.
+        :param monkeypatch: The pytest monkeypatch fixture.
+        """
+        monkeypatch.setattr(FastDataValidator, "suites", lambda self: {"custom": [{"type": "expect_column_values_to_be_unique", "kwargs": {}}]})
+
+        assert not FastDataValidator(mock_data["data"]).validate()
+
+    def test_no_expectation(self, mock_data: dict[str, list[dict[str, Any]]], tmp_path: Path) -> None:
+        """Check the fast path fails when there is no suite or no expectation to evaluate.
+
+        :param mock_data: Mock data from fixture.
+        :param tmp_path: The pytest temporary directory.
+        """
+        assert not FastDataValidator(mock_data["data"], project_dir=tmp_path).validate(), "A missing expectations directory should not pass"
+
+        (tmp_path / "gx" / "expectations").mkdir(parents=True)
+        (tmp_path / "gx" / "expectations" / "empty.json").write_text(json.dumps({"expectations": []}))
+        assert not FastDataValidator(mock_data["data"], project_dir=tmp_path).validate(), "An empty suite should not pass"
+
+    @pytest.mark.parametrize("case", VARIANTS)
+    def test_parity(self, mock_data: dict[str, list[dict[str, Any]]], case: str) -> None:
+        """Check the fast path and the Great Expectations checkpoints agree on every expectation.
+
+        :param mock_data: Mock data from fixture.
+        :param case: Name of the fixture variant.
+        """
+        data = VARIANTS[case](mock_data["data"])
+        fast, full = FastDataValidator(data), DataValidator(data)
+
+        assert fast.validate() == full.validate(), f"Overall outcome differs for '{case}'"
+        assert sorted((result["suite"], result["expectation"], result["success"]) for result in fast.results) == sorted(
+            (suite, result.expectation_config.type, result.success) for suite, suite_result in full.results.items() for result in suite_result.results
+        ), f"Per-expectation outcome differs for '{case}'"